@@ -1,5 +1,10 @@
-from typing import Dict
+from typing import Any, Dict, Iterator, Union
 import pandas as pd
+from openpyxl import load_workbook
+from app_balance.services.analysis_results import PromptAnalise
+
+# Colunas usadas na agregação de custos
+COLUNAS_CUSTOS = ('Categoria', 'Valor')
 
 class PromptService:
     """
@@ -11,13 +16,20 @@ class PromptService:
         """
         Gera um prompt detalhado para análise financeira dos custos, valor da hora trabalhada, e estimativas financeiras.
         """
-        return (
-            f"Análise financeira:\n"
-            f"Total de custos: R$ {custos['total_custos']:.2f}\n"
-            f"Valor da hora: R$ {valor_hora:.2f}\n"
-            f"Receita projetada: R$ {receita_projetada:.2f}\n"
-            f"Margem de lucro desejada: {margem_lucro_desejada}%\n"
-            f"\nCategorias de custos:\n" + "\n".join([f"{k}: R$ {v}" for k, v in categorias_custos.items()])
+        return self.montar_prompt_analise(custos, valor_hora, categorias_custos, margem_lucro_desejada,
+                                          receita_projetada).para_prompt()
+
+    def montar_prompt_analise(self, custos: Dict, valor_hora: float, categorias_custos: Dict, margem_lucro_desejada: float, receita_projetada: float) -> PromptAnalise:
+        """
+        Reúne os dados do prompt de análise financeira; o texto só é montado em `para_prompt`,
+        `para_markdown` ou `para_json`.
+        """
+        return PromptAnalise(
+            total_custos=custos['total_custos'],
+            valor_hora=valor_hora,
+            receita_projetada=receita_projetada,
+            margem_lucro_desejada=margem_lucro_desejada,
+            categorias_custos=tuple(categorias_custos.items()),
         )
 
     def processar_arquivo(self, file_path: str, file_type: str) -> Dict:
@@ -31,13 +43,111 @@ class PromptService:
         Returns:
             dict: Dados financeiros extraídos do arquivo.
         """
+        # Carrega apenas as colunas usadas na agregação
+        colunas = lambda coluna: coluna in COLUNAS_CUSTOS
+        if file_type == 'xlsx':
+            df = pd.read_excel(file_path, usecols=colunas)
+        elif file_type == 'csv':
+            df = pd.read_csv(file_path, usecols=colunas)
+        else:
+            raise ValueError("Tipo de arquivo não suportado")
+
+        return self.agregar_custos(df)
+
+    def processar_arquivo_em_fluxo(self, file_path: str, file_type: str, tamanho_bloco: int = 100_000) -> Dict:
+        """
+        Versão de `processar_arquivo` com memória limitada, para planilhas grandes demais
+        para carregar de uma vez. CSVs são lidos em blocos pelo pandas e XLSX em modo
+        somente leitura do openpyxl, linha a linha; as somas por categoria e o total são
+        acumulados a cada bloco de `tamanho_bloco` linhas.
+
+        Args:
+            file_path (str): Caminho para o arquivo.
+            file_type (str): Tipo do arquivo ('xlsx' ou 'csv').
+            tamanho_bloco (int): Número de linhas agregadas por vez.
+
+        Returns:
+            dict: Os mesmos dados de `processar_arquivo`.
+        """
         if file_type == 'xlsx':
-            df = pd.read_excel(file_path)
+            blocos = self._ler_xlsx_em_blocos(file_path, tamanho_bloco)
         elif file_type == 'csv':
-            df = pd.read_csv(file_path)
+            blocos = pd.read_csv(file_path, usecols=lambda coluna: coluna in COLUNAS_CUSTOS, chunksize=tamanho_bloco)
         else:
             raise ValueError("Tipo de arquivo não suportado")
 
+        categorias_custos: Dict[Any, float] = {}
+        total_custos = 0.0
+        for bloco in blocos:
+            if 'Categoria' not in bloco.columns or 'Valor' not in bloco.columns:
+                raise ValueError("Arquivo deve conter as colunas 'Categoria' e 'Valor'.")
+            valores = pd.to_numeric(bloco['Valor'], errors='coerce')
+            total_custos += valores.sum()
+            for categoria, valor in valores.groupby(bloco['Categoria']).sum().items():
+                categorias_custos[categoria] = categorias_custos.get(categoria, 0.0) + valor
+
+        return {
+            'categorias_custos': categorias_custos,
+            'total_custos': total_custos,
+            'receita_projetada': total_custos * 1.5  # Mesma projeção de `agregar_custos`
+        }
+
+    @staticmethod
+    def _ler_xlsx_em_blocos(file_path: str, tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+        """
+        Lê a primeira planilha de um XLSX em modo somente leitura, gerando DataFrames
+        com até `tamanho_bloco` linhas das colunas 'Categoria' e 'Valor'.
+        """
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            linhas = workbook.worksheets[0].iter_rows(values_only=True)
+            cabecalho = next(linhas, ())
+            indices = [i for i, coluna in enumerate(cabecalho) if coluna in COLUNAS_CUSTOS]
+            colunas = [cabecalho[i] for i in indices]
+
+            bloco = []
+            for linha in linhas:
+                bloco.append([linha[i] if i < len(linha) else None for i in indices])
+                if len(bloco) >= tamanho_bloco:
+                    yield pd.DataFrame(bloco, columns=colunas)
+                    bloco = []
+            if bloco or set(colunas) != set(COLUNAS_CUSTOS):
+                yield pd.DataFrame(bloco, columns=colunas)
+        finally:
+            workbook.close()
+
+    def processar_planilhas(self, planilhas: Union[Dict[str, Any], Any]) -> Dict:
+        """
+        Agrega dados já extraídos, sem reler o arquivo: aceita o resultado de
+        `FileProcessingService.processar_arquivo_excel` em qualquer formato ('records',
+        'dataframe' ou 'arrow'), ou um único DataFrame/tabela Arrow.
+
+        Args:
+            planilhas: DataFrame, pyarrow.Table, lista de registros ou dicionário desses por planilha.
+
+        Returns:
+            dict: Dados financeiros agregados de todas as planilhas.
+        """
+        if not isinstance(planilhas, dict):
+            planilhas = {'dados': planilhas}
+
+        frames = [self._para_dataframe(dados) for dados in planilhas.values()]
+        frames = [df for df in frames if 'Categoria' in df.columns and 'Valor' in df.columns]
+        if not frames:
+            raise ValueError("Arquivo deve conter as colunas 'Categoria' e 'Valor'.")
+
+        return self.agregar_custos(pd.concat([df[list(COLUNAS_CUSTOS)] for df in frames], ignore_index=True))
+
+    def agregar_custos(self, df: pd.DataFrame) -> Dict:
+        """
+        Soma os valores por categoria e calcula o total de custos e a receita projetada.
+
+        Args:
+            df (pd.DataFrame): Dados com as colunas 'Categoria' e 'Valor'.
+
+        Returns:
+            dict: Categorias de custos, total de custos e receita projetada.
+        """
         if 'Categoria' not in df.columns or 'Valor' not in df.columns:
             raise ValueError("Arquivo deve conter as colunas 'Categoria' e 'Valor'.")
 
@@ -50,3 +160,11 @@ class PromptService:
             'total_custos': total_custos,
             'receita_projetada': receita_projetada
         }
+
+    @staticmethod
+    def _para_dataframe(dados: Any) -> pd.DataFrame:
+        if isinstance(dados, pd.DataFrame):
+            return dados
+        if hasattr(dados, 'to_pandas'):  # pyarrow.Table
+            return dados.to_pandas()
+        return pd.DataFrame.from_records(dados)
@@ -1,35 +1,48 @@
+import itertools
+import threading
+import time
 from dearpygui.dearpygui import *  # Importação correta da biblioteca
 from app_balance.services.text_processing import TextProcessingService
+from app_balance.services.gpt_service import GPTService
+from app_balance.services.openai_client import obter_cliente_compartilhado
+from app_balance.services.response_cache import obter_cache_compartilhado
 from app_balance.processamento.file_processing_service import FileProcessingService
+from app_balance.processamento.extraction_cache import ExtractionCache
 from app_balance.users.user_preferences_service import UserPreferencesService
 from app_balance.services.catelina_lacet import CatelinaLacetGPT
 
-<<<<<<< HEAD
+# Cache das extrações de arquivos enviados (reenvios do mesmo arquivo não são reprocessados)
+EXTRACTION_CACHE_DIR = ".cache/extracoes"
+
+# PDFs com pelo menos esta quantidade de páginas são extraídos em vários processos
+LIMITE_PAGINAS_PARALELO = 200
+
+# Extensões aceitas no upload e o tipo correspondente no FileProcessingService
+TIPOS_ARQUIVO = {"xlsx": "excel", "xls": "excel", "pdf": "pdf", "docx": "docx"}
+
+# Intervalo mínimo, em segundos, entre atualizações da conversa durante o streaming
+INTERVALO_ATUALIZACAO_STREAM = 0.05
 
-class MainWindow(QMainWindow):
-    def __init__(self, usuario, data_service, session):
-        super().__init__()
-        self.usuario = usuario
-        self.data_service = data_service  # Adicionando data_service para persistir dados
-        self.setWindowTitle(f"Catelina Lacet - Bem-vindo, {self.usuario.nome}!")
-        self.setGeometry(100, 100, 1000, 800)
-
-        # Inicializando os serviços
-        self.text_processor = TextProcessingService()  # Serviço para processar texto
-        self.file_service = FileProcessingService()  # Serviço para processar arquivos
-        self.user_preferences_service = UserPreferencesService(session)  # Passa a sessão aqui
-        self.cateline_lacet_gpt = CatelinaLacetGPT()  # IA que devolve a resposta final
-=======
 class MainWindow:
-    def __init__(self, usuario):
+    def __init__(self, usuario, data_service=None, gpt_service=None, text_processor=None, catelina_lacet=None,
+                 session=None):
         self.usuario = usuario
-
-        # Inicializando os serviços
-        self.text_processor = TextProcessingService()
-        self.file_service = FileProcessingService()
-        self.user_preferences_service = UserPreferencesService()
-        self.cateline_lacet_gpt = CatelinaLacetGPT()
->>>>>>> main
+        self.data_service = data_service  # Persistência opcional das perguntas e respostas
+        self.titulo = f"Catelina Lacet - Bem-vindo, {usuario.nome}!"
+
+        # Inicializando os serviços (os não informados usam os padrões da aplicação)
+        self.text_processor = text_processor or TextProcessingService()
+        # Sem o GPT-4 (falha ou disjuntor aberto), responde com o classificador local
+        self.gpt_service = gpt_service or GPTService(cliente=obter_cliente_compartilhado(),
+                                                     cache=obter_cache_compartilhado(),
+                                                     fallback_local=self.text_processor.gerar_resposta_local)
+        self.file_service = FileProcessingService(cache=ExtractionCache(EXTRACTION_CACHE_DIR),
+                                                  limite_paginas_paralelo=LIMITE_PAGINAS_PARALELO)
+        self.user_preferences_service = UserPreferencesService(session) if session is not None else None
+        self.cateline_lacet_gpt = catelina_lacet or CatelinaLacetGPT()
+
+        # Cada mensagem da conversa é um item de texto próprio; o streaming atualiza só o seu item
+        self._mensagens = itertools.count()
 
         # Variáveis para armazenar dados do usuário
         self.file_data = None
@@ -41,9 +54,12 @@ class MainWindow:
         # Inicializando a interface de usuário
         self.setup_ui()
 
+        # Com a janela montada, carrega os modelos do fallback local em segundo plano
+        self.text_processor.models.aquecer()
+
     def setup_ui(self):
         # Definindo a janela principal
-        with window(f"Catelina Lacet - Bem-vindo, {self.usuario.nome}!", width=1000, height=800):
+        with window(self.titulo, width=1000, height=800):
             # Layout superior com imagem, botão de humor e logo
             with group(horizontal=True):
                 add_image("Cath Image", "assets/img/cath.png", width=80, height=80)
@@ -52,19 +68,9 @@ class MainWindow:
                 add_button("Mudar Humor", callback=self.cycle_humor)
                 add_same_line()
 
-<<<<<<< HEAD
-        # Imagem cath.png no canto esquerdo
-        self.cath_image = QLabel()
-        pixmap_cath = QPixmap("assets/img/cath.png")
-        self.cath_image.setPixmap(pixmap_cath)
-        self.cath_image.setFixedSize(80, 80)
-        self.cath_image.setScaledContents(True)
-        top_layout.addWidget(self.cath_image, alignment=Qt.AlignLeft)
-=======
                 # Adiciona o ícone de humor correspondente
                 add_image("Humor Icon", self.get_humor_icon(), width=40, height=40)
                 add_same_line()
->>>>>>> main
 
                 # Logo da aplicação
                 add_image("Logo", "assets/LOGO-BRANCA.PNG", width=120, height=40)
@@ -73,8 +79,9 @@ class MainWindow:
             add_text(f"Catelina Lacet: {self.get_dynamic_welcome_message()}", color=[233, 69, 96], wrap=800)
             add_separator()
 
-            # Campo de exibição de resultados (listbox atualizado para ser usado com set_value)
-            add_listbox("result_display", items=[], height=300, width=900)
+            # Conversa: uma área rolável com um item de texto por mensagem
+            with child("conversa", height=300, width=900):
+                pass
 
             # Campo de entrada de texto
             add_input_text("input_field", hint="Digite sua pergunta para a Catelina Lacet...", width=700)
@@ -88,120 +95,48 @@ class MainWindow:
 
     def enviar_pergunta(self, sender, data):
         """
-<<<<<<< HEAD
-        )
-        self.humor_button.clicked.connect(self.cycle_humor)
-
-        # Adiciona o botão ao layout, à direita
-        top_layout.addWidget(self.humor_button, alignment=Qt.AlignRight)
-
-        # Logo no canto direito
-        self.logo = QLabel()
-        pixmap_logo = QPixmap("assets/LOGO-BRANCA.PNG")
-        self.logo.setPixmap(pixmap_logo)
-        self.logo.setFixedSize(120, 40)
-        self.logo.setScaledContents(True)
-
-        # Adiciona a logo ao layout, à direita, após o botão
-        top_layout.addWidget(self.logo, alignment=Qt.AlignRight)
-
-        # Adiciona o layout superior ao layout principal
-        layout.addLayout(top_layout)
-
-        # Área de texto de conversas com rolagem
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        self.result_display = QTextEdit()
-        self.result_display.setReadOnly(True)
-        self.result_display.setStyleSheet(
-            "background-color: #2E2E2E; color: #F9F3F3; font-size: 16px; padding: 10px;"
-        )
-        scroll_area.setWidget(self.result_display)
-        layout.addWidget(scroll_area)
-
-        # Primeira mensagem de boas-vindas da IA
-        self.result_display.append(
-            f"<p style='color: #E94560;'>Catelina Lacet: {self.get_dynamic_welcome_message()}</p>"
-        )
-
-        # Campo de input de texto
-        input_layout = QHBoxLayout()
-        self.input_field = QLineEdit(self)
-        self.input_field.setPlaceholderText(
-            "Digite sua pergunta para a Catelina Lacet..."
-        )
-        self.input_field.setStyleSheet(
-            "font-size: 16px; padding: 10px; background-color: #FFE3E3; color: #2C003E;"
-        )
-        self.input_field.setMinimumHeight(60)
-        input_layout.addWidget(self.input_field)
-
-        # Botão de enviar pergunta
-        self.send_button = QPushButton()
-        self.send_button.setIcon(QIcon(qtawesome.icon("fa.paper-plane", color="black")))
-        self.send_button.setIconSize(QSize(30, 30))
-        self.send_button.setStyleSheet(
-            "background-color: #6A0572; border-radius: 8px; color: #F9F3F3;"
-        )
-        self.send_button.clicked.connect(self.enviar_pergunta)
-        input_layout.addWidget(self.send_button)
-
-        # Botão de upload de arquivo
-        self.upload_button = QPushButton()
-        self.upload_button.setIcon(QIcon(qtawesome.icon("fa.upload", color="black")))
-        self.upload_button.setIconSize(QSize(30, 30))
-        self.upload_button.setStyleSheet(
-            "background-color: #6A0572; border-radius: 8px; color: #F9F3F3;"
-        )
-        self.upload_button.clicked.connect(self.upload_file)
-        input_layout.addWidget(self.upload_button)
-
-        layout.addLayout(input_layout)
-
-        # Definir o widget central
-        central_widget = QWidget()
-        central_widget.setLayout(layout)
-        self.setCentralWidget(central_widget)
-
-    def apply_styles(self):
-=======
-        Envia a pergunta para o TextProcessingService e depois recebe a resposta final do Catelina Lacet.
->>>>>>> main
+        Envia a pergunta ao GPT-4 em modo streaming e exibe a resposta da Catelina Lacet
+        à medida que os trechos chegam, sem bloquear a janela.
         """
         prompt = get_value("input_field")
+        set_value("input_field", "")
+
+        self._adicionar_mensagem(f"Você: {prompt}")
+        mensagem = self._adicionar_mensagem("Catelina Lacet: ")
+        threading.Thread(target=self._transmitir_resposta, args=(prompt, mensagem), daemon=True).start()
+
+    def _transmitir_resposta(self, prompt, mensagem):
+        """
+        Consome o stream da resposta (em uma thread separada) e atualiza só o item da mensagem
+        reservado para ela; novas perguntas criam os seus próprios itens.
+        """
+        resposta = ""
+        ultima_atualizacao = 0.0
         try:
-            # Envia o texto para o serviço de processamento de texto
-            analysis = self.text_processor.analyze_text(prompt)
-
-            # Exibe a pergunta e o resultado da análise de texto
-            result_list = get_value("result_display")
-            result_list.append(f"Você: {prompt}")
-            set_value("result_display", result_list)
-
-            # Solicita a resposta final da Catelina Lacet
-            resposta = self.cateline_lacet_gpt.generate_response(prompt, analysis)
-
-            if resposta:
-<<<<<<< HEAD
-                self.result_display.append(
-                    f"<p style='color: #E94560;'>Catelina Lacet: {resposta}</p>"
-                )
-                
-                # Salva o prompt e a resposta no banco de dados usando o data_service
+            tokens = self.gpt_service.transmitir_prompt(prompt)
+            for trecho in self.cateline_lacet_gpt.generate_response_stream(tokens):
+                resposta += trecho
+                agora = time.monotonic()
+                if agora - ultima_atualizacao >= INTERVALO_ATUALIZACAO_STREAM:
+                    self._atualizar_mensagem(mensagem, f"Catelina Lacet: {resposta}")
+                    ultima_atualizacao = agora
+            self._atualizar_mensagem(mensagem, f"Catelina Lacet: {resposta}")
+
+            # Salva o prompt e a resposta no banco de dados usando o data_service
+            if self.data_service is not None:
                 self.data_service.save_prompt_and_response(prompt, resposta)
 
-=======
-                result_list.append(f"Catelina Lacet: {resposta}")
->>>>>>> main
-            else:
-                result_list.append("Erro ao processar sua pergunta. Tente novamente mais tarde.")
-            
-            set_value("result_display", result_list)
-
         except Exception as e:
-            result_list.append(f"Erro: {str(e)}")
-            set_value("result_display", result_list)
-        set_value("input_field", "")
+            self._atualizar_mensagem(mensagem, f"Erro: {str(e)}")
+
+    def _adicionar_mensagem(self, texto):
+        """Cria o item de texto de uma nova mensagem na conversa e retorna o seu nome."""
+        nome = f"mensagem_{next(self._mensagens)}"
+        add_text(nome, default_value=texto, parent="conversa", wrap=880)
+        return nome
+
+    def _atualizar_mensagem(self, nome, texto):
+        set_value(nome, texto)
 
     def upload_file(self, sender, data):
         """
@@ -218,22 +153,16 @@ class MainWindow:
         file_path = data[0]
         if file_path:
             try:
-                file_type = file_path.split(".")[-1].lower()
-                with open(file_path, "rb") as f:
-                    self.file_data = f.read()
-
-                # Envia o arquivo para o FileProcessingService
-                self.file_service.processar_arquivo(self.file_data, file_type)
+                extensao = file_path.split(".")[-1].lower()
+                file_type = TIPOS_ARQUIVO.get(extensao, extensao)
+                # Envia o caminho para o FileProcessingService, que lê o arquivo mapeado em memória
+                self.file_data = self.file_service.processar_arquivo(file_path, file_type)
 
                 # Exibe a confirmação do upload
-                result_list = get_value("result_display")
-                result_list.append("Arquivo enviado com sucesso. Processamento em andamento...")
-                set_value("result_display", result_list)
+                self._adicionar_mensagem("Arquivo enviado com sucesso. Processamento em andamento...")
 
             except Exception as e:
-                result_list = get_value("result_display")
-                result_list.append(f"Erro ao enviar o arquivo: {str(e)}")
-                set_value("result_display", result_list)
+                self._adicionar_mensagem(f"Erro ao enviar o arquivo: {str(e)}")
 
     def cycle_humor(self, sender, data):
         """Troca o humor e atualiza o ícone e a mensagem de boas-vindas."""
@@ -241,9 +170,7 @@ class MainWindow:
         humor_message = self.get_dynamic_welcome_message()
 
         # Atualiza a mensagem e o ícone
-        result_list = get_value("result_display")
-        result_list.append(f"Catelina Lacet: {humor_message}")
-        set_value("result_display", result_list)
+        self._adicionar_mensagem(f"Catelina Lacet: {humor_message}")
 
         delete_item("Humor Icon")
         add_image("Humor Icon", self.get_humor_icon(), width=40, height=40)
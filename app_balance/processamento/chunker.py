@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Divisão de textos extraídos em blocos limitados por tokens para envio ao GPT."""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Média de caracteres por token usada quando o tiktoken não está instalado
+CARACTERES_POR_TOKEN = 4
+
+
+class DocumentChunker:
+    """
+    Divide textos de documentos em blocos ("chunks") com orçamento de tokens.
+
+    Os cortes respeitam parágrafos e páginas; só parágrafos maiores que o orçamento são
+    quebrados, nas linhas ou entre palavras. Os últimos parágrafos de um bloco são repetidos no início
+    do seguinte, até `sobreposicao` tokens, para preservar o contexto entre requisições.
+    """
+
+    def __init__(self, max_tokens: int = 1500, sobreposicao: int = 100, modelo: str = "gpt-4"):
+        """
+        Args:
+            max_tokens (int): Tokens máximos por bloco.
+            sobreposicao (int): Tokens repetidos do bloco anterior no início do próximo.
+            modelo (str): Modelo usado para escolher o tokenizador do tiktoken.
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens deve ser positivo.")
+        if not 0 <= sobreposicao < max_tokens:
+            raise ValueError("A sobreposição deve ser menor que max_tokens.")
+        self.max_tokens = max_tokens
+        self.sobreposicao = sobreposicao
+        self._encoder = None
+        if tiktoken is not None:
+            try:
+                self._encoder = tiktoken.encoding_for_model(modelo)
+            except KeyError:
+                self._encoder = tiktoken.get_encoding("cl100k_base")
+        else:
+            logging.info("tiktoken não instalado; tokens estimados pelo número de caracteres.")
+
+    def contar_tokens(self, texto: str) -> int:
+        """Conta (ou estima, sem tiktoken) os tokens de um texto."""
+        if self._encoder is not None:
+            return len(self._encoder.encode(texto))
+        return -(-len(texto) // CARACTERES_POR_TOKEN)
+
+    def dividir_texto(self, texto: str, arquivo: Optional[str] = None) -> List[Dict]:
+        """
+        Divide um texto único (por exemplo, a saída de `processar_arquivo_docx`).
+
+        Args:
+            texto (str): Texto a dividir.
+            arquivo (str, opcional): Nome do arquivo de origem, copiado para os metadados.
+
+        Returns:
+            list: Blocos no formato de `dividir_paginas`, com página 1.
+        """
+        return self.dividir_paginas([(1, texto)], arquivo)
+
+    def dividir_paginas(self, paginas: Iterable[Tuple[int, str]], arquivo: Optional[str] = None) -> List[Dict]:
+        """
+        Divide páginas (por exemplo, de `FileProcessingService.iterar_paginas_pdf`) em blocos.
+
+        Args:
+            paginas (iterable): Pares (número da página, texto).
+            arquivo (str, opcional): Nome do arquivo de origem, copiado para os metadados.
+
+        Returns:
+            list: Dicionários com 'indice', 'texto', 'tokens', 'arquivo', 'pagina_inicial' e 'pagina_final'.
+        """
+        chunks = []
+        atual: List[Tuple[int, str, int]] = []
+        tokens_atual = 0
+
+        for unidade in self._unidades(paginas):
+            custo = unidade[2] + (1 if atual else 0)
+            if atual and tokens_atual + custo > self.max_tokens:
+                chunks.append(self._montar_chunk(atual, arquivo, len(chunks)))
+                atual = self._sobreposicao(atual, unidade[2])
+                tokens_atual = sum(tokens for _, _, tokens in atual) + max(len(atual) - 1, 0)
+                custo = unidade[2] + (1 if atual else 0)
+            atual.append(unidade)
+            tokens_atual += custo
+
+        if atual:
+            chunks.append(self._montar_chunk(atual, arquivo, len(chunks)))
+        return chunks
+
+    def _unidades(self, paginas: Iterable[Tuple[int, str]]):
+        """Gera (página, parágrafo, tokens), quebrando parágrafos maiores que o orçamento."""
+        for numero, texto in paginas:
+            for paragrafo in re.split(r"\n\s*\n", texto or ""):
+                paragrafo = paragrafo.strip()
+                if not paragrafo:
+                    continue
+                tokens = self.contar_tokens(paragrafo)
+                if tokens <= self.max_tokens:
+                    yield numero, paragrafo, tokens
+                    continue
+                for parte in self._quebrar_paragrafo(paragrafo):
+                    yield numero, parte, self.contar_tokens(parte)
+
+    def _quebrar_paragrafo(self, paragrafo: str) -> List[str]:
+        """Quebra um parágrafo grande nas quebras de linha ou, se alguma linha não couber, entre palavras."""
+        linhas = paragrafo.split("\n")
+        if all(self.contar_tokens(linha) <= self.max_tokens for linha in linhas):
+            return self._agrupar(linhas, "\n")
+        return self._agrupar(paragrafo.split(), " ")
+
+    def _agrupar(self, pedacos: List[str], separador: str) -> List[str]:
+        partes, atual, tokens = [], [], 0
+        for pedaco in pedacos:
+            tokens_pedaco = self.contar_tokens(separador + pedaco)
+            if atual and tokens + tokens_pedaco > self.max_tokens:
+                partes.append(separador.join(atual))
+                atual, tokens = [], 0
+            atual.append(pedaco)
+            tokens += tokens_pedaco
+        if atual:
+            partes.append(separador.join(atual))
+        return partes
+
+    def _sobreposicao(self, unidades: List[Tuple[int, str, int]], tokens_proxima: int) -> List[Tuple[int, str, int]]:
+        """Seleciona as últimas unidades do bloco que cabem na sobreposição e ao lado da próxima."""
+        limite = min(self.sobreposicao, self.max_tokens - tokens_proxima - 1)
+        selecionadas, tokens = [], 0
+        for unidade in reversed(unidades):
+            if tokens + unidade[2] + 1 > limite:
+                break
+            selecionadas.insert(0, unidade)
+            tokens += unidade[2] + 1
+        return selecionadas
+
+    def _montar_chunk(self, unidades: List[Tuple[int, str, int]], arquivo: Optional[str], indice: int) -> Dict:
+        texto = "\n\n".join(paragrafo for _, paragrafo, _ in unidades)
+        return {
+            'indice': indice,
+            'texto': texto,
+            'tokens': self.contar_tokens(texto),
+            'arquivo': arquivo,
+            'pagina_inicial': unidades[0][0],
+            'pagina_final': unidades[-1][0],
+        }
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Manifesto para reindexação incremental de diretórios de documentos."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app_balance.processamento.extraction_cache import ExtractionCache
+
+# Extrator usado na sincronização: recebe pares (tipo, caminho) e gera (caminho, texto ou None)
+Extrator = Callable[[List[Tuple[str, str]]], Iterable[Tuple[str, Optional[str]]]]
+
+# Limite padrão do diretório de textos do manifesto (textos removidos são extraídos de novo)
+TAMANHO_TEXTOS = 1024 * 1024 * 1024
+
+
+def calcular_hash_arquivo(caminho: str, tamanho_bloco: int = 1024 * 1024) -> str:
+    """Calcula o SHA-256 de um arquivo lendo-o em blocos."""
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+
+class DocumentManifest:
+    """
+    Registro em JSON dos documentos já extraídos (caminho, tipo, tamanho, mtime e hash).
+
+    Os textos não ficam no manifesto: cada um é gravado uma única vez em um `ExtractionCache`,
+    endereçado pelo hash do arquivo, de modo que uma sincronização só grava os textos
+    extraídos nela e reescreve o manifesto (pequeno) apenas se algo mudou.
+
+    Na sincronização, arquivos com tamanho e mtime iguais aos do manifesto são reaproveitados
+    sem leitura; os demais têm o hash recalculado e só são extraídos se não houver texto no
+    cache para esse conteúdo. Entradas de arquivos que deixaram de existir são descartadas.
+    """
+
+    def __init__(self, caminho: str, versao_extrator: str = "1", textos: Optional[ExtractionCache] = None):
+        """
+        Args:
+            caminho (str): Arquivo JSON do manifesto.
+            versao_extrator (str): Versão dos extratores; um manifesto de outra versão é descartado.
+            textos (ExtractionCache, opcional): Onde os textos são guardados; padrão: o diretório
+                `<manifesto>.textos` ao lado do manifesto.
+        """
+        self.caminho = caminho
+        self.versao_extrator = versao_extrator
+        self.textos = textos or ExtractionCache(os.path.splitext(caminho)[0] + '.textos', tamanho_maximo=TAMANHO_TEXTOS)
+        self.entradas: Dict[str, Dict] = {}
+        self._alterado = False
+        self._carregar()
+
+    def _carregar(self) -> None:
+        if not os.path.exists(self.caminho):
+            return
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as arquivo:
+                conteudo = json.load(arquivo)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Manifesto ilegível ignorado ({self.caminho}): {str(e)}")
+            return
+        if conteudo.get('versao_extrator') != self.versao_extrator:
+            return
+        self.entradas = conteudo.get('arquivos', {})
+        # Manifestos antigos guardavam o texto em cada entrada: move os textos para o cache
+        for entrada in self.entradas.values():
+            if 'texto' in entrada:
+                self.textos.armazenar(self._chave_texto(entrada), entrada.pop('texto'))
+                self._alterado = True
+
+    def salvar(self) -> None:
+        """Grava o manifesto de forma atômica."""
+        diretorio = os.path.dirname(os.path.abspath(self.caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            json.dump({'versao_extrator': self.versao_extrator, 'arquivos': self.entradas}, arquivo, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+        self._alterado = False
+
+    def _chave_texto(self, entrada: Dict) -> str:
+        return f"{entrada['hash']}-{entrada['tipo']}-{self.versao_extrator}"
+
+    def detectar_alteracoes(self, documentos: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], Dict[str, Dict]]:
+        """
+        Compara os documentos atuais com o manifesto e remove as entradas de arquivos apagados.
+
+        Args:
+            documentos (list): Pares (tipo, caminho) presentes nos diretórios.
+
+        Returns:
+            tuple: Documentos a extrair (novos ou alterados cujo conteúdo não tem texto no cache)
+                e os metadados calculados para cada um deles.
+        """
+        pendentes = []
+        metadados = {}
+        for tipo, caminho in documentos:
+            info = os.stat(caminho)
+            entrada = self.entradas.get(caminho)
+            if entrada and not self.textos.contem(self._chave_texto(entrada)):
+                entrada = None
+            if entrada and entrada['tamanho'] == info.st_size and entrada['mtime'] == info.st_mtime_ns:
+                continue
+
+            hash_arquivo = calcular_hash_arquivo(caminho)
+            if entrada and entrada['hash'] == hash_arquivo:
+                entrada.update(tamanho=info.st_size, mtime=info.st_mtime_ns)
+                self._alterado = True
+                continue
+
+            metadados_arquivo = {'tipo': tipo, 'tamanho': info.st_size, 'mtime': info.st_mtime_ns, 'hash': hash_arquivo}
+            if self.textos.contem(self._chave_texto(metadados_arquivo)):
+                # Mesmo conteúdo de um documento já extraído (cópia ou arquivo restaurado)
+                self.entradas[caminho] = metadados_arquivo
+                self._alterado = True
+                continue
+            pendentes.append((tipo, caminho))
+            metadados[caminho] = metadados_arquivo
+
+        atuais = {caminho for _, caminho in documentos}
+        for caminho in set(self.entradas) - atuais:
+            del self.entradas[caminho]
+            self._alterado = True
+
+        return pendentes, metadados
+
+    def sincronizar(self, documentos: List[Tuple[str, str]], extrair: Extrator) -> Dict[str, Dict[str, str]]:
+        """
+        Extrai apenas os documentos novos ou alterados, grava os seus textos e, se algo mudou, o manifesto.
+
+        Args:
+            documentos (list): Pares (tipo, caminho) presentes nos diretórios.
+            extrair (callable): Recebe os pendentes e gera (caminho, texto); texto None indica falha.
+
+        Returns:
+            dict: Textos de todos os documentos no formato {'pdfs': {...}, 'docxs': {...}}.
+        """
+        pendentes, metadados = self.detectar_alteracoes(documentos)
+        logging.info(f"Manifesto: {len(pendentes)} de {len(documentos)} documentos para extrair.")
+
+        extraidos = {}
+        for caminho, texto in extrair(pendentes):
+            if texto is None:
+                # Mantém o arquivo fora do manifesto para que seja tentado de novo na próxima varredura
+                self._alterado |= self.entradas.pop(caminho, None) is not None
+                continue
+            self.entradas[caminho] = metadados[caminho]
+            self.textos.armazenar(self._chave_texto(metadados[caminho]), texto)
+            extraidos[caminho] = texto
+            self._alterado = True
+
+        if self._alterado:
+            self.salvar()
+        return self.resultado(extraidos)
+
+    def resultado(self, conhecidos: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Monta o dicionário de textos por tipo, indexado pelo nome do arquivo, lendo do cache os
+        textos que não estão em `conhecidos` (caminho -> texto).
+        """
+        conhecidos = conhecidos or {}
+        resultado = {'pdfs': {}, 'docxs': {}}
+        for caminho, entrada in self.entradas.items():
+            texto = conhecidos.get(caminho)
+            if texto is None:
+                texto = self.textos.obter(self._chave_texto(entrada))
+            if texto is None:
+                logging.warning(f"Texto de {caminho} não está mais no cache; será extraído na próxima sincronização.")
+                continue
+            resultado[entrada['tipo'] + 's'][os.path.basename(caminho)] = texto
+        return resultado
@@ -3,10 +3,17 @@
 Serviço para processamento de documentos PDF e DOCX.
 """
 
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterator, List, Tuple
+import logging
 import os
 from PyPDF2 import PdfReader
-from docx import Document
+from app_balance.processamento.pdf_pages import iterar_paginas
+from app_balance.processamento.document_manifest import DocumentManifest
+from app_balance.processamento.docx_stream import extrair_docx
+
+# Versão dos extratores deste serviço (PyPDF2 e docx_stream); incrementar quando o texto
+# extraído mudar, para que os manifestos existentes sejam descartados e os documentos reextraídos
+VERSAO_EXTRATOR = "1"
 
 class DocumentService:
     """
@@ -18,17 +25,31 @@ class DocumentService:
         self.docx_directory = docx_directory
 
     def read_pdf(self, file_path: str) -> str:
+        return "".join(text for _, text in self.iter_pdf_pages(file_path))
+
+    def iter_pdf_pages(self, file_path: str, start_page: int = 1, end_page: Optional[int] = None,
+                       max_pages: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Gera (número da página, texto) para cada página do PDF no intervalo pedido.
+        """
         if not os.path.exists(file_path) or not file_path.endswith('.pdf'):
             raise ValueError(f"Arquivo inválido ou inexistente: {file_path}")
         reader = PdfReader(file_path)
-        text = "".join([page.extract_text() for page in reader.pages])
-        return text
+        yield from iterar_paginas(reader, start_page, end_page, max_pages)
 
     def read_docx(self, file_path: str) -> str:
+        return self._read_docx_stream(file_path)[0]
+
+    def read_docx_tables(self, file_path: str) -> Dict[str, List[Dict]]:
+        """
+        Retorna as tabelas do DOCX como registros ({'Tabela1': [...]}), com a primeira linha como cabeçalho.
+        """
+        return self._read_docx_stream(file_path)[1]
+
+    def _read_docx_stream(self, file_path: str):
         if not os.path.exists(file_path) or not file_path.endswith('.docx'):
             raise ValueError(f"Arquivo inválido ou inexistente: {file_path}")
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return extrair_docx(file_path)
 
     def process_all_pdfs(self) -> Dict[str, str]:
         if not self.pdf_directory:
@@ -44,7 +65,30 @@ class DocumentService:
                       for filename in os.listdir(self.docx_directory) if filename.endswith('.docx')}
         return docx_texts
 
-    def process_all_documents(self) -> Dict[str, Dict[str, str]]:
+    def list_documents(self) -> List[Tuple[str, str]]:
+        documents = []
+        for doc_type, directory in (('pdf', self.pdf_directory), ('docx', self.docx_directory)):
+            if directory:
+                documents.extend((doc_type, os.path.join(directory, filename))
+                                 for filename in os.listdir(directory) if filename.endswith('.' + doc_type))
+        return documents
+
+    def process_all_documents(self, manifest_path: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Processa todos os documentos; com `manifest_path`, extrai apenas os novos ou alterados.
+        """
+        if manifest_path:
+            return DocumentManifest(manifest_path, VERSAO_EXTRATOR).sincronizar(self.list_documents(),
+                                                                                self._extract_documents)
         pdfs = self.process_all_pdfs() if self.pdf_directory else {}
         docxs = self.process_all_docxs() if self.docx_directory else {}
         return {'pdfs': pdfs, 'docxs': docxs}
+
+    def _extract_documents(self, documents: List[Tuple[str, str]]):
+        for doc_type, file_path in documents:
+            try:
+                text = self.read_pdf(file_path) if doc_type == 'pdf' else self.read_docx(file_path)
+            except Exception as e:
+                logging.error(f"Erro ao processar {file_path}: {str(e)}")
+                text = None
+            yield file_path, text
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Leitura incremental de arquivos DOCX, com parágrafos e tabelas, sem o modelo do python-docx."""
+
+import re
+import zipfile
+from typing import Any, Dict, Iterator, List, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+PARAGRAFO, TABELA, LINHA, CELULA, CORPO = W + 'p', W + 'tbl', W + 'tr', W + 'tc', W + 'body'
+TEXTO, TAB, QUEBRAS = W + 't', W + 'tab', (W + 'br', W + 'cr')
+
+# Elementos de primeiro nível do corpo após os quais a árvore parcial é descartada
+ELEMENTOS_CORPO = (PARAGRAFO, TABELA, W + 'sdt')
+
+# Item gerado por `iterar_docx`: ('paragrafo', texto) ou ('linha', índice da tabela, células)
+ItemDocx = Union[Tuple[str, str], Tuple[str, int, List[str]]]
+
+
+def _texto_paragrafo(paragrafo) -> str:
+    partes = []
+    for elemento in paragrafo.iter():
+        if elemento.tag == TEXTO:
+            partes.append(elemento.text or '')
+        elif elemento.tag == TAB:
+            partes.append('\t')
+        elif elemento.tag in QUEBRAS:
+            partes.append('\n')
+    return ''.join(partes)
+
+
+def iterar_docx(arquivo) -> Iterator[ItemDocx]:
+    """Percorre `word/document.xml` incrementalmente, na ordem do documento.
+
+    Parágrafos do corpo geram ('paragrafo', texto); cada linha de tabela gera
+    ('linha', índice da tabela, [texto das células]). Tabelas aninhadas são achatadas no
+    texto da célula que as contém. A árvore XML é descartada após cada elemento do corpo,
+    então a memória usada é proporcional ao maior parágrafo ou tabela, não ao documento.
+
+    Args:
+        arquivo: Caminho ou objeto de arquivo binário posicionável do DOCX.
+
+    Yields:
+        tuple: Itens do documento, conforme descrito acima.
+    """
+    with zipfile.ZipFile(arquivo) as pacote, pacote.open('word/document.xml') as xml:
+        corpo = None
+        profundidade_tabela = 0
+        indice_tabela = -1
+        celulas: List[str] = []
+        paragrafos_celula: List[str] = []
+
+        for evento, elemento in iterparse(xml, events=('start', 'end')):
+            tag = elemento.tag
+            if evento == 'start':
+                if tag == CORPO:
+                    corpo = elemento
+                elif tag == TABELA:
+                    profundidade_tabela += 1
+                    if profundidade_tabela == 1:
+                        indice_tabela += 1
+                continue
+
+            if tag == PARAGRAFO:
+                texto = _texto_paragrafo(elemento)
+                if profundidade_tabela == 0:
+                    yield 'paragrafo', texto
+                else:
+                    paragrafos_celula.append(texto)
+                elemento.clear()
+            elif tag == CELULA and profundidade_tabela == 1:
+                celulas.append('\n'.join(paragrafos_celula))
+                paragrafos_celula = []
+            elif tag == LINHA and profundidade_tabela == 1:
+                yield 'linha', indice_tabela, celulas
+                celulas = []
+            elif tag == TABELA:
+                profundidade_tabela -= 1
+
+            if profundidade_tabela == 0 and tag in ELEMENTOS_CORPO and corpo is not None:
+                corpo.clear()
+
+
+# Inteiro com pontos de milhar no formato brasileiro ("1.500", "1.234.567")
+MILHARES = re.compile(r'-?\d{1,3}(\.\d{3})+')
+
+
+def converter_valor(texto: str) -> Any:
+    """Converte o texto de uma célula em número quando possível ("R$ 1.234,56" -> 1234.56, "R$ 1.500" -> 1500.0)."""
+    valor = re.sub(r'^R\$\s*|\s', '', texto.strip())
+    if ',' in valor:
+        valor = valor.replace('.', '').replace(',', '.')
+    elif MILHARES.fullmatch(valor):
+        valor = valor.replace('.', '')
+    try:
+        return float(valor)
+    except ValueError:
+        return texto
+
+
+def linhas_para_registros(linhas: List[List[str]]) -> List[Dict[str, Any]]:
+    """Converte as linhas de uma tabela em registros, usando a primeira linha como cabeçalho."""
+    if not linhas:
+        return []
+    cabecalho = [coluna.strip() or f'Coluna{i + 1}' for i, coluna in enumerate(linhas[0])]
+    return [
+        {coluna: converter_valor(celula) for coluna, celula in zip(cabecalho, linha)}
+        for linha in linhas[1:]
+    ]
+
+
+def extrair_docx(arquivo) -> Tuple[str, Dict[str, List[Dict[str, Any]]]]:
+    """Extrai em uma única passada o texto e as tabelas de um DOCX.
+
+    As linhas de tabela entram no texto separadas por tabulação, na posição em que aparecem.
+    As tabelas também são devolvidas como registros ({'Tabela1': [...], ...}), no mesmo
+    formato das planilhas Excel em 'records', para que `PromptService.processar_planilhas`
+    possa agregá-las.
+
+    Args:
+        arquivo: Caminho ou objeto de arquivo binário posicionável do DOCX.
+
+    Returns:
+        tuple: (texto do documento, tabelas como registros).
+    """
+    linhas_texto: List[str] = []
+    tabelas: Dict[int, List[List[str]]] = {}
+    for item in iterar_docx(arquivo):
+        if item[0] == 'paragrafo':
+            linhas_texto.append(item[1])
+        else:
+            _, indice, celulas = item
+            tabelas.setdefault(indice, []).append(celulas)
+            linhas_texto.append('\t'.join(celulas))
+
+    registros = {f'Tabela{indice + 1}': linhas_para_registros(linhas) for indice, linhas in tabelas.items()}
+    return '\n'.join(linhas_texto), registros
@@ -3,24 +3,74 @@
 
 import pandas as pd
 
-def process_excel_file(file):
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Formatos de saída suportados para as planilhas
+FORMATOS_SAIDA = ('records', 'dataframe', 'arrow')
+
+
+def convert_sheets(sheets, output='records'):
+    """Converte as planilhas lidas pelo pandas para o formato de saída pedido.
+
+    Args:
+        sheets (dict): Dicionário {nome da planilha: DataFrame}.
+        output (str): 'records' (lista de dicionários), 'dataframe' ou 'arrow' (pyarrow.Table).
+
+    Returns:
+        dict: Planilhas no formato pedido.
+    """
+    if output == 'dataframe':
+        return sheets
+    if output == 'arrow':
+        return {name: pa.Table.from_pandas(df, preserve_index=False) for name, df in sheets.items()}
+    return {name: df.to_dict(orient='records') for name, df in sheets.items()}
+
+
+def validate_output(output):
+    """Valida o formato de saída e a disponibilidade do pyarrow."""
+    if output not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída inválido: {output}. Use um de {FORMATOS_SAIDA}.")
+    if output == 'arrow' and pa is None:
+        raise ImportError("O formato 'arrow' requer o pacote 'pyarrow'. Instale-o com 'pip install pyarrow'.")
+
+
+def read_sheets(file, sheet_name=None, usecols=None):
+    """Lê as planilhas selecionadas de um arquivo Excel, sempre como dicionário.
+
+    Args:
+        file: Caminho ou objeto de arquivo do Excel.
+        sheet_name (str | int | list, opcional): Planilha(s) a ler. Padrão: todas.
+        usecols (list | str | callable, opcional): Colunas a carregar (projeção do pandas).
+
+    Returns:
+        dict: Dicionário {nome da planilha: DataFrame}.
+    """
+    if isinstance(sheet_name, (str, int)):
+        sheet_name = [sheet_name]
+    return pd.read_excel(file, sheet_name=sheet_name, usecols=usecols)
+
+
+def process_excel_file(file, output='records', sheet_name=None, usecols=None):
     """Lê um arquivo Excel e retorna os dados em formato JSON.
 
     Args:
         file (FileStorage): O arquivo Excel enviado.
+        output (str): 'records' (padrão), 'dataframe' ou 'arrow'.
+        sheet_name (str | int | list, opcional): Planilha(s) a ler. Padrão: todas.
+        usecols (list | str | callable, opcional): Colunas a carregar.
 
     Returns:
-        list: Lista de dicionários representando os dados das planilhas.
+        dict: Dados de cada planilha no formato pedido (por padrão, listas de dicionários).
     """
     if not file.filename.endswith(('.xls', '.xlsx')):
         raise ValueError("Arquivo Excel inválido. Certifique-se de que é um arquivo .xls ou .xlsx")
+    validate_output(output)
 
     # Ler a planilha Excel
-    excel_data = pd.read_excel(file, sheet_name=None)
-
-    # Converter para JSON
-    data = {}
-    for sheet_name, sheet_data in excel_data.items():
-        data[sheet_name] = sheet_data.to_dict(orient='records')
-    
-    return data
+    excel_data = read_sheets(file, sheet_name=sheet_name, usecols=usecols)
+
+    # Converter para o formato de saída
+    return convert_sheets(excel_data, output)
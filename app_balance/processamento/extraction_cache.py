@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Cache em disco dos resultados de extração de arquivos enviados."""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+
+class ExtractionCache:
+    """
+    Cache endereçado por conteúdo para textos e planilhas extraídos.
+
+    A chave é o hash SHA-256 dos bytes do arquivo somado ao tipo e à versão do extrator,
+    de modo que reenviar o mesmo arquivo vira uma leitura de disco em vez de uma nova
+    análise com pandas/pypdf/python-docx. Cada entrada é um arquivo no diretório do cache;
+    a data de modificação marca o último acesso e as entradas menos usadas recentemente
+    são removidas quando o tamanho total passa de `tamanho_maximo`.
+    """
+
+    EXTENSAO = '.pkl'
+
+    def __init__(self, diretorio: str, tamanho_maximo: int = 256 * 1024 * 1024):
+        """
+        Args:
+            diretorio (str): Diretório onde as entradas do cache são gravadas.
+            tamanho_maximo (int): Tamanho máximo do cache em bytes.
+        """
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._tamanho_atual = sum(tamanho for _, tamanho, _ in self._listar_entradas())
+
+    @staticmethod
+    def gerar_chave(conteudo, tipo_arquivo: str, versao_extrator: str) -> str:
+        """
+        Gera a chave do cache a partir do conteúdo do arquivo e da versão do extrator.
+
+        Args:
+            conteudo: Caminho do arquivo, bytes ou qualquer objeto com protocolo de buffer
+                (memoryview, mmap). Caminhos são lidos em blocos.
+            tipo_arquivo (str): Tipo do arquivo ('excel', 'pdf', 'docx').
+            versao_extrator (str): Versão do extrator que produziu o resultado.
+
+        Returns:
+            str: Chave hexadecimal da entrada.
+        """
+        if isinstance(conteudo, (str, os.PathLike)):
+            hash_conteudo = hashlib.sha256()
+            with open(conteudo, 'rb') as arquivo:
+                for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+                    hash_conteudo.update(bloco)
+        else:
+            hash_conteudo = hashlib.sha256(conteudo)
+        hash_conteudo.update(f"|{tipo_arquivo}|{versao_extrator}".encode('utf-8'))
+        return hash_conteudo.hexdigest()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        """
+        Retorna o resultado armazenado para a chave, ou None se não houver entrada.
+        """
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as entrada:
+                valor = pickle.load(entrada)
+            os.utime(caminho, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            logging.warning(f"Entrada de cache inválida descartada ({chave}): {str(e)}")
+            self._remover(caminho)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return valor
+
+    def contem(self, chave: str) -> bool:
+        """
+        Indica se há uma entrada para a chave, sem lê-la nem contar acerto ou falha.
+        """
+        return os.path.exists(self._caminho(chave))
+
+    def armazenar(self, chave: str, valor: Any) -> None:
+        """
+        Grava o resultado de uma extração e aplica a remoção LRU se o limite for excedido.
+        """
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(dados) > self.tamanho_maximo:
+            logging.info(f"Resultado de {len(dados)} bytes excede o tamanho do cache; não armazenado.")
+            return
+
+        caminho = self._caminho(chave)
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        with os.fdopen(descritor, 'wb') as saida:
+            saida.write(dados)
+        with self._lock:
+            if os.path.exists(caminho):
+                self._tamanho_atual -= os.path.getsize(caminho)
+            os.replace(temporario, caminho)
+            self._tamanho_atual += len(dados)
+            if self._tamanho_atual > self.tamanho_maximo:
+                self._remover_menos_usados()
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna os contadores de acertos e falhas e a ocupação atual do cache.
+        """
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'taxa_acerto': self.hits / consultas if consultas else 0.0,
+                'tamanho_bytes': self._tamanho_atual,
+            }
+
+    def limpar(self) -> None:
+        """
+        Remove todas as entradas do cache.
+        """
+        with self._lock:
+            for caminho, _, _ in self._listar_entradas():
+                self._remover(caminho)
+            self._tamanho_atual = 0
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave + self.EXTENSAO)
+
+    def _listar_entradas(self):
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith(self.EXTENSAO):
+                info = entrada.stat()
+                yield entrada.path, info.st_size, info.st_mtime
+
+    def _remover_menos_usados(self) -> None:
+        entradas = sorted(self._listar_entradas(), key=lambda entrada: entrada[2])
+        self._tamanho_atual = sum(tamanho for _, tamanho, _ in entradas)
+        for caminho, tamanho, _ in entradas:
+            if self._tamanho_atual <= self.tamanho_maximo:
+                break
+            self._remover(caminho)
+            self._tamanho_atual -= tamanho
+
+    @staticmethod
+    def _remover(caminho: str) -> None:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
@@ -1,125 +1,242 @@
 import os
-import pandas as pd
-import io
-from typing import Optional, Dict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Dict, Iterator, List, Tuple, Union
 from pypdf import PdfReader
-from docx import Document
 import logging
+from app_balance.processamento.pdf_pages import iterar_paginas
+from app_balance.processamento.extraction_cache import ExtractionCache
+from app_balance.processamento.document_manifest import DocumentManifest
+from app_balance.processamento.excel_service import convert_sheets, read_sheets, validate_output
+from app_balance.processamento.file_sources import FonteArquivo, abrir_fonte, caminho_da_fonte
+from app_balance.processamento.docx_stream import extrair_docx
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 
+# Versão dos extratores; altere ao mudar o formato dos resultados para invalidar o cache
+VERSAO_EXTRATOR = "2"
+
 class FileProcessingService:
-    def __init__(self, pdf_directory: Optional[str] = None, docx_directory: Optional[str] = None):
+    def __init__(self, pdf_directory: Optional[str] = None, docx_directory: Optional[str] = None,
+                 cache: Optional[ExtractionCache] = None, limite_paginas_paralelo: Optional[int] = None,
+                 max_workers_pdf: Optional[int] = None):
         """
         Inicializa o serviço de processamento de arquivos com diretórios opcionais para PDFs e DOCXs.
 
         Args:
             pdf_directory (str, opcional): O diretório onde os PDFs estão armazenados.
             docx_directory (str, opcional): O diretório onde os DOCXs estão armazenados.
+            cache (ExtractionCache, opcional): Cache de extrações usado por `processar_arquivo`.
+            limite_paginas_paralelo (int, opcional): A partir deste número de páginas, um PDF é
+                dividido em intervalos extraídos em processos separados. Padrão (None): sem divisão
+                automática, já que subir os processos só compensa em PDFs grandes.
+            max_workers_pdf (int, opcional): Processos usados na extração de um PDF. Padrão: número de CPUs.
         """
         self.pdf_directory = pdf_directory
         self.docx_directory = docx_directory
+        self.cache = cache
+        self.limite_paginas_paralelo = limite_paginas_paralelo
+        self.max_workers_pdf = max_workers_pdf
 
-    def processar_arquivo(self, arquivo: bytes, tipo_arquivo: str) -> dict:
+    def processar_arquivo(self, arquivo: FonteArquivo, tipo_arquivo: str, formato: str = 'records',
+                          planilhas: Optional[Union[str, List[str]]] = None,
+                          colunas: Optional[List[str]] = None) -> dict:
         """
         Processa arquivos Excel, PDF ou DOCX de acordo com o tipo especificado.
 
         Args:
-            arquivo (bytes): O arquivo a ser processado.
+            arquivo (FonteArquivo): O arquivo a ser processado: caminho, bytes, memoryview ou mmap.
+                Caminhos e buffers são lidos sem cópias intermediárias do conteúdo.
             tipo_arquivo (str): O tipo do arquivo ('excel', 'pdf', 'docx').
+            formato (str): Formato das planilhas Excel ('records', 'dataframe' ou 'arrow').
+            planilhas (str | list, opcional): Planilhas Excel a carregar. Padrão: todas.
+            colunas (list, opcional): Colunas Excel a carregar. Padrão: todas.
 
         Returns:
             dict: Dados processados do arquivo.
         """
+        opcoes_excel = {'formato': formato, 'planilhas': planilhas, 'colunas': colunas}
+        if self.cache is None:
+            return self._extrair(arquivo, tipo_arquivo, opcoes_excel)
+
+        variante = f"{tipo_arquivo}:{formato}:{planilhas}:{colunas}" if tipo_arquivo == 'excel' else tipo_arquivo
+        chave = self.cache.gerar_chave(arquivo, variante, VERSAO_EXTRATOR)
+        resultado = self.cache.obter(chave)
+        if resultado is None:
+            resultado = self._extrair(arquivo, tipo_arquivo, opcoes_excel)
+            self.cache.armazenar(chave, resultado)
+        return resultado
+
+    def _extrair(self, arquivo: FonteArquivo, tipo_arquivo: str, opcoes_excel: dict) -> dict:
         if tipo_arquivo == 'excel':
-            return self.processar_arquivo_excel(arquivo)
+            return self.processar_arquivo_excel(arquivo, **opcoes_excel)
         elif tipo_arquivo == 'pdf':
             return {'texto': self.processar_arquivo_pdf(arquivo)}
         elif tipo_arquivo == 'docx':
-            return {'texto': self.processar_arquivo_docx(arquivo)}
+            return self.extrair_docx_com_tabelas(arquivo)
         else:
             raise ValueError(f"Tipo de arquivo não suportado: {tipo_arquivo}")
 
-    def processar_arquivo_excel(self, arquivo: bytes) -> dict:
+    def processar_arquivo_excel(self, arquivo: FonteArquivo, formato: str = 'records',
+                                planilhas: Optional[Union[str, List[str]]] = None,
+                                colunas: Optional[List[str]] = None) -> dict:
         """
         Processa e extrai dados de um arquivo Excel.
 
+        Os formatos 'dataframe' e 'arrow' mantêm os dados em colunas e evitam criar um
+        dicionário Python por linha, como acontece no formato 'records'.
+
         Args:
-            arquivo (bytes): O arquivo Excel em bytes.
+            arquivo (FonteArquivo): O arquivo Excel (caminho, bytes ou buffer).
+            formato (str): 'records' (lista de dicionários), 'dataframe' ou 'arrow'.
+            planilhas (str | list, opcional): Planilhas a carregar. Padrão: todas.
+            colunas (list, opcional): Colunas a carregar (`usecols` do pandas). Padrão: todas.
 
         Returns:
-            dict: Dados processados com categorias e custos.
+            dict: Dados de cada planilha no formato pedido.
         """
+        validate_output(formato)
         try:
-            with io.BytesIO(arquivo) as excel_file:
-                df = pd.read_excel(excel_file, sheet_name=None)
+            with abrir_fonte(arquivo) as excel_file:
+                df = read_sheets(excel_file, sheet_name=planilhas, usecols=colunas)
 
-            data = {}
-            for sheet_name, sheet_data in df.items():
-                data[sheet_name] = sheet_data.to_dict(orient='records')
-
-            return data
+            return convert_sheets(df, formato)
 
         except ValueError as ve:
             raise ValueError(f"Erro no formato do arquivo: {str(ve)}")
         except Exception as e:
             raise RuntimeError(f"Erro ao processar arquivo Excel: {str(e)}")
 
-    def processar_arquivo_pdf(self, arquivo: bytes) -> str:
+    def processar_arquivo_pdf(self, arquivo: FonteArquivo, paralelo: Optional[bool] = None) -> str:
         """
         Processa e extrai dados de um arquivo PDF.
 
         Args:
-            arquivo (bytes): O arquivo PDF em bytes.
+            arquivo (FonteArquivo): O arquivo PDF (caminho, bytes ou buffer).
+            paralelo (bool, opcional): Força (True) ou impede (False) a extração das páginas em
+                processos separados. Padrão: automático, conforme `limite_paginas_paralelo`.
 
         Returns:
             str: Texto extraído do arquivo PDF.
         """
         try:
-            texto_pdf = ""
-            with io.BytesIO(arquivo) as pdf_file:
+            with abrir_fonte(arquivo) as pdf_file:
                 reader = PdfReader(pdf_file)
-                for page in reader.pages:
-                    texto_pdf += page.extract_text()
+                total_paginas = len(reader.pages)
+                if paralelo is None:
+                    paralelo = (self.limite_paginas_paralelo is not None
+                                and total_paginas >= self.limite_paginas_paralelo)
+                if not paralelo or total_paginas < 2:
+                    return "".join(texto for _, texto in iterar_paginas(reader)).strip()
 
-            return texto_pdf.strip()
+            return self._extrair_pdf_em_paralelo(arquivo, total_paginas).strip()
 
         except Exception as e:
             raise RuntimeError(f"Erro ao processar arquivo PDF: {str(e)}")
 
-    def processar_arquivo_docx(self, arquivo: bytes) -> str:
+    def _extrair_pdf_em_paralelo(self, arquivo: FonteArquivo, total_paginas: int) -> str:
+        """
+        Divide o PDF em intervalos de páginas, extrai cada um em um processo e junta os
+        textos na ordem original das páginas.
+        """
+        max_workers = self.max_workers_pdf or os.cpu_count() or 1
+        tamanho_intervalo = -(-total_paginas // (max_workers * 4))
+        inicios = list(range(1, total_paginas + 1, tamanho_intervalo))
+        fins = [min(inicio + tamanho_intervalo - 1, total_paginas) for inicio in inicios]
+
+        # Os processos recebem só o caminho e mapeiam o arquivo; buffers vão para um arquivo temporário
+        logging.info(f"Extraindo {total_paginas} páginas em {len(inicios)} intervalos com {max_workers} processos.")
+        with caminho_da_fonte(arquivo, '.pdf') as caminho, \
+                ProcessPoolExecutor(max_workers=max_workers, initializer=_definir_fonte_pdf,
+                                    initargs=(caminho,)) as executor:
+            return "".join(executor.map(_extrair_intervalo_pdf, inicios, fins))
+
+    def iterar_paginas_pdf(self, arquivo: FonteArquivo, pagina_inicial: int = 1, pagina_final: Optional[int] = None,
+                           max_paginas: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Extrai o texto de um arquivo PDF página por página, à medida que cada página é lida.
+
+        Interromper a iteração (por exemplo, quando só as primeiras páginas importam
+        para o roteamento) evita a extração das páginas restantes.
+
+        Args:
+            arquivo (FonteArquivo): O arquivo PDF (caminho, bytes ou buffer).
+            pagina_inicial (int): Primeira página a extrair (base um).
+            pagina_final (int, opcional): Última página a extrair, inclusiva.
+            max_paginas (int, opcional): Número máximo de páginas a extrair.
+
+        Yields:
+            tuple: (número da página, texto da página).
+        """
+        with abrir_fonte(arquivo) as pdf_file:
+            reader = PdfReader(pdf_file)
+            yield from iterar_paginas(reader, pagina_inicial, pagina_final, max_paginas)
+
+    def processar_arquivo_docx(self, arquivo: FonteArquivo) -> str:
         """
         Processa e extrai dados de um arquivo DOCX.
 
         Args:
-            arquivo (bytes): O arquivo DOCX em bytes.
+            arquivo (FonteArquivo): O arquivo DOCX (caminho, bytes ou buffer).
+
+        Returns:
+            str: Texto extraído do arquivo DOCX, com as linhas de tabelas separadas por tabulação.
+        """
+        return self.extrair_docx_com_tabelas(arquivo)['texto']
+
+    def extrair_docx_com_tabelas(self, arquivo: FonteArquivo) -> dict:
+        """
+        Extrai texto e tabelas de um DOCX lendo `word/document.xml` de forma incremental,
+        sem montar o modelo completo do python-docx.
+
+        Args:
+            arquivo (FonteArquivo): O arquivo DOCX (caminho, bytes ou buffer).
 
         Returns:
-            str: Texto extraído do arquivo DOCX.
+            dict: {'texto': str, 'tabelas': {'Tabela1': [registros], ...}}; as tabelas usam
+            a primeira linha como cabeçalho e podem ser agregadas por `PromptService.processar_planilhas`.
         """
         try:
-            texto_docx = ""
-            with io.BytesIO(arquivo) as docx_file:
-                documento = Document(docx_file)
-                for paragrafo in documento.paragraphs:
-                    texto_docx += paragrafo.text + "\n"
+            with abrir_fonte(arquivo) as docx_file:
+                texto_docx, tabelas = extrair_docx(docx_file)
 
-            return texto_docx.strip()
+            return {'texto': texto_docx.strip(), 'tabelas': tabelas}
 
         except Exception as e:
             raise RuntimeError(f"Erro ao processar arquivo DOCX: {str(e)}")
 
-    def processar_todos_documentos(self) -> Dict[str, Dict[str, str]]:
+    def processar_todos_documentos(self, paralelo: bool = False, max_workers: Optional[int] = None,
+                                   manifesto: Optional[str] = None) -> Dict[str, Dict[str, str]]:
         """
         Processa todos os arquivos PDFs e DOCXs dos diretórios especificados.
 
+        Args:
+            paralelo (bool): Se True, distribui os arquivos entre processos de trabalho.
+            max_workers (int, opcional): Número de processos usados no modo paralelo.
+            manifesto (str, opcional): Caminho de um manifesto JSON. Quando informado, apenas
+                arquivos novos ou alterados desde a última chamada são extraídos.
+
         Returns:
             dict: Um dicionário contendo o texto de todos os PDFs e DOCXs.
+
+        Raises:
+            RuntimeError: Se algum arquivo não puder ser processado, tanto no modo serial quanto
+                no paralelo. Para continuar o lote apesar dos erros, use `processar_documentos_em_paralelo`.
         """
-        pdfs = self.processar_todos_pdfs() if self.pdf_directory else {}
-        docxs = self.processar_todos_docxs() if self.docx_directory else {}
-        return {'pdfs': pdfs, 'docxs': docxs}
+        if manifesto:
+            return self._processar_incremental(manifesto, paralelo, max_workers)
+
+        if not paralelo:
+            pdfs = self.processar_todos_pdfs() if self.pdf_directory else {}
+            docxs = self.processar_todos_docxs() if self.docx_directory else {}
+            return {'pdfs': pdfs, 'docxs': docxs}
+
+        resultado = {'pdfs': {}, 'docxs': {}}
+        for item in self.processar_documentos_em_paralelo(max_workers=max_workers):
+            if item['erro'] is not None:
+                raise RuntimeError(item['erro'])
+            resultado[item['tipo'] + 's'][item['arquivo']] = item['texto']
+        return resultado
 
     def processar_todos_pdfs(self) -> Dict[str, str]:
         """
@@ -135,8 +252,7 @@ class FileProcessingService:
         for filename in os.listdir(self.pdf_directory):
             if filename.endswith('.pdf'):
                 file_path = os.path.join(self.pdf_directory, filename)
-                with open(file_path, 'rb') as pdf_file:
-                    pdf_texts[filename] = self.processar_arquivo_pdf(pdf_file.read())
+                pdf_texts[filename] = self.processar_arquivo_pdf(file_path)
                     
         return pdf_texts
 
@@ -154,7 +270,127 @@ class FileProcessingService:
         for filename in os.listdir(self.docx_directory):
             if filename.endswith('.docx'):
                 file_path = os.path.join(self.docx_directory, filename)
-                with open(file_path, 'rb') as docx_file:
-                    docx_texts[filename] = self.processar_arquivo_docx(docx_file.read())
+                docx_texts[filename] = self.processar_arquivo_docx(file_path)
                     
         return docx_texts
+
+    def listar_documentos(self) -> List[Tuple[str, str]]:
+        """
+        Lista os documentos dos diretórios configurados.
+
+        Returns:
+            list: Pares (tipo, caminho) com tipo 'pdf' ou 'docx'.
+        """
+        documentos = []
+        for tipo, diretorio in (('pdf', self.pdf_directory), ('docx', self.docx_directory)):
+            if not diretorio:
+                continue
+            for filename in os.listdir(diretorio):
+                if filename.endswith('.' + tipo):
+                    documentos.append((tipo, os.path.join(diretorio, filename)))
+        return documentos
+
+    def _processar_incremental(self, manifesto: str, paralelo: bool, max_workers: Optional[int]) -> Dict[str, Dict[str, str]]:
+        """
+        Sincroniza o manifesto com os diretórios, extraindo só os documentos novos ou alterados.
+        """
+        def extrair(pendentes):
+            if paralelo:
+                for item in self.processar_documentos_em_paralelo(max_workers=max_workers, documentos=pendentes):
+                    yield item['caminho'], item['texto']
+                return
+            for tipo, caminho in pendentes:
+                try:
+                    yield caminho, _extrair_documento(caminho, tipo)
+                except Exception as e:
+                    logging.error(f"Erro ao processar {caminho}: {str(e)}")
+                    yield caminho, None
+
+        return DocumentManifest(manifesto, VERSAO_EXTRATOR).sincronizar(self.listar_documentos(), extrair)
+
+    def processar_documentos_em_paralelo(self, max_workers: Optional[int] = None,
+                                         max_em_andamento: Optional[int] = None,
+                                         documentos: Optional[List[Tuple[str, str]]] = None) -> Iterator[Dict[str, Optional[str]]]:
+        """
+        Processa os PDFs e DOCXs dos diretórios em um pool de processos, entregando
+        cada resultado assim que o arquivo termina.
+
+        Apenas o caminho de cada arquivo é enviado aos processos de trabalho, e no máximo
+        `max_em_andamento` arquivos ficam pendentes ao mesmo tempo, o que limita a memória
+        ocupada por resultados ainda não consumidos. Um arquivo corrompido gera um item com
+        'erro' preenchido e não interrompe o lote.
+
+        Args:
+            max_workers (int, opcional): Número de processos. Padrão: número de CPUs.
+            max_em_andamento (int, opcional): Arquivos pendentes simultâneos. Padrão: 2 * max_workers.
+            documentos (list, opcional): Pares (tipo, caminho) a processar. Padrão: `listar_documentos()`.
+
+        Yields:
+            dict: {'arquivo', 'caminho', 'tipo', 'texto', 'erro'} para cada arquivo processado.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        max_em_andamento = max(max_em_andamento or 2 * max_workers, 1)
+        pendentes_iter = iter(self.listar_documentos() if documentos is None else documentos)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            em_andamento = {}
+
+            def submeter_proximos():
+                while len(em_andamento) < max_em_andamento:
+                    proximo = next(pendentes_iter, None)
+                    if proximo is None:
+                        return
+                    tipo, caminho = proximo
+                    futuro = executor.submit(_extrair_documento, caminho, tipo)
+                    em_andamento[futuro] = (tipo, caminho)
+
+            submeter_proximos()
+            while em_andamento:
+                concluidos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    tipo, caminho = em_andamento.pop(futuro)
+                    item = {'arquivo': os.path.basename(caminho), 'caminho': caminho, 'tipo': tipo,
+                            'texto': None, 'erro': None}
+                    try:
+                        item['texto'] = futuro.result()
+                    except Exception as e:
+                        logging.error(f"Erro ao processar {caminho}: {str(e)}")
+                        item['erro'] = str(e)
+                    yield item
+                submeter_proximos()
+
+
+def _extrair_documento(caminho: str, tipo_arquivo: str) -> str:
+    """
+    Extrai o texto de um documento dentro de um processo de trabalho.
+
+    Args:
+        caminho (str): Caminho do arquivo PDF ou DOCX.
+        tipo_arquivo (str): 'pdf' ou 'docx'.
+
+    Returns:
+        str: Texto extraído do arquivo.
+    """
+    # Já estamos em um processo do pool; não abre um segundo nível de processos por PDF
+    servico = FileProcessingService(limite_paginas_paralelo=None)
+    if tipo_arquivo == 'pdf':
+        return servico.processar_arquivo_pdf(caminho)
+    return servico.processar_arquivo_docx(caminho)
+
+
+# Fonte do PDF em extração nos processos de `_extrair_pdf_em_paralelo`
+_fonte_pdf = None
+
+
+def _definir_fonte_pdf(fonte: str) -> None:
+    global _fonte_pdf
+    _fonte_pdf = fonte
+
+
+def _extrair_intervalo_pdf(pagina_inicial: int, pagina_final: int) -> str:
+    """
+    Extrai o texto de um intervalo de páginas do PDF definido em `_definir_fonte_pdf`.
+    """
+    with abrir_fonte(_fonte_pdf) as pdf_file:
+        reader = PdfReader(pdf_file)
+        return "".join(texto for _, texto in iterar_paginas(reader, pagina_inicial, pagina_final))
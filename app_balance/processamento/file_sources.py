@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Abertura sem cópia das fontes aceitas pelos serviços de processamento de arquivos."""
+
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+# Fontes aceitas: caminho, bytes ou qualquer buffer (bytearray, memoryview, mmap)
+FonteArquivo = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Arquivo binário somente leitura sobre um buffer existente (memoryview, mmap, bytearray).
+
+    Diferente de `io.BytesIO(memoryview)`, não copia o buffer: as leituras retornam
+    apenas os trechos pedidos pelo parser.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._buffer = memoryview(buffer).cast('B')
+        self._posicao = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, destino) -> int:
+        tamanho = min(len(destino), len(self._buffer) - self._posicao)
+        if tamanho <= 0:
+            return 0
+        destino[:tamanho] = self._buffer[self._posicao:self._posicao + tamanho]
+        self._posicao += tamanho
+        return tamanho
+
+    def read(self, size: int = -1) -> bytes:
+        fim = len(self._buffer) if size is None or size < 0 else min(self._posicao + size, len(self._buffer))
+        inicio, self._posicao = self._posicao, max(fim, self._posicao)
+        return self._buffer[inicio:fim].tobytes()
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            posicao = offset
+        elif whence == io.SEEK_CUR:
+            posicao = self._posicao + offset
+        elif whence == io.SEEK_END:
+            posicao = len(self._buffer) + offset
+        else:
+            raise ValueError(f"Valor de whence inválido: {whence}")
+        if posicao < 0:
+            raise ValueError("Posição negativa no buffer.")
+        self._posicao = posicao
+        return self._posicao
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def close(self) -> None:
+        if not self.closed:
+            self._buffer.release()
+        super().close()
+
+
+@contextmanager
+def abrir_fonte(arquivo: FonteArquivo) -> Iterator[io.IOBase]:
+    """Abre a fonte de um arquivo como um objeto binário legível e posicionável.
+
+    - Caminhos são mapeados em memória (mmap), sem ler o arquivo inteiro para a RAM.
+    - `bytes` usa `io.BytesIO`, que compartilha o buffer original no CPython.
+    - memoryview, bytearray e mmap são lidos diretamente pelo `BufferReader`.
+
+    Args:
+        arquivo: Caminho, bytes ou buffer com o conteúdo do arquivo.
+
+    Yields:
+        io.IOBase: Objeto de arquivo para os parsers (pandas, pypdf, python-docx).
+    """
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, 'rb') as arquivo_disco:
+            if os.fstat(arquivo_disco.fileno()).st_size == 0:
+                yield arquivo_disco
+                return
+            with mmap.mmap(arquivo_disco.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                with BufferReader(mapa) as leitor:
+                    yield leitor
+    elif isinstance(arquivo, bytes):
+        with io.BytesIO(arquivo) as leitor:
+            yield leitor
+    else:
+        with BufferReader(arquivo) as leitor:
+            yield leitor
+
+
+@contextmanager
+def caminho_da_fonte(arquivo: FonteArquivo, sufixo: str = '') -> Iterator[str]:
+    """Fornece um caminho em disco para a fonte, para repassá-la a outros processos sem serializar o conteúdo.
+
+    Caminhos são usados como estão. Bytes e buffers (memoryview, mmap) são gravados uma única vez
+    em um arquivo temporário, direto do buffer, removido ao sair do contexto; cada processo
+    reabre o caminho com `abrir_fonte`, mapeando o arquivo em memória.
+
+    Args:
+        arquivo: Caminho, bytes ou buffer com o conteúdo do arquivo.
+        sufixo (str): Extensão do arquivo temporário.
+
+    Yields:
+        str: Caminho do arquivo.
+    """
+    if isinstance(arquivo, (str, os.PathLike)):
+        yield os.fspath(arquivo)
+        return
+    descritor, caminho = tempfile.mkstemp(suffix=sufixo)
+    try:
+        with os.fdopen(descritor, 'wb') as temporario, memoryview(arquivo) as visao:
+            temporario.write(visao.cast('B'))
+        yield caminho
+    finally:
+        os.remove(caminho)
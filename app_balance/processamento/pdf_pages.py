@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Iteração página a página sobre documentos PDF."""
+
+from typing import Iterator, Optional, Tuple
+
+
+def intervalo_paginas(total_paginas: int, pagina_inicial: int = 1, pagina_final: Optional[int] = None,
+                      max_paginas: Optional[int] = None) -> range:
+    """Calcula os índices (base zero) das páginas a extrair.
+
+    Args:
+        total_paginas (int): Número de páginas do documento.
+        pagina_inicial (int): Primeira página desejada (base um).
+        pagina_final (int, opcional): Última página desejada, inclusiva. Padrão: última do documento.
+        max_paginas (int, opcional): Limite de páginas a partir da inicial.
+
+    Returns:
+        range: Índices das páginas dentro do documento.
+    """
+    if pagina_inicial < 1:
+        raise ValueError("A página inicial deve ser maior ou igual a 1.")
+    fim = total_paginas if pagina_final is None else min(pagina_final, total_paginas)
+    if max_paginas is not None:
+        fim = min(fim, pagina_inicial - 1 + max_paginas)
+    return range(pagina_inicial - 1, max(fim, pagina_inicial - 1))
+
+
+def iterar_paginas(reader, pagina_inicial: int = 1, pagina_final: Optional[int] = None,
+                   max_paginas: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Extrai o texto de um PDF uma página por vez.
+
+    Apenas o texto da página atual fica em memória; o consumidor pode interromper
+    a iteração a qualquer momento sem que as páginas restantes sejam extraídas.
+
+    Args:
+        reader: Instância de PdfReader (pypdf ou PyPDF2).
+        pagina_inicial (int): Primeira página desejada (base um).
+        pagina_final (int, opcional): Última página desejada, inclusiva.
+        max_paginas (int, opcional): Limite de páginas a partir da inicial.
+
+    Yields:
+        tuple: (número da página, texto extraído).
+    """
+    for indice in intervalo_paginas(len(reader.pages), pagina_inicial, pagina_final, max_paginas):
+        yield indice + 1, reader.pages[indice].extract_text() or ""
@@ -0,0 +1,187 @@
+import json
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+def _valor_json(valor: Any) -> Any:
+    """Converte escalares e arrays do numpy (ex.: somas do pandas) para tipos nativos do JSON."""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"Object of type {type(valor).__name__} is not JSON serializable")
+
+
+class RelatorioMemoizado:
+    """
+    Base dos resultados de análise: os valores calculados ficam em atributos e os textos
+    (markdown, prompt, JSON) só são montados quando pedidos, uma vez por resultado.
+
+    As subclasses são dataclasses congeladas que declaram `__slots__` com os seus campos e
+    `_renderizados` (o cache, criado em `__post_init__`, fora dos campos da dataclass).
+    """
+    __slots__ = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, '_renderizados', {})
+
+    def _renderizar(self, formato: str, montar: Callable[[], str]) -> str:
+        texto = self._renderizados.get(formato)
+        if texto is None:
+            texto = self._renderizados[formato] = montar()
+        return texto
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Retorna os valores calculados (sem os textos renderizados)."""
+        return {campo.name: getattr(self, campo.name) for campo in fields(self) if campo.init}
+
+    def para_json(self) -> str:
+        return self._renderizar("json", lambda: json.dumps(self.para_dict(), ensure_ascii=False, default=_valor_json))
+
+    def para_markdown(self) -> str:
+        return self._renderizar("markdown", self._montar_markdown)
+
+    def para_prompt(self) -> str:
+        return self._renderizar("prompt", self._montar_prompt)
+
+    def _montar_markdown(self) -> str:
+        raise NotImplementedError
+
+    def _montar_prompt(self) -> str:
+        return self.para_markdown()
+
+    def __str__(self) -> str:
+        return self.para_markdown()
+
+
+@dataclass(frozen=True, eq=False)
+class AnaliseFinanceira(RelatorioMemoizado):
+    """
+    Indicadores de `FinancialAnalysisService.calcular_analise` (percentuais em %).
+    `monte_carlo` é None quando a sensibilidade usa a variação fixa de ±taxa_juros.
+    """
+    __slots__ = ('receita_projetada', 'total_custos', 'lucro_apos_impostos', 'margem_lucro_real',
+                 'custos_variaveis', 'margem_contribuicao', 'margem_contribuicao_percentual', 'ponto_equilibrio',
+                 'horas_trabalhadas', 'valor_hora', 'investimentos', 'roi', 'payback', 'taxa_juros',
+                 'margem_lucro_variacao_positiva', 'margem_lucro_variacao_negativa', 'monte_carlo', '_renderizados')
+    receita_projetada: float
+    total_custos: float
+    lucro_apos_impostos: float
+    margem_lucro_real: float
+    custos_variaveis: float
+    margem_contribuicao: float
+    margem_contribuicao_percentual: float
+    ponto_equilibrio: float
+    horas_trabalhadas: float
+    valor_hora: float
+    investimentos: float
+    roi: float
+    payback: float
+    taxa_juros: float
+    margem_lucro_variacao_positiva: float
+    margem_lucro_variacao_negativa: float
+    monte_carlo: Optional[Dict[str, Any]]
+
+    def _montar_sensibilidade(self) -> str:
+        monte_carlo = self.monte_carlo
+        if monte_carlo is None:
+            return (
+                f"   - Aumento de {self.taxa_juros:.0%} na receita: Margem de lucro {self.margem_lucro_variacao_positiva:.2f}%\n"
+                f"   - Redução de {self.taxa_juros:.0%} na receita: Margem de lucro {self.margem_lucro_variacao_negativa:.2f}%\n\n"
+            )
+        return (
+            f"   - Monte Carlo ({monte_carlo['simulacoes']} simulações): probabilidade de prejuízo {monte_carlo['probabilidade_prejuizo']:.2%}\n"
+            f"   - Lucro após impostos (p5 / p50 / p95): R$ {monte_carlo['lucro']['p5']:.2f} / "
+            f"R$ {monte_carlo['lucro']['p50']:.2f} / R$ {monte_carlo['lucro']['p95']:.2f}\n"
+            f"   - Margem de lucro (p5 / p50 / p95): {monte_carlo['margem']['p5']:.2f}% / "
+            f"{monte_carlo['margem']['p50']:.2f}% / {monte_carlo['margem']['p95']:.2f}%\n"
+            f"   - Ponto de equilíbrio (p5 / p50 / p95): R$ {monte_carlo['ponto_equilibrio']['p5']:.2f} / "
+            f"R$ {monte_carlo['ponto_equilibrio']['p50']:.2f} / R$ {monte_carlo['ponto_equilibrio']['p95']:.2f}\n\n"
+        )
+
+    def _montar_markdown(self) -> str:
+        return (
+            f"📊 **Análise Financeira Completa**:\n\n"
+            f"1. **Lucro Estimado**:\n"
+            f"   - Receita projetada: R$ {self.receita_projetada:.2f}\n"
+            f"   - Total de custos: R$ {self.total_custos:.2f}\n"
+            f"   - Lucro após impostos: R$ {self.lucro_apos_impostos:.2f}\n"
+            f"   - Margem de lucro real: {self.margem_lucro_real:.2f}%\n\n"
+
+            f"2. **Margem de Contribuição**:\n"
+            f"   - Custos Variáveis: R$ {self.custos_variaveis:.2f}\n"
+            f"   - Margem de contribuição: R$ {self.margem_contribuicao:.2f} ({self.margem_contribuicao_percentual:.2f}%)\n\n"
+
+            f"3. **Ponto de Equilíbrio (Break-even)**:\n"
+            f"   - Ponto de equilíbrio: R$ {self.ponto_equilibrio:.2f}\n\n"
+
+            f"4. **Valor da Hora Trabalhada**:\n"
+            f"   - Total de horas trabalhadas: {self.horas_trabalhadas}\n"
+            f"   - Valor da hora: R$ {self.valor_hora:.2f}\n\n"
+
+            f"5. **Retorno sobre o Investimento (ROI)**:\n"
+            f"   - Investimentos: R$ {self.investimentos:.2f}\n"
+            f"   - ROI: {self.roi:.2f}%\n\n"
+
+            f"6. **Payback**:\n"
+            f"   - Payback: {self.payback:.2f} meses\n\n"
+
+            f"7. **Análise de Sensibilidade**:\n"
+            f"{self._montar_sensibilidade()}"
+        )
+
+    def _montar_prompt(self) -> str:
+        # Versão compacta, sem formatação, para enviar ao GPT
+        return (
+            f"Receita projetada: R$ {self.receita_projetada:.2f}; total de custos: R$ {self.total_custos:.2f}; "
+            f"lucro após impostos: R$ {self.lucro_apos_impostos:.2f} (margem {self.margem_lucro_real:.2f}%); "
+            f"margem de contribuição: {self.margem_contribuicao_percentual:.2f}%; "
+            f"ponto de equilíbrio: R$ {self.ponto_equilibrio:.2f}; valor da hora: R$ {self.valor_hora:.2f}; "
+            f"ROI: {self.roi:.2f}%; payback: {self.payback:.2f} meses."
+        )
+
+
+@dataclass(frozen=True)
+class RelatorioTeorico(RelatorioMemoizado):
+    """Conceitos pedidos e as suas explicações, na ordem do pedido."""
+    __slots__ = ('conceitos', '_renderizados')
+    conceitos: Tuple[Tuple[str, str], ...]
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {'conceitos': dict(self.conceitos)}
+
+    def _montar_markdown(self) -> str:
+        return "📚 **Relatório Teórico Financeiro**\n\n" + "".join(
+            f"**{conceito}**:\n{explicacao}\n\n" for conceito, explicacao in self.conceitos)
+
+
+@dataclass(frozen=True)
+class PromptAnalise(RelatorioMemoizado):
+    """Dados do prompt de análise financeira de `PromptService.montar_prompt_analise`."""
+    __slots__ = ('total_custos', 'valor_hora', 'receita_projetada', 'margem_lucro_desejada',
+                 'categorias_custos', '_renderizados')
+    total_custos: float
+    valor_hora: float
+    receita_projetada: float
+    margem_lucro_desejada: float
+    categorias_custos: Tuple[Tuple[str, float], ...]
+
+    def para_dict(self) -> Dict[str, Any]:
+        dados = {campo.name: getattr(self, campo.name) for campo in fields(self) if campo.init}
+        dados['categorias_custos'] = dict(self.categorias_custos)
+        return dados
+
+    def _montar_prompt(self) -> str:
+        return (
+            f"Análise financeira:\n"
+            f"Total de custos: R$ {self.total_custos:.2f}\n"
+            f"Valor da hora: R$ {self.valor_hora:.2f}\n"
+            f"Receita projetada: R$ {self.receita_projetada:.2f}\n"
+            f"Margem de lucro desejada: {self.margem_lucro_desejada}%\n"
+            f"\nCategorias de custos:\n" + "\n".join([f"{k}: R$ {v}" for k, v in self.categorias_custos])
+        )
+
+    def _montar_markdown(self) -> str:
+        return self.para_prompt()
@@ -0,0 +1,185 @@
+from typing import Any, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[float, Iterable[float], np.ndarray]
+
+
+def _fluxos_2d(fluxos) -> np.ndarray:
+    """Converte os fluxos para a forma (projetos, períodos); o período 0 é o investimento inicial."""
+    fluxos = np.asarray(fluxos, dtype=float)
+    if fluxos.ndim == 1:
+        fluxos = fluxos[np.newaxis, :]
+    if fluxos.ndim != 2 or fluxos.shape[1] < 2:
+        raise ValueError("Os fluxos devem ter a forma (projetos, períodos), com pelo menos dois períodos.")
+    return fluxos
+
+
+def _taxas_coluna(taxas: ArrayLike, projetos: int) -> np.ndarray:
+    return np.broadcast_to(np.asarray(taxas, dtype=float), (projetos,))[:, np.newaxis]
+
+
+def _fatores_desconto(taxas: np.ndarray, periodos: int) -> np.ndarray:
+    """Fatores (1 + taxa) ** -t para t = 0..periodos-1, por produto acumulado (mais rápido que potências)."""
+    fatores = np.empty((taxas.shape[0], periodos))
+    fatores[:, 0] = 1.0
+    fatores[:, 1:] = 1 / (1 + taxas.reshape(-1, 1))
+    return np.cumprod(fatores, axis=1, out=fatores)
+
+
+def projetar_fluxos(receita: ArrayLike, custos: ArrayLike, periodos: int, crescimento_receita: ArrayLike = 0.0,
+                    crescimento_custos: ArrayLike = 0.0, investimento: ArrayLike = 0.0) -> np.ndarray:
+    """
+    Projeta os fluxos de caixa mensais de vários projetos com crescimento composto.
+
+    No mês t (1..periodos), a receita é `receita * (1 + crescimento_receita) ** (t - 1)` e os
+    custos crescem do mesmo modo; o período 0 é `-investimento`. Todos os argumentos aceitam
+    escalares ou arrays (um valor por projeto).
+
+    Returns:
+        np.ndarray: Fluxos na forma (projetos, periodos + 1).
+    """
+    if periodos <= 0:
+        raise ValueError("O número de períodos deve ser positivo.")
+    receita, custos, crescimento_receita, crescimento_custos, investimento = (
+        np.atleast_1d(np.asarray(valor, dtype=float)) for valor in
+        (receita, custos, crescimento_receita, crescimento_custos, investimento))
+    receita, custos, crescimento_receita, crescimento_custos, investimento = np.broadcast_arrays(
+        receita, custos, crescimento_receita, crescimento_custos, investimento)
+
+    expoentes = np.arange(periodos)
+    fluxos = np.empty((receita.shape[0], periodos + 1))
+    fluxos[:, 0] = -investimento
+    fluxos[:, 1:] = (receita[:, np.newaxis] * (1 + crescimento_receita[:, np.newaxis]) ** expoentes
+                     - custos[:, np.newaxis] * (1 + crescimento_custos[:, np.newaxis]) ** expoentes)
+    return fluxos
+
+
+def crescimento_composto(valor_inicial: ArrayLike, taxas: ArrayLike, periodos: int) -> np.ndarray:
+    """
+    Retorna `valor_inicial * (1 + taxa) ** t` para t = 0..periodos, uma linha por taxa
+    (ou por par valor/taxa, se ambos forem arrays).
+    """
+    valor_inicial = np.atleast_1d(np.asarray(valor_inicial, dtype=float))[:, np.newaxis]
+    taxas = np.atleast_1d(np.asarray(taxas, dtype=float))[:, np.newaxis]
+    return valor_inicial * (1 + taxas) ** np.arange(periodos + 1)
+
+
+def vpl(fluxos, taxas: ArrayLike) -> np.ndarray:
+    """
+    Valor presente líquido de cada projeto, com a taxa de desconto por período (escalar ou uma por projeto).
+    """
+    fluxos = _fluxos_2d(fluxos)
+    return (fluxos * _fatores_desconto(_taxas_coluna(taxas, fluxos.shape[0]), fluxos.shape[1])).sum(axis=1)
+
+
+def tir(fluxos, estimativa: float = 0.1, tolerancia: float = 1e-10, max_iteracoes: int = 50) -> np.ndarray:
+    """
+    Taxa interna de retorno (por período) de cada projeto, resolvida para todos ao mesmo tempo.
+
+    Usa o método de Newton, iterando só nos projetos que ainda não convergiram; os que não
+    convergem (ou saem do domínio r > -1) são resolvidos por bisseção vetorizada no intervalo
+    (-0.99, 10). Projetos sem troca de sinal no VPL nesse intervalo ficam com NaN.
+    """
+    fluxos = _fluxos_2d(fluxos)
+    projetos, periodos = fluxos.shape
+    t = np.arange(periodos)
+    taxa = np.full(projetos, float(estimativa))
+    convergiu = np.zeros(projetos, dtype=bool)
+    ativos = np.arange(projetos)
+
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for _ in range(max_iteracoes):
+            if not ativos.size:
+                break
+            fatores = _fatores_desconto(taxa[ativos], periodos)
+            ponderados = fluxos[ativos] * fatores
+            derivada = -(ponderados * t).sum(axis=1) / (1 + taxa[ativos])
+            passo = ponderados.sum(axis=1) / derivada
+            taxa[ativos] -= passo
+            valido = np.isfinite(taxa[ativos]) & (taxa[ativos] > -1)
+            pronto = valido & (np.abs(passo) < tolerancia)
+            convergiu[ativos[pronto]] = True
+            ativos = ativos[valido & ~pronto]
+
+        # Um passo pequeno longe da raiz (ex.: taxas enormes, onde o VPL quase não muda) não conta
+        escala = np.abs(fluxos).sum(axis=1)
+        convergiu &= np.abs(vpl(fluxos, np.where(convergiu, taxa, 0.0))) <= 1e-8 * escala
+        pendentes = ~convergiu
+        if pendentes.any():
+            taxa[pendentes] = _bissecao(fluxos[pendentes], tolerancia)
+    return taxa
+
+
+def _bissecao(fluxos: np.ndarray, tolerancia: float, minimo: float = -0.99, maximo: float = 10.0) -> np.ndarray:
+    def valor_presente(taxa):
+        return (fluxos * _fatores_desconto(taxa, fluxos.shape[1])).sum(axis=1)
+
+    baixo = np.full(fluxos.shape[0], minimo)
+    alto = np.full(fluxos.shape[0], maximo)
+    valor_baixo = valor_presente(baixo)
+    com_raiz = np.sign(valor_baixo) != np.sign(valor_presente(alto))
+    # Cada passo divide o intervalo ao meio: itera até a largura ficar abaixo da tolerância
+    for _ in range(int(np.ceil(np.log2((maximo - minimo) / tolerancia)))):
+        meio = (baixo + alto) / 2
+        valor_meio = valor_presente(meio)
+        mesmo_sinal = np.sign(valor_meio) == np.sign(valor_baixo)
+        baixo = np.where(mesmo_sinal, meio, baixo)
+        valor_baixo = np.where(mesmo_sinal, valor_meio, valor_baixo)
+        alto = np.where(mesmo_sinal, alto, meio)
+    return np.where(com_raiz, (baixo + alto) / 2, np.nan)
+
+
+def payback_descontado(fluxos, taxas: ArrayLike) -> np.ndarray:
+    """
+    Períodos até o fluxo descontado acumulado ficar não negativo, com interpolação linear
+    dentro do período; NaN se o investimento não se paga no horizonte.
+    """
+    fluxos = _fluxos_2d(fluxos)
+    descontados = fluxos * _fatores_desconto(_taxas_coluna(taxas, fluxos.shape[0]), fluxos.shape[1])
+    acumulado = np.cumsum(descontados, axis=1)
+    pago = acumulado >= 0
+    # O projeto se paga no primeiro período a partir do qual o acumulado não volta a ficar negativo
+    recuperado = pago[:, ::-1].cumprod(axis=1)[:, ::-1].astype(bool)
+    tem_payback = recuperado[:, -1]
+    periodo = np.argmax(recuperado, axis=1)
+
+    linhas = np.arange(fluxos.shape[0])
+    anterior = np.maximum(periodo - 1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fracao = np.where(periodo > 0, -acumulado[linhas, anterior] / descontados[linhas, periodo], 0.0)
+    return np.where(tem_payback, anterior + np.where(periodo > 0, fracao, 0.0), np.nan)
+
+
+def fluxo_mensal_de_recebimentos(recebimentos: Union[pd.DataFrame, Iterable[Any]]) -> pd.DataFrame:
+    """
+    Monta a série mensal de receita, custos e fluxo a partir do histórico de `Recebimento`.
+
+    `save_financial_analysis` grava uma linha por categoria, repetindo `total_custos` e
+    `receita_projetada` com a mesma `data_recebimento`; as linhas de um mesmo usuário e instante
+    formam uma análise, que conta uma vez no mês. Análises distintas com os mesmos valores
+    contam cada uma. Meses sem registros entram com zero.
+
+    Args:
+        recebimentos: Objetos `Recebimento` ou um DataFrame com as colunas data_recebimento,
+            total_custos e receita_projetada (e, opcionalmente, usuario_id).
+
+    Returns:
+        pd.DataFrame: Colunas receita, custos e fluxo, indexadas por mês (PeriodIndex).
+    """
+    colunas = ['data_recebimento', 'total_custos', 'receita_projetada', 'usuario_id']
+    if isinstance(recebimentos, pd.DataFrame):
+        dados = recebimentos.reindex(columns=colunas)
+    else:
+        dados = pd.DataFrame([{coluna: getattr(recebimento, coluna, None) for coluna in colunas}
+                              for recebimento in recebimentos], columns=colunas)
+    if dados.empty:
+        return pd.DataFrame(columns=['receita', 'custos', 'fluxo'], dtype=float)
+
+    dados['mes'] = pd.to_datetime(dados['data_recebimento']).dt.to_period('M')
+    analises = dados.drop_duplicates(subset=['usuario_id', 'data_recebimento'])
+    mensal = analises.groupby('mes').agg(receita=('receita_projetada', 'sum'), custos=('total_custos', 'sum'))
+    mensal = mensal.reindex(pd.period_range(mensal.index.min(), mensal.index.max(), freq='M'), fill_value=0.0)
+    mensal['fluxo'] = mensal['receita'] - mensal['custos']
+    return mensal
@@ -1,4 +1,5 @@
 import logging
+from typing import Iterable, Iterator
 from app_balance.services.greeting_service import GreetingService
 
 class CatelinaLacetGPT:
@@ -20,11 +21,24 @@ class CatelinaLacetGPT:
         Adiciona um toque de humor ou contexto.
         """
         logging.info(f"Gerando resposta final a partir da resposta GPT: {gpt_response}")
+        return f"{gpt_response}{self.sufixo_humor()}"
 
-        # Adiciona uma frase humorística dependendo do tipo de humor
+    def generate_response_stream(self, gpt_tokens: Iterable[str]) -> Iterator[str]:
+        """
+        Versão em streaming de `generate_response`: repassa os trechos do GPT-4 assim que
+        chegam e acrescenta o toque de humor quando o stream termina.
+        """
+        for token in gpt_tokens:
+            yield token
+        yield self.sufixo_humor()
+
+    def sufixo_humor(self) -> str:
+        """
+        Retorna a frase humorística acrescentada ao fim das respostas, conforme o tipo de humor.
+        """
         if self.tipo_humor == "sarcastico":
-            return f"{gpt_response} - Isso, se você conseguir entender algo disso!"
+            return " - Isso, se você conseguir entender algo disso!"
         elif self.tipo_humor == "compreensivo":
-            return f"{gpt_response} - Vamos superar isso juntos, passo a passo."
+            return " - Vamos superar isso juntos, passo a passo."
         else:
-            return f"{gpt_response} - Continue assim, você está indo muito bem!"
+            return " - Continue assim, você está indo muito bem!"
@@ -1,4 +1,31 @@
-from typing import Dict
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app_balance.services import cash_flow
+from app_balance.services.analysis_results import AnaliseFinanceira
+from app_balance.services.monte_carlo import Distribuicao, simular_monte_carlo
+
+# Colunas aceitas por `analisar_cenarios` e os seus valores padrão (None: obrigatória)
+COLUNAS_CENARIO = {
+    'receita': None,
+    'custos_fixos': 0.0,
+    'custos_variaveis': 0.0,
+    'total_custos': None,  # padrão: custos_fixos + custos_variaveis
+    'horas': None,
+    'investimentos': 0.0,
+    'taxa_imposto': 0.15,
+    'taxa_juros': 0.05,
+}
+
+
+def _dividir(numerador: np.ndarray, denominador: np.ndarray, valido: np.ndarray, padrao: float = 0.0) -> np.ndarray:
+    """Divide elemento a elemento só onde `valido`; nos demais elementos o resultado é `padrao`."""
+    resultado = np.full(np.broadcast(numerador, denominador).shape, padrao, dtype=float)
+    np.divide(numerador, denominador, out=resultado, where=valido)
+    return resultado
+
 
 class FinancialAnalysisService:
     """
@@ -22,10 +49,28 @@ class FinancialAnalysisService:
         return total_custos / horas_trabalhadas
 
     def gerar_analise_detalhada(self, custos: Dict, receita_projetada: float, horas_trabalhadas: float, categorias_custos: Dict, 
-                                taxa_imposto: float = 0.15, taxa_juros: float = 0.05) -> str:
+                                taxa_imposto: float = 0.15, taxa_juros: float = 0.05, simulacoes: int = 0,
+                                distribuicoes: Optional[Mapping[str, Distribuicao]] = None,
+                                semente: Optional[int] = None) -> str:
         """
         Gera uma análise financeira detalhada, abrangendo margem de contribuição, ROI, ponto de equilíbrio,
-        payback, impostos, taxas e sensibilidade.
+        payback, impostos, taxas e sensibilidade. Os argumentos são os de `calcular_analise`; quem
+        precisa só dos valores deve usar `calcular_analise` diretamente.
+
+        Returns:
+            str: O relatório detalhado da análise financeira.
+        """
+        return self.calcular_analise(custos, receita_projetada, horas_trabalhadas, categorias_custos, taxa_imposto,
+                                     taxa_juros, simulacoes, distribuicoes, semente).para_markdown()
+
+    def calcular_analise(self, custos: Dict, receita_projetada: float, horas_trabalhadas: float, categorias_custos: Dict,
+                         taxa_imposto: float = 0.15, taxa_juros: float = 0.05, simulacoes: int = 0,
+                         distribuicoes: Optional[Mapping[str, Distribuicao]] = None,
+                         semente: Optional[int] = None) -> AnaliseFinanceira:
+        """
+        Calcula a análise financeira detalhada (margem de contribuição, ROI, ponto de equilíbrio,
+        payback, impostos, taxas e sensibilidade) sem montar o relatório; os textos são gerados
+        sob demanda pelo resultado.
 
         Args:
             custos (dict): Dicionário com os custos totais.
@@ -34,9 +79,13 @@ class FinancialAnalysisService:
             categorias_custos (dict): Custos detalhados por categoria.
             taxa_imposto (float): Percentual de imposto sobre o lucro.
             taxa_juros (float): Taxa de juros para cálculo de sensibilidade.
+            simulacoes (int): Se positivo, a análise de sensibilidade usa Monte Carlo com esse
+                número de sorteios (ver `simular_sensibilidade`) em vez da variação fixa de ±taxa_juros.
+            distribuicoes (dict): Distribuições do Monte Carlo (padrão: `DISTRIBUICOES_PADRAO`).
+            semente (int): Semente do Monte Carlo, para resultados reproduzíveis.
 
         Returns:
-            str: O relatório detalhado da análise financeira.
+            AnaliseFinanceira: Os indicadores calculados.
         """
         total_custos = custos['total_custos']
         lucro_estimado = receita_projetada - total_custos
@@ -73,34 +122,177 @@ class FinancialAnalysisService:
         lucro_com_variacao_negativa = variacao_receita_negativa - total_custos
         margem_lucro_variacao_negativa = (lucro_com_variacao_negativa / variacao_receita_negativa) * 100
 
-        # Geração do relatório final
-        return (
-            f"📊 **Análise Financeira Completa**:\n\n"
-            f"1. **Lucro Estimado**:\n"
-            f"   - Receita projetada: R$ {receita_projetada:.2f}\n"
-            f"   - Total de custos: R$ {total_custos:.2f}\n"
-            f"   - Lucro após impostos: R$ {lucro_apos_impostos:.2f}\n"
-            f"   - Margem de lucro real: {margem_lucro_real:.2f}%\n\n"
-
-            f"2. **Margem de Contribuição**:\n"
-            f"   - Custos Variáveis: R$ {custos_variaveis:.2f}\n"
-            f"   - Margem de contribuição: R$ {margem_contribuicao:.2f} ({margem_contribuicao_percentual:.2f}%)\n\n"
-            
-            f"3. **Ponto de Equilíbrio (Break-even)**:\n"
-            f"   - Ponto de equilíbrio: R$ {ponto_equilibrio:.2f}\n\n"
-
-            f"4. **Valor da Hora Trabalhada**:\n"
-            f"   - Total de horas trabalhadas: {horas_trabalhadas}\n"
-            f"   - Valor da hora: R$ {valor_hora:.2f}\n\n"
-            
-            f"5. **Retorno sobre o Investimento (ROI)**:\n"
-            f"   - Investimentos: R$ {investimentos:.2f}\n"
-            f"   - ROI: {roi:.2f}%\n\n"
-            
-            f"6. **Payback**:\n"
-            f"   - Payback: {payback:.2f} meses\n\n"
-
-            f"7. **Análise de Sensibilidade**:\n"
-            f"   - Aumento de 5% na receita: Margem de lucro {margem_lucro_variacao_positiva:.2f}%\n"
-            f"   - Redução de 5% na receita: Margem de lucro {margem_lucro_variacao_negativa:.2f}%\n\n"
+        monte_carlo = None
+        if simulacoes > 0:
+            monte_carlo = self.simular_sensibilidade(custos, receita_projetada, categorias_custos, taxa_imposto,
+                                                     distribuicoes=distribuicoes, simulacoes=simulacoes, semente=semente)
+
+        return AnaliseFinanceira(
+            receita_projetada=receita_projetada,
+            total_custos=total_custos,
+            lucro_apos_impostos=lucro_apos_impostos,
+            margem_lucro_real=margem_lucro_real,
+            custos_variaveis=custos_variaveis,
+            margem_contribuicao=margem_contribuicao,
+            margem_contribuicao_percentual=margem_contribuicao_percentual,
+            ponto_equilibrio=ponto_equilibrio,
+            horas_trabalhadas=horas_trabalhadas,
+            valor_hora=valor_hora,
+            investimentos=investimentos,
+            roi=roi,
+            payback=payback,
+            taxa_juros=taxa_juros,
+            margem_lucro_variacao_positiva=margem_lucro_variacao_positiva,
+            margem_lucro_variacao_negativa=margem_lucro_variacao_negativa,
+            monte_carlo=monte_carlo,
         )
+
+    def simular_sensibilidade(self, custos: Dict, receita_projetada: float, categorias_custos: Dict,
+                              taxa_imposto: float = 0.15, distribuicoes: Optional[Mapping[str, Distribuicao]] = None,
+                              simulacoes: int = 1_000_000, semente: Optional[int] = None, processos: int = 1) -> Dict:
+        """
+        Análise de sensibilidade por Monte Carlo: sorteia a receita, cada categoria de custo e a
+        taxa de imposto e resume lucro, margem e ponto de equilíbrio (ver `simular_monte_carlo`).
+
+        Args:
+            custos (dict): Dicionário com os custos totais.
+            receita_projetada (float): Receita estimada para o período.
+            categorias_custos (dict): Custos detalhados por categoria ('fixos' são os custos fixos).
+            taxa_imposto (float): Percentual de imposto sobre o lucro.
+            distribuicoes (dict): Fatores sorteados por variável: 'receita', 'taxa_imposto', 'custos'
+                (todas as categorias) ou o nome de uma categoria.
+            simulacoes (int): Número de sorteios.
+            semente (int): Semente para resultados reproduzíveis.
+            processos (int): Processos usados nos sorteios (o resultado não muda com esse número).
+
+        Returns:
+            dict: Probabilidade de prejuízo e percentis de lucro, margem e ponto de equilíbrio.
+        """
+        return simular_monte_carlo(receita_projetada, custos['total_custos'], categorias_custos, taxa_imposto,
+                                   distribuicoes=distribuicoes, simulacoes=simulacoes, semente=semente,
+                                   processos=processos)
+
+    def analisar_cenarios(self, cenarios: Union[pd.DataFrame, Mapping[str, np.ndarray]]) -> pd.DataFrame:
+        """
+        Calcula os indicadores de `gerar_analise_detalhada` para muitos cenários de uma vez,
+        com operações vetorizadas do NumPy.
+
+        Args:
+            cenarios (DataFrame ou dict): Uma linha (ou posição dos arrays) por cenário, com as
+                colunas de `COLUNAS_CENARIO`: receita, custos_fixos, custos_variaveis, total_custos,
+                horas, investimentos, taxa_imposto e taxa_juros. As colunas ausentes usam o padrão;
+                escalares valem para todos os cenários.
+
+        Returns:
+            pd.DataFrame: As entradas seguidas de lucro, lucro_apos_impostos, margem_lucro,
+                margem_contribuicao, margem_contribuicao_percentual, ponto_equilibrio, valor_hora,
+                roi, payback e as margens com a receita variando ±taxa_juros (percentuais em %).
+                As divisões por zero são tratadas elemento a elemento, como no relatório: valem 0,
+                exceto valor_hora, que é NaN quando não há horas trabalhadas.
+
+        Raises:
+            ValueError: Se faltar uma coluna obrigatória (receita ou horas) ou houver colunas desconhecidas.
+        """
+        colunas = dict(cenarios.items())
+        desconhecidas = set(colunas) - set(COLUNAS_CENARIO)
+        if desconhecidas:
+            raise ValueError(f"Colunas de cenário desconhecidas: {', '.join(sorted(desconhecidas))}")
+        faltando = [nome for nome in ('receita', 'horas') if nome not in colunas]
+        if faltando:
+            raise ValueError(f"Colunas de cenário obrigatórias ausentes: {', '.join(faltando)}")
+
+        valores = {nome: np.asarray(colunas.get(nome, padrao), dtype=float)
+                   for nome, padrao in COLUNAS_CENARIO.items() if nome != 'total_custos'}
+        valores['total_custos'] = (np.asarray(colunas['total_custos'], dtype=float) if 'total_custos' in colunas
+                                   else valores['custos_fixos'] + valores['custos_variaveis'])
+        valores = dict(zip(valores, np.broadcast_arrays(*valores.values())))
+
+        receita, total_custos = valores['receita'], valores['total_custos']
+        horas, investimentos = valores['horas'], valores['investimentos']
+        taxa_imposto, taxa_juros = valores['taxa_imposto'], valores['taxa_juros']
+        com_receita = receita > 0
+
+        lucro = receita - total_custos
+        lucro_apos_impostos = lucro * (1 - taxa_imposto)
+        margem_contribuicao = receita - valores['custos_variaveis']
+        margem_contribuicao_percentual = _dividir(margem_contribuicao, receita, com_receita) * 100
+
+        receita_positiva = receita * (1 + taxa_juros)
+        receita_negativa = receita * (1 - taxa_juros)
+
+        resultado = pd.DataFrame({nome: valores[nome] for nome in COLUNAS_CENARIO})
+        resultado['lucro'] = lucro
+        resultado['lucro_apos_impostos'] = lucro_apos_impostos
+        resultado['margem_lucro'] = _dividir(lucro_apos_impostos, receita, com_receita) * 100
+        resultado['margem_contribuicao'] = margem_contribuicao
+        resultado['margem_contribuicao_percentual'] = margem_contribuicao_percentual
+        resultado['ponto_equilibrio'] = _dividir(valores['custos_fixos'], margem_contribuicao_percentual / 100,
+                                                 margem_contribuicao_percentual > 0)
+        resultado['valor_hora'] = _dividir(total_custos, horas, horas != 0, padrao=np.nan)
+        resultado['roi'] = _dividir(lucro_apos_impostos, investimentos, investimentos > 0) * 100
+        resultado['payback'] = _dividir(investimentos, margem_contribuicao, margem_contribuicao > 0)
+        resultado['margem_sensibilidade_positiva'] = _dividir(receita_positiva - total_custos, receita_positiva,
+                                                              receita_positiva != 0) * 100
+        resultado['margem_sensibilidade_negativa'] = _dividir(receita_negativa - total_custos, receita_negativa,
+                                                              receita_negativa != 0) * 100
+        return resultado
+
+    def combinar_cenarios(self, **valores) -> pd.DataFrame:
+        """
+        Monta todas as combinações dos valores informados (produto cartesiano), no formato de
+        `analisar_cenarios`, ex.: `combinar_cenarios(receita=[...], horas=[160, 200], taxa_imposto=[0.15, 0.2])`.
+        """
+        nomes = list(valores)
+        listas = [np.atleast_1d(np.asarray(valores[nome], dtype=float)) for nome in nomes]
+        grade = np.meshgrid(*listas, indexing='ij')
+        return pd.DataFrame({nome: eixo.ravel() for nome, eixo in zip(nomes, grade)})
+
+    def projetar_fluxo_caixa(self, receita_projetada, custos, periodos: int = 12, crescimento_receita=0.0,
+                             crescimento_custos=0.0, investimento=0.0) -> np.ndarray:
+        """
+        Projeta fluxos de caixa mensais para um ou vários projetos, com crescimento composto
+        de receita e custos (ver `cash_flow.projetar_fluxos`).
+
+        Args:
+            receita_projetada (float ou array): Receita do primeiro mês, por projeto.
+            custos (float, array ou dict): Custos do primeiro mês; um dicionário de categorias
+                (como `categorias_custos`) é somado.
+            periodos (int): Número de meses projetados.
+            crescimento_receita (float ou array): Crescimento mensal composto da receita.
+            crescimento_custos (float ou array): Crescimento mensal composto dos custos.
+            investimento (float ou array): Investimento inicial (mês 0).
+
+        Returns:
+            np.ndarray: Fluxos na forma (projetos, periodos + 1).
+        """
+        if isinstance(custos, Mapping):
+            custos = sum(custos.values())
+        return cash_flow.projetar_fluxos(receita_projetada, custos, periodos, crescimento_receita,
+                                         crescimento_custos, investimento)
+
+    def fluxo_de_recebimentos(self, recebimentos: Union[pd.DataFrame, Iterable[Any]]) -> pd.DataFrame:
+        """
+        Série mensal de receita, custos e fluxo a partir do histórico de `Recebimento`
+        (ver `cash_flow.fluxo_mensal_de_recebimentos`).
+        """
+        return cash_flow.fluxo_mensal_de_recebimentos(recebimentos)
+
+    def avaliar_fluxos(self, fluxos, taxa_desconto=0.01) -> pd.DataFrame:
+        """
+        Avalia muitos projetos de uma vez a partir dos seus fluxos de caixa.
+
+        Args:
+            fluxos (array): Fluxos na forma (projetos, períodos), com o investimento no período 0
+                (ex.: o retorno de `projetar_fluxo_caixa`).
+            taxa_desconto (float ou array): Taxa de desconto por período, geral ou por projeto.
+
+        Returns:
+            pd.DataFrame: Uma linha por projeto com vpl, tir (por período), payback (simples)
+                e payback_descontado, em períodos; NaN quando o indicador não existe no horizonte.
+        """
+        return pd.DataFrame({
+            'vpl': cash_flow.vpl(fluxos, taxa_desconto),
+            'tir': cash_flow.tir(fluxos),
+            'payback': cash_flow.payback_descontado(fluxos, 0.0),
+            'payback_descontado': cash_flow.payback_descontado(fluxos, taxa_desconto),
+        })
@@ -1,31 +1,168 @@
+import asyncio
 import logging
-try:
-    import openai
-except ImportError as e:
-    logging.error("O pacote 'openai' não foi encontrado. Certifique-se de que ele está instalado.")
-    raise e
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app_balance.services.openai_client import OpenAIClientPool, obter_cliente_compartilhado
+from app_balance.services.resilience import CircuitOpenError
+from app_balance.services.response_cache import ResponseCache
+from app_balance.services.single_flight import SingleFlight
 
 class GPTService:
     """
     Serviço para gerenciar a comunicação com o GPT-4.
     """
 
-    def __init__(self, api_key):
-        openai.api_key = api_key
+    modelo = "gpt-4"
+    max_tokens = 500
+    temperatura = 0.7
+
+    mensagem_erro = "Desculpe, houve um erro ao processar sua solicitação."
+
+    def __init__(self, api_key=None, cache: Optional[ResponseCache] = None, cliente: Optional[OpenAIClientPool] = None,
+                 coalescedor: Optional[SingleFlight] = None, fallback_local: Optional[Callable[[str], str]] = None):
+        # Sem `cliente`, usa o cliente único da aplicação (pool HTTP e limite de concorrência globais,
+        # configurados por OPENAI_API_KEY etc.); uma `api_key` diferente da dele ganha um pool próprio,
+        # com a mesma configuração.
+        if cliente is None:
+            cliente = obter_cliente_compartilhado()
+            if api_key is not None and api_key != cliente.api_key:
+                cliente = cliente.com_chave(api_key)
+        elif api_key is not None and cliente.api_key is not None and api_key != cliente.api_key:
+            raise ValueError("A api_key informada difere da chave do cliente OpenAI informado.")
+        self.cliente = cliente
+        self.cache = cache  # Cache opcional de respostas (memória + SQLite)
+        self.coalescedor = coalescedor or SingleFlight()  # Agrupa prompts idênticos em andamento
+        self.fallback_local = fallback_local  # Resposta local usada quando o GPT-4 falha ou o disjuntor está aberto
 
-    def enviar_prompt(self, prompt: str) -> str:
+    def enviar_prompt(self, prompt: str, usar_cache: bool = True) -> str:
         """
         Envia um prompt para o GPT-4 e retorna a resposta.
+        Com um cache configurado, prompts repetidos são respondidos sem nova chamada, e
+        chamadas simultâneas com o mesmo prompt dividem uma única requisição;
+        use `usar_cache=False` para pedidos que precisam de uma resposta nova.
         """
         try:
-            logging.info(f"Enviando prompt para GPT-4: {prompt}")
-            response = openai.Completion.create(
-                model="gpt-4",
-                prompt=prompt,
-                max_tokens=500,
-                temperature=0.7
-            )
-            return response.choices[0].text.strip()
+            if usar_cache:
+                gerar = lambda: self.coalescedor.executar(self._chave(prompt), lambda: self._completar(prompt))
+            else:
+                gerar = lambda: self._completar(prompt)
+            if self.cache is None:
+                return gerar()
+            return self.cache.obter_ou_gerar(prompt, self.modelo, self.temperatura, self.max_tokens,
+                                             gerar, usar_cache=usar_cache, origem=self.cliente.base_url)
         except Exception as e:
-            logging.error(f"Erro ao comunicar com GPT-4: {str(e)}")
-            return "Desculpe, houve um erro ao processar sua solicitação."
+            return self._resposta_local(prompt, e)
+
+    async def enviar_prompt_async(self, prompt: str, usar_cache: bool = True) -> str:
+        """
+        Versão assíncrona de `enviar_prompt`; várias chamadas podem ser aguardadas juntas
+        e dividem o limite de concorrência do cliente.
+        """
+        try:
+            if usar_cache:
+                gerar = lambda: self.coalescedor.executar_async(self._chave(prompt), lambda: self._completar_async(prompt))
+            else:
+                gerar = lambda: self._completar_async(prompt)
+            if self.cache is None:
+                return await gerar()
+            return await self.cache.obter_ou_gerar_async(prompt, self.modelo, self.temperatura, self.max_tokens,
+                                                         gerar, usar_cache=usar_cache, origem=self.cliente.base_url)
+        except Exception as e:
+            return self._resposta_local(prompt, e)
+
+    def transmitir_prompt(self, prompt: str, usar_cache: bool = True) -> Iterator[str]:
+        """
+        Modo streaming de `enviar_prompt`: gera os trechos da resposta à medida que chegam.
+
+        Respostas em cache saem de uma vez. A resposta completa vai para o cache ao fim do
+        stream. Se a falha acontecer antes do primeiro trecho, gera a resposta local;
+        depois disso, o stream apenas termina com o que já foi recebido.
+        """
+        chave = None
+        if self.cache is not None and usar_cache:
+            chave = self.cache.gerar_chave(prompt, self.modelo, self.temperatura, self.max_tokens,
+                                           self.cliente.base_url)
+            resposta = self.cache.obter(chave)
+            if resposta is not None:
+                yield resposta
+                return
+
+        partes = []
+        try:
+            logging.info(f"Enviando prompt para GPT-4 (streaming): {prompt}")
+            for trecho in self.cliente.transmitir_chat_sync(prompt, modelo=self.modelo, max_tokens=self.max_tokens,
+                                                            temperatura=self.temperatura):
+                partes.append(trecho)
+                yield trecho
+        except Exception as e:
+            if not partes:
+                yield self._resposta_local(prompt, e)
+            else:
+                logging.error(f"Stream do GPT-4 interrompido: {str(e)}")
+            return
+
+        if chave is not None:
+            self.cache.armazenar(chave, "".join(partes).strip())
+
+    async def enviar_prompts_async(self, prompts: List[str], usar_cache: bool = True) -> List[str]:
+        """
+        Envia vários prompts ao mesmo tempo e retorna as respostas na mesma ordem.
+        """
+        return list(await asyncio.gather(*(self.enviar_prompt_async(prompt, usar_cache) for prompt in prompts)))
+
+    def enviar_prompts(self, prompts: List[str], usar_cache: bool = True) -> List[str]:
+        """
+        Versão síncrona de `enviar_prompts_async`, para lotes disparados fora de um event loop.
+        """
+        return asyncio.run(self.enviar_prompts_async(prompts, usar_cache))
+
+    def estatisticas(self) -> Dict[str, object]:
+        """
+        Retorna as métricas do cliente (retentativas, disjuntor), do agrupamento e do cache.
+        """
+        estatisticas = {'cliente': self.cliente.estatisticas(), 'coalescencia': self.coalescedor.estatisticas()}
+        if self.cache is not None:
+            estatisticas['cache'] = self.cache.estatisticas()
+        return estatisticas
+
+    def _resposta_local(self, prompt: str, erro: Exception) -> str:
+        """Resposta usada quando o GPT-4 não responde; com o disjuntor aberto, sem tentar a rede."""
+        if isinstance(erro, CircuitOpenError):
+            logging.warning("GPT-4 indisponível (disjuntor aberto); usando resposta local.")
+        else:
+            logging.error(f"Erro ao comunicar com GPT-4: {str(erro)}")
+        if self.fallback_local is not None:
+            return self.fallback_local(prompt)
+        return self.mensagem_erro
+
+    def _chave(self, prompt: str) -> tuple:
+        """Identifica requisições equivalentes para o agrupamento de chamadas em andamento."""
+        return (ResponseCache.normalizar_prompt(prompt), self.modelo, self.temperatura, self.max_tokens)
+
+    def _completar(self, prompt: str) -> str:
+        logging.info(f"Enviando prompt para GPT-4: {prompt}")
+        return self.cliente.completar_chat_sync(prompt, modelo=self.modelo, max_tokens=self.max_tokens,
+                                                temperatura=self.temperatura)
+
+    async def _completar_async(self, prompt: str) -> str:
+        logging.info(f"Enviando prompt para GPT-4: {prompt}")
+        return await self.cliente.completar_chat(prompt, modelo=self.modelo, max_tokens=self.max_tokens,
+                                                 temperatura=self.temperatura)
+
+    def enviar_documento(self, instrucao: str, chunks: List[Dict]) -> List[Dict]:
+        """
+        Envia um documento longo em blocos gerados pelo `DocumentChunker`, um prompt por bloco.
+        Os blocos são enviados em paralelo, até o limite de concorrência do cliente.
+
+        Args:
+            instrucao (str): Instrução aplicada a cada bloco (ex.: "Resuma os custos abaixo").
+            chunks (list): Blocos com 'texto' e metadados de origem.
+
+        Returns:
+            list: Para cada bloco, seus metadados (sem o texto) e a 'resposta' do GPT-4.
+        """
+        respostas = self.enviar_prompts([f"{instrucao}\n\n{chunk['texto']}" for chunk in chunks])
+        return [
+            dict({chave: valor for chave, valor in chunk.items() if chave != 'texto'}, resposta=resposta)
+            for chunk, resposta in zip(chunks, respostas)
+        ]
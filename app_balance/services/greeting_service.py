@@ -1,3 +1,11 @@
+from app_balance.services.keyword_matcher import KeywordMatcher
+
+GREETINGS = ['olá', 'oi', 'bom dia', 'boa tarde', 'boa noite', 'hello', 'hi']
+
+# Compilado uma vez para todas as instâncias; casa palavras inteiras, com ou sem acento
+_greeting_matcher = KeywordMatcher({'saudacao': GREETINGS})
+
+
 class GreetingService:
     def __init__(self):
         # Não requer nenhum parâmetro externo
@@ -5,10 +13,9 @@ class GreetingService:
 
     def is_greeting(self, prompt: str) -> bool:
         """
-        Verifica se o prompt é uma saudação simples.
+        Verifica se o prompt é uma saudação simples (palavras inteiras: "oi", mas não "oito").
         """
-        greetings = ['olá', 'oi', 'bom dia', 'boa tarde', 'boa noite', 'hello', 'hi']
-        return any(greet in prompt.lower() for greet in greetings)
+        return _greeting_matcher.contem(prompt)
 
     def get_greeting_response(self, sentiment: str) -> str:
         """
@@ -0,0 +1,111 @@
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (palavra do vocabulário, rótulo, início, fim) no texto normalizado
+Ocorrencia = Tuple[str, str, int, int]
+
+
+def normalizar(texto: str) -> str:
+    """
+    Normaliza o texto para comparação: remove acentos e ignora maiúsculas ("Orçamento" -> "orcamento").
+    """
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere)).casefold()
+
+
+class KeywordMatcher:
+    """
+    Busca simultânea de muitas palavras-chave (autômato de Aho-Corasick).
+
+    O autômato é montado uma vez a partir do vocabulário e percorre cada texto em uma
+    única passada, independentemente do número de palavras-chave. Textos e vocabulário
+    passam por `normalizar`, então "finança", "financa" e "FINANÇA" são equivalentes.
+    Com `palavras_inteiras`, só valem ocorrências delimitadas por caracteres que não são
+    letras nem dígitos ("oi" não casa com "oito").
+    """
+
+    def __init__(self, vocabulario: Dict[str, Iterable[str]], palavras_inteiras: bool = True):
+        """
+        Args:
+            vocabulario (dict): Palavras-chave por rótulo, ex.: {'financeiro': ['lucro', ...]}.
+            palavras_inteiras (bool): Exige limites de palavra em volta de cada ocorrência.
+        """
+        self.palavras_inteiras = palavras_inteiras
+        self._rotulos: Dict[str, Tuple[str, str]] = {}
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falhas: List[int] = [0]
+        self._saidas: List[List[Tuple[str, str, int]]] = [[]]
+
+        for rotulo, palavras in vocabulario.items():
+            for palavra in palavras:
+                chave = normalizar(palavra)
+                if chave and chave not in self._rotulos:
+                    self._rotulos[chave] = (palavra, rotulo)
+                    self._inserir(chave, palavra, rotulo)
+        self._ligar_falhas()
+
+    def _inserir(self, chave: str, palavra: str, rotulo: str) -> None:
+        estado = 0
+        for caractere in chave:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[estado][caractere] = proximo
+                self._transicoes.append({})
+                self._falhas.append(0)
+                self._saidas.append([])
+            estado = proximo
+        self._saidas[estado].append((palavra, rotulo, len(chave)))
+
+    def _ligar_falhas(self) -> None:
+        """Calcula os links de falha em largura, herdando as saídas dos sufixos."""
+        fila = list(self._transicoes[0].values())
+        for estado in fila:
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falhas[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falhas[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[self._falhas[proximo]]
+
+    def encontrar(self, texto: str) -> List[Ocorrencia]:
+        """
+        Retorna as ocorrências no texto, na ordem em que terminam.
+        """
+        normalizado = normalizar(texto)
+        transicoes, falhas, saidas = self._transicoes, self._falhas, self._saidas
+        ocorrencias = []
+        estado = 0
+        for posicao, caractere in enumerate(normalizado):
+            while estado and caractere not in transicoes[estado]:
+                estado = falhas[estado]
+            estado = transicoes[estado].get(caractere, 0)
+            for palavra, rotulo, tamanho in saidas[estado]:
+                inicio, fim = posicao - tamanho + 1, posicao + 1
+                if self.palavras_inteiras and not self._delimitada(normalizado, inicio, fim):
+                    continue
+                ocorrencias.append((palavra, rotulo, inicio, fim))
+        return ocorrencias
+
+    def encontrar_lote(self, textos: Iterable[str]) -> List[List[Ocorrencia]]:
+        """Aplica `encontrar` a vários textos."""
+        return [self.encontrar(texto) for texto in textos]
+
+    def rotulos(self, texto: str) -> List[str]:
+        """Retorna os rótulos encontrados no texto, sem repetição, na ordem da primeira ocorrência."""
+        return list(dict.fromkeys(rotulo for _, rotulo, _, _ in self.encontrar(texto)))
+
+    def contem(self, texto: str) -> bool:
+        """Indica se o texto tem alguma palavra-chave."""
+        return bool(self.encontrar(texto))
+
+    def rotulo(self, palavra: str) -> Optional[str]:
+        """Retorna o rótulo de uma palavra do vocabulário (após normalização), ou None."""
+        entrada = self._rotulos.get(normalizar(palavra))
+        return entrada[1] if entrada else None
+
+    @staticmethod
+    def _delimitada(texto: str, inicio: int, fim: int) -> bool:
+        return (inicio == 0 or not texto[inicio - 1].isalnum()) and (fim == len(texto) or not texto[fim].isalnum())
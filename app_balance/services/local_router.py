@@ -0,0 +1,82 @@
+import threading
+from typing import Dict, Iterable, List
+
+from app_balance.services.keyword_matcher import KeywordMatcher
+
+
+class LocalRouter:
+    """
+    Classificador local de intenção para `TextProcessingService.route_and_process`.
+
+    Procura no próprio texto, com um `KeywordMatcher`, as palavras-chave de cada categoria
+    (os rótulos do matcher, ex.: finanças e piadas) e monta a mesma análise que o GPT-4
+    devolveria para `decide_route`, com uma confiança entre 0 e 1. Só quando a confiança
+    fica abaixo de `limiar_confianca` o serviço precisa consultar o GPT-4. Os contadores
+    mostram quantas rotas foram decididas localmente.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, limiar_confianca: float = 0.6):
+        """
+        Args:
+            matcher (KeywordMatcher): Vocabulário compilado; o rótulo de cada palavra é a sua categoria.
+            limiar_confianca (float): Confiança mínima para decidir a rota sem o GPT-4.
+        """
+        self.matcher = matcher
+        self.limiar_confianca = limiar_confianca
+        self._lock = threading.Lock()
+        self._contadores = {'local': 0, 'gpt': 0}
+
+    def encontrar_palavras_chave(self, texto: str) -> List[str]:
+        """
+        Retorna as palavras-chave do vocabulário presentes no texto (palavras inteiras, sem
+        diferenciar maiúsculas nem acentos), na grafia do vocabulário e na ordem em que aparecem.
+        """
+        return [palavra for palavra, _, _, _ in self.matcher.encontrar(texto)]
+
+    def classificar(self, texto: str) -> Dict:
+        """
+        Classifica o texto localmente.
+
+        Returns:
+            dict: 'analise' (keywords/sentiment/entities, no formato de `analyze_text`),
+                'categoria' predominante (ou None), 'confianca' e 'local' (True se a
+                confiança atinge o limiar).
+        """
+        palavras_chave = []
+        acertos: Dict[str, int] = {}
+        for palavra, categoria, _, _ in self.matcher.encontrar(texto):
+            palavras_chave.append(palavra)
+            acertos[categoria] = acertos.get(categoria, 0) + 1
+
+        categoria, confianca = None, 0.0
+        if acertos:
+            categoria = max(acertos, key=acertos.get)
+            principal = acertos[categoria]
+            # Mais acertos aumentam a confiança; acertos de outras categorias a diluem
+            confianca = principal / (principal + 0.5) * principal / sum(acertos.values())
+
+        return {
+            'analise': {"keywords": palavras_chave, "sentiment": "NEUTRAL", "entities": []},
+            'categoria': categoria,
+            'confianca': confianca,
+            'local': confianca >= self.limiar_confianca,
+        }
+
+    def classificar_lote(self, textos: Iterable[str]) -> List[Dict]:
+        """Classifica vários textos (ex.: mensagens armazenadas) com o mesmo autômato."""
+        return [self.classificar(texto) for texto in textos]
+
+    def registrar_caminho(self, caminho: str) -> None:
+        """Conta uma rota decidida pelo caminho 'local' ou 'gpt'."""
+        with self._lock:
+            self._contadores[caminho] += 1
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna quantas rotas foram decididas localmente e pelo GPT-4, e a fração local.
+        """
+        with self._lock:
+            estatisticas = dict(self._contadores)
+        total = estatisticas['local'] + estatisticas['gpt']
+        estatisticas['fracao_local'] = estatisticas['local'] / total if total else 0.0
+        return estatisticas
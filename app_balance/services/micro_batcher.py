@@ -0,0 +1,121 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+class MicroBatcher:
+    """
+    Fila de inferência em micro-lotes.
+
+    Cada `submeter` devolve um Future na hora. Uma thread de trabalho junta os pedidos
+    até `max_lote` itens ou até `max_espera_ms` depois do primeiro, e chama
+    `funcao_lote` uma vez com a lista inteira (uma única passada do modelo). Se a função
+    falhar, a exceção vai para todos os Futures do lote.
+    """
+
+    def __init__(self, funcao_lote: Callable[[List[Any]], Sequence[Any]], max_lote: int = 32,
+                 max_espera_ms: float = 10.0, nome: str = "micro-lotes"):
+        """
+        Args:
+            funcao_lote (callable): Recebe uma lista de entradas e devolve os resultados na mesma ordem.
+            max_lote (int): Tamanho máximo de cada lote.
+            max_espera_ms (float): Espera máxima, a partir do primeiro pedido, para completar o lote.
+            nome (str): Nome da thread de trabalho.
+        """
+        if max_lote <= 0:
+            raise ValueError("max_lote deve ser positivo.")
+        self.funcao_lote = funcao_lote
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000.0
+        self.nome = nome
+        self._fila: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._contadores = {'lotes': 0, 'itens': 0, 'erros': 0}
+
+    def submeter(self, entrada: Any) -> Future:
+        """
+        Enfileira uma entrada e retorna o Future do seu resultado.
+        """
+        self._iniciar()
+        futuro: Future = Future()
+        self._fila.put((entrada, futuro))
+        return futuro
+
+    def submeter_varios(self, entradas: Iterable[Any]) -> List[Future]:
+        """Enfileira várias entradas; elas são agrupadas nos mesmos lotes."""
+        return [self.submeter(entrada) for entrada in entradas]
+
+    def processar(self, entradas: Iterable[Any]) -> List[Any]:
+        """Enfileira as entradas e espera todos os resultados, na mesma ordem."""
+        return [futuro.result() for futuro in self.submeter_varios(entradas)]
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna o número de lotes e itens processados, os lotes com erro e o tamanho médio dos lotes.
+        """
+        with self._lock:
+            estatisticas = dict(self._contadores)
+        estatisticas['tamanho_medio_lote'] = estatisticas['itens'] / estatisticas['lotes'] if estatisticas['lotes'] else 0.0
+        return estatisticas
+
+    def fechar(self) -> None:
+        """Processa o que já está na fila e encerra a thread de trabalho."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._fila.put(None)
+            thread.join()
+
+    def _iniciar(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name=self.nome, daemon=True)
+                self._thread.start()
+
+    def _executar(self) -> None:
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            lote = [item]
+            limite = time.monotonic() + self.max_espera
+            encerrar = False
+            while len(lote) < self.max_lote:
+                restante = limite - time.monotonic()
+                try:
+                    item = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    encerrar = True
+                    break
+                lote.append(item)
+            self._processar_lote(lote)
+            if encerrar:
+                return
+
+    def _processar_lote(self, lote: List[tuple]) -> None:
+        entradas = [entrada for entrada, _ in lote]
+        try:
+            resultados = self.funcao_lote(entradas)
+            if len(resultados) != len(entradas):
+                raise RuntimeError(f"O lote devolveu {len(resultados)} resultados para {len(entradas)} entradas.")
+        except Exception as e:
+            logging.error(f"Erro ao processar lote de {len(entradas)} itens: {str(e)}")
+            with self._lock:
+                self._contadores['lotes'] += 1
+                self._contadores['itens'] += len(lote)
+                self._contadores['erros'] += 1
+            for _, futuro in lote:
+                futuro.set_exception(e)
+            return
+
+        with self._lock:
+            self._contadores['lotes'] += 1
+            self._contadores['itens'] += len(lote)
+        for (_, futuro), resultado in zip(lote, resultados):
+            futuro.set_result(resultado)
@@ -0,0 +1,145 @@
+import gc
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def memoria_residente() -> Optional[int]:
+    """
+    Retorna a memória residente (RSS) do processo em bytes, ou None se não for possível medir.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Registro de modelos locais carregados sob demanda.
+
+    Cada modelo é registrado com uma função de carga, que só roda no primeiro `obter`
+    (ou em `aquecer`, numa thread em segundo plano depois que a interface abriu).
+    `descarregar` libera o modelo. O tempo de carga e a variação da memória residente
+    do processo durante a carga ficam em `estatisticas`; como a memória é do processo
+    inteiro, a medida é aproximada se outras threads alocarem ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self._carregadores: Dict[str, Callable[[], Any]] = {}
+        self._modelos: Dict[str, Any] = {}
+        self._metricas: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def registrar(self, nome: str, carregador: Callable[[], Any]) -> None:
+        """
+        Registra (ou substitui) a função que carrega o modelo `nome`.
+        """
+        self._carregadores[nome] = carregador
+        self._locks.setdefault(nome, threading.Lock())
+        self._metricas.setdefault(nome, {'carregado': False, 'cargas': 0, 'tempo_carga': None,
+                                         'memoria_bytes': None, 'erro': None})
+
+    def obter(self, nome: str) -> Any:
+        """
+        Retorna o modelo, carregando-o na primeira chamada. Chamadas simultâneas esperam a mesma carga.
+
+        Raises:
+            KeyError: Se o modelo não foi registrado.
+        """
+        modelo = self._modelos.get(nome)
+        if modelo is not None:
+            return modelo
+        if nome not in self._carregadores:
+            raise KeyError(f"Modelo não registrado: {nome}")
+
+        with self._locks[nome]:
+            modelo = self._modelos.get(nome)
+            if modelo is not None:
+                return modelo
+
+            logging.info(f"Carregando o modelo '{nome}'...")
+            memoria_antes = memoria_residente()
+            inicio = time.perf_counter()
+            try:
+                modelo = self._carregadores[nome]()
+            except Exception as e:
+                self._metricas[nome]['erro'] = str(e)
+                raise
+            tempo_carga = time.perf_counter() - inicio
+            memoria_depois = memoria_residente()
+
+            self._modelos[nome] = modelo
+            metricas = self._metricas[nome]
+            metricas.update(carregado=True, tempo_carga=tempo_carga, erro=None)
+            metricas['cargas'] += 1
+            if memoria_antes is not None and memoria_depois is not None:
+                metricas['memoria_bytes'] = memoria_depois - memoria_antes
+            logging.info(f"Modelo '{nome}' carregado em {tempo_carga:.2f} s.")
+            return modelo
+
+    def carregado(self, nome: str) -> bool:
+        return nome in self._modelos
+
+    def aquecer(self, nomes: Optional[Iterable[str]] = None) -> threading.Thread:
+        """
+        Carrega os modelos (todos, por padrão) numa thread em segundo plano e retorna a thread.
+        Falhas são registradas no log e em `estatisticas`, sem interromper os demais modelos.
+        """
+        nomes = list(nomes) if nomes is not None else list(self._carregadores)
+
+        def carregar_todos():
+            for nome in nomes:
+                try:
+                    self.obter(nome)
+                except Exception as e:
+                    logging.error(f"Erro ao aquecer o modelo '{nome}': {str(e)}")
+
+        thread = threading.Thread(target=carregar_todos, name="aquecimento-modelos", daemon=True)
+        thread.start()
+        return thread
+
+    def descarregar(self, nome: str) -> None:
+        """
+        Remove o modelo da memória; o próximo `obter` o carrega de novo.
+        """
+        with self._locks[nome]:
+            if self._modelos.pop(nome, None) is None:
+                return
+            self._metricas[nome]['carregado'] = False
+        gc.collect()
+        logging.info(f"Modelo '{nome}' descarregado.")
+
+    def estatisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna, por modelo: se está carregado, quantas cargas houve, o tempo da última carga
+        em segundos, a variação de memória residente em bytes e o último erro de carga.
+        """
+        return {nome: dict(metricas) for nome, metricas in self._metricas.items()}
+
+
+def _carregar_spacy():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+
+def _carregar_sentimento():
+    # Backend escolhido em SENTIMENT_BACKEND: pytorch, int8, onnx ou onnx-int8
+    from app_balance.services.sentiment_backends import carregar_configurado
+    return carregar_configurado()
+
+
+# Registro compartilhado pela aplicação: fallbacks locais do TextProcessingService
+model_registry = ModelRegistry()
+model_registry.registrar("spacy", _carregar_spacy)
+model_registry.registrar("sentimento", _carregar_sentimento)
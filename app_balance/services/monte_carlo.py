@@ -0,0 +1,154 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+PERCENTIS_PADRAO = (5, 25, 50, 75, 95)
+TAMANHO_BLOCO = 250_000
+
+
+@dataclass(frozen=True)
+class Distribuicao:
+    """
+    Distribuição de um fator multiplicativo aplicado ao valor base de uma variável
+    (1.0 mantém o valor; 1.1 o aumenta em 10%).
+
+    Tipos e parâmetros:
+        fixa: sem parâmetros (fator 1).
+        normal: (desvio,) - fator 1 + N(0, desvio).
+        uniforme: (minimo, maximo) - fator uniforme no intervalo, ex.: (0.9, 1.1).
+        triangular: (minimo, moda, maximo).
+        lognormal: (sigma,) - fator lognormal com média 1.
+    """
+    tipo: str = "fixa"
+    parametros: Tuple[float, ...] = ()
+
+    TIPOS = ("fixa", "normal", "uniforme", "triangular", "lognormal")
+
+    def __post_init__(self):
+        if self.tipo not in self.TIPOS:
+            raise ValueError(f"Distribuição desconhecida: {self.tipo}. Opções: {', '.join(self.TIPOS)}")
+        esperados = {"fixa": 0, "normal": 1, "uniforme": 2, "triangular": 3, "lognormal": 1}[self.tipo]
+        if len(self.parametros) != esperados:
+            raise ValueError(f"A distribuição {self.tipo} espera {esperados} parâmetro(s).")
+
+    @classmethod
+    def de_texto(cls, texto: str) -> "Distribuicao":
+        """Lê uma distribuição no formato 'tipo:p1:p2', ex.: 'normal:0.1' ou 'uniforme:0.9:1.1'."""
+        tipo, *parametros = texto.split(":")
+        return cls(tipo.strip().lower(), tuple(float(p) for p in parametros))
+
+    def amostrar(self, gerador: np.random.Generator, n: int) -> Optional[np.ndarray]:
+        """Sorteia `n` fatores; retorna None para a distribuição fixa (nada a sortear)."""
+        if self.tipo == "normal":
+            return gerador.normal(1.0, self.parametros[0], n)
+        if self.tipo == "uniforme":
+            return gerador.uniform(*self.parametros, n)
+        if self.tipo == "triangular":
+            return gerador.triangular(*self.parametros, n)
+        if self.tipo == "lognormal":
+            sigma = self.parametros[0]
+            return gerador.lognormal(-sigma ** 2 / 2, sigma, n)
+        return None
+
+
+DISTRIBUICOES_PADRAO = {
+    'receita': Distribuicao("normal", (0.10,)),
+    'custos': Distribuicao("normal", (0.05,)),
+    'taxa_imposto': Distribuicao("fixa"),
+}
+
+
+def _simular_bloco(argumentos) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorteia um bloco de simulações e retorna lucro após impostos, margem (%) e ponto de equilíbrio."""
+    semente, n, base, distribuicoes = argumentos
+    gerador = np.random.default_rng(semente)
+
+    def sortear(nome: str, valor: float, padrao: str) -> np.ndarray:
+        fatores = distribuicoes.get(nome, distribuicoes[padrao]).amostrar(gerador, n)
+        return np.full(n, valor) if fatores is None else fatores * valor
+
+    receita = sortear('receita', base['receita'], 'receita')
+    taxa_imposto = sortear('taxa_imposto', base['taxa_imposto'], 'taxa_imposto')
+
+    # Custos fora das categorias entram sem variação
+    total_custos = np.full(n, base['total_custos'] - sum(base['categorias'].values()))
+    custos_variaveis = np.zeros(n)
+    custos_fixos = np.zeros(n)
+    for categoria, valor in base['categorias'].items():
+        sorteado = sortear(categoria, valor, 'custos')
+        total_custos += sorteado
+        if categoria.lower() == 'fixos':
+            custos_fixos += sorteado
+        else:
+            custos_variaveis += sorteado
+
+    com_receita = receita > 0
+    lucro_apos_impostos = (receita - total_custos) * (1 - taxa_imposto)
+    margem = np.zeros(n)
+    np.divide(lucro_apos_impostos * 100, receita, out=margem, where=com_receita)
+
+    # Ponto de equilíbrio = custos fixos / fração de contribuição; indefinido (NaN) sem contribuição positiva
+    contribuicao = receita - custos_variaveis
+    ponto_equilibrio = np.full(n, np.nan)
+    np.divide(custos_fixos * receita, contribuicao, out=ponto_equilibrio, where=com_receita & (contribuicao > 0))
+    return lucro_apos_impostos, margem, ponto_equilibrio
+
+
+def _resumir(valores: np.ndarray, percentis: Sequence[float]) -> Dict[str, float]:
+    validos = valores[~np.isnan(valores)]
+    if not len(validos):
+        resumo = {f"p{p:g}": math.nan for p in percentis}
+        resumo['media'] = math.nan
+        return resumo
+    resumo = dict(zip((f"p{p:g}" for p in percentis), np.percentile(validos, percentis).tolist()))
+    resumo['media'] = float(validos.mean())
+    return resumo
+
+
+def simular_monte_carlo(receita: float, total_custos: float, categorias_custos: Mapping[str, float],
+                        taxa_imposto: float = 0.15, distribuicoes: Optional[Mapping[str, Distribuicao]] = None,
+                        simulacoes: int = 1_000_000, semente: Optional[int] = None, processos: int = 1,
+                        percentis: Sequence[float] = PERCENTIS_PADRAO) -> Dict:
+    """
+    Análise de sensibilidade por Monte Carlo, totalmente vetorizada.
+
+    Sorteia a receita, cada categoria de custo e a taxa de imposto segundo `distribuicoes`
+    (chaves 'receita', 'taxa_imposto', 'custos' - padrão de todas as categorias - ou o nome
+    de uma categoria), sobrepostas a `DISTRIBUICOES_PADRAO`. As simulações são divididas em
+    blocos de `TAMANHO_BLOCO` com sementes derivadas de `semente`, então o resultado é o mesmo
+    com qualquer número de `processos`.
+
+    Returns:
+        dict: 'simulacoes', 'probabilidade_prejuizo', os percentis (e a média) de 'lucro'
+            (após impostos), 'margem' (%) e 'ponto_equilibrio', e 'fracao_sem_equilibrio'
+            (simulações sem margem de contribuição positiva, fora dos percentis do ponto de equilíbrio).
+    """
+    if simulacoes <= 0:
+        raise ValueError("O número de simulações deve ser positivo.")
+    configuracao = dict(DISTRIBUICOES_PADRAO)
+    configuracao.update(distribuicoes or {})
+    base = {'receita': float(receita), 'total_custos': float(total_custos), 'taxa_imposto': float(taxa_imposto),
+            'categorias': {categoria: float(valor) for categoria, valor in categorias_custos.items()}}
+
+    blocos = math.ceil(simulacoes / TAMANHO_BLOCO)
+    sementes = np.random.SeedSequence(semente).spawn(blocos)
+    tarefas = [(sementes[i], min(TAMANHO_BLOCO, simulacoes - i * TAMANHO_BLOCO), base, configuracao)
+               for i in range(blocos)]
+    if processos > 1 and blocos > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, blocos)) as executor:
+            partes = list(executor.map(_simular_bloco, tarefas))
+    else:
+        partes = [_simular_bloco(tarefa) for tarefa in tarefas]
+
+    lucro, margem, ponto_equilibrio = (np.concatenate(serie) for serie in zip(*partes))
+    return {
+        'simulacoes': simulacoes,
+        'probabilidade_prejuizo': float(np.count_nonzero(lucro < 0) / simulacoes),
+        'lucro': _resumir(lucro, percentis),
+        'margem': _resumir(margem, percentis),
+        'ponto_equilibrio': _resumir(ponto_equilibrio, percentis),
+        'fracao_sem_equilibrio': float(np.count_nonzero(np.isnan(ponto_equilibrio)) / simulacoes),
+    }
@@ -0,0 +1,306 @@
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import httpx
+from environs import Env
+
+try:
+    from openai import AsyncOpenAI
+except ImportError:
+    logging.error("O pacote 'openai' não foi encontrado. Certifique-se de que ele está instalado.")
+    raise
+
+from app_balance.services.resilience import CircuitBreaker, ResilientCaller, RetryPolicy, TokenBucket
+
+Mensagens = List[Dict[str, str]]
+
+# Marca o fim de um stream nas filas entre o loop do pool e quem consome os tokens
+_FIM_STREAM = object()
+
+
+class OpenAIClientPool:
+    """
+    Cliente assíncrono compartilhado para a API da OpenAI (interface `chat.completions`).
+
+    Todas as requisições rodam em um único event loop em uma thread própria, sobre um
+    `httpx.AsyncClient` com conexões keep-alive reaproveitadas. Um semáforo limita quantas
+    requisições ficam em voo ao mesmo tempo. Há entradas `await` (para código assíncrono)
+    e síncronas (para a GUI e os serviços atuais), e ambas dividem o mesmo pool e o mesmo limite.
+
+    Cada chamada passa pelo `ResilientCaller`: prazo total (`timeout`, ou `prazo=` na chamada),
+    limitador de taxa pela cota, retentativas com jitter para erros transitórios e disjuntor.
+    Com o disjuntor aberto as chamadas falham na hora com CircuitOpenError.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, organization: Optional[str] = None,
+                 base_url: Optional[str] = None, max_concorrencia: int = 8, max_conexoes: int = 20,
+                 timeout: float = 60.0, requisicoes_por_minuto: Optional[float] = None,
+                 max_tentativas: int = 3, disjuntor: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            api_key (str, opcional): Chave da API. Padrão: variável OPENAI_API_KEY.
+            organization (str, opcional): ID da organização. Padrão: variável OPENAI_ORG_ID.
+            base_url (str, opcional): URL base da API (ex.: um servidor compatível local).
+            max_concorrencia (int): Requisições simultâneas permitidas.
+            max_conexoes (int): Tamanho máximo do pool de conexões HTTP.
+            timeout (float): Prazo padrão de cada chamada, com retentativas, em segundos.
+            requisicoes_por_minuto (float, opcional): Cota de requisições por minuto. None não limita.
+            max_tentativas (int): Tentativas por chamada em erros transitórios.
+            disjuntor (CircuitBreaker, opcional): Disjuntor a usar (pode ser compartilhado entre clientes).
+        """
+        self.api_key = api_key
+        self.organization = organization
+        self.base_url = base_url
+        self.max_concorrencia = max_concorrencia
+        self.max_conexoes = max_conexoes
+        self.timeout = timeout
+        self.max_tentativas = max_tentativas
+        self.resiliencia = ResilientCaller(
+            prazo=timeout,
+            limitador=TokenBucket.por_minuto(requisicoes_por_minuto) if requisicoes_por_minuto else None,
+            disjuntor=disjuntor,
+            politica=RetryPolicy(max_tentativas=max_tentativas),
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def com_chave(self, api_key: str) -> "OpenAIClientPool":
+        """
+        Cria um pool com a mesma configuração e outra chave. O limite de concorrência, a cota
+        e o disjuntor são próprios, pois a chave tem a sua própria cota na API.
+        """
+        return OpenAIClientPool(api_key=api_key, organization=self.organization, base_url=self.base_url,
+                                max_concorrencia=self.max_concorrencia, max_conexoes=self.max_conexoes,
+                                timeout=self.timeout, max_tentativas=self.max_tentativas)
+
+    def _iniciar(self) -> asyncio.AbstractEventLoop:
+        """Cria, na primeira chamada, o event loop em segundo plano e o cliente HTTP."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="openai-client-loop", daemon=True)
+                self._thread.start()
+                try:
+                    asyncio.run_coroutine_threadsafe(self._criar_cliente(), loop).result()
+                except BaseException:
+                    # Sem cliente, encerra o loop recém-criado para não deixar uma thread por chamada falha
+                    loop.call_soon_threadsafe(loop.stop)
+                    self._thread.join()
+                    loop.close()
+                    self._thread = None
+                    raise
+                self._loop = loop
+            return self._loop
+
+    async def _criar_cliente(self) -> None:
+        limites = httpx.Limits(max_connections=self.max_conexoes, max_keepalive_connections=self.max_conexoes)
+        self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+        self._client = AsyncOpenAI(
+            api_key=self.api_key,
+            organization=self.organization,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=0,  # As retentativas ficam com o ResilientCaller, dentro do prazo da chamada
+            http_client=httpx.AsyncClient(limits=limites, timeout=self.timeout),
+        )
+
+    async def _executar_chat(self, mensagens: Mensagens, modelo: str, max_tokens: int, temperatura: float,
+                             **parametros: Any) -> str:
+        prazo = parametros.pop('prazo', None)
+
+        async def tentar(restante: float):
+            return await self._client.chat.completions.create(
+                model=modelo,
+                messages=mensagens,
+                max_tokens=max_tokens,
+                temperature=temperatura,
+                timeout=restante,
+                **parametros,
+            )
+
+        # A vaga é obtida antes do ResilientCaller: a espera na fila local não consome o prazo
+        # nem conta como falha no disjuntor
+        async with self._semaforo:
+            response = await self.resiliencia.executar(tentar, prazo)
+        return (response.choices[0].message.content or "").strip()
+
+    async def _executar_stream(self, mensagens: Mensagens, modelo: str, max_tokens: int, temperatura: float,
+                               entregar: Callable[[Any], None], **parametros: Any) -> None:
+        """
+        Repassa a `entregar` cada trecho de texto recebido, depois `_FIM_STREAM` ou a exceção.
+        O prazo e as retentativas valem até a abertura do stream.
+        """
+        prazo = parametros.pop('prazo', None)
+
+        async def tentar(restante: float):
+            return await self._client.chat.completions.create(
+                model=modelo,
+                messages=mensagens,
+                max_tokens=max_tokens,
+                temperature=temperatura,
+                stream=True,
+                timeout=restante,
+                **parametros,
+            )
+
+        try:
+            # Como em `_executar_chat`, o prazo começa com a vaga obtida; ela fica ocupada até o fim do stream
+            async with self._semaforo:
+                stream = await self.resiliencia.executar(tentar, prazo)
+                async for evento in stream:
+                    if evento.choices and evento.choices[0].delta.content:
+                        entregar(evento.choices[0].delta.content)
+        except Exception as e:
+            entregar(e)
+        else:
+            entregar(_FIM_STREAM)
+
+    def _submeter(self, corrotina) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(corrotina, self._iniciar())
+
+    async def completar_chat(self, mensagens: Union[str, Mensagens], modelo: str = "gpt-4", max_tokens: int = 500,
+                             temperatura: float = 0.7, **parametros: Any) -> str:
+        """
+        Envia uma conversa (ou um prompt simples) e retorna o texto da resposta.
+
+        Pode ser aguardada de qualquer event loop: a requisição é executada no loop do pool.
+        """
+        return await asyncio.wrap_future(self._submeter(
+            self._executar_chat(_como_mensagens(mensagens), modelo, max_tokens, temperatura, **parametros)
+        ))
+
+    def completar_chat_sync(self, mensagens: Union[str, Mensagens], modelo: str = "gpt-4", max_tokens: int = 500,
+                            temperatura: float = 0.7, **parametros: Any) -> str:
+        """
+        Versão bloqueante de `completar_chat`, para código síncrono.
+        """
+        return self._submeter(
+            self._executar_chat(_como_mensagens(mensagens), modelo, max_tokens, temperatura, **parametros)
+        ).result()
+
+    async def transmitir_chat(self, mensagens: Union[str, Mensagens], modelo: str = "gpt-4", max_tokens: int = 500,
+                              temperatura: float = 0.7, **parametros: Any) -> AsyncIterator[str]:
+        """
+        Envia a conversa com `stream=True` e gera os trechos de texto à medida que chegam.
+        """
+        fila: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        futuro = self._submeter(self._executar_stream(
+            _como_mensagens(mensagens), modelo, max_tokens, temperatura,
+            lambda item: loop.call_soon_threadsafe(fila.put_nowait, item), **parametros
+        ))
+        try:
+            while True:
+                item = await fila.get()
+                if item is _FIM_STREAM:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            futuro.cancel()
+
+    def transmitir_chat_sync(self, mensagens: Union[str, Mensagens], modelo: str = "gpt-4", max_tokens: int = 500,
+                             temperatura: float = 0.7, **parametros: Any) -> Iterator[str]:
+        """
+        Versão bloqueante de `transmitir_chat`: um iterador que espera cada trecho de texto.
+        Interromper a iteração cancela a requisição.
+        """
+        fila: queue.Queue = queue.Queue()
+        futuro = self._submeter(self._executar_stream(
+            _como_mensagens(mensagens), modelo, max_tokens, temperatura, fila.put, **parametros
+        ))
+        try:
+            while True:
+                item = fila.get()
+                if item is _FIM_STREAM:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            futuro.cancel()
+
+    async def completar_varios(self, prompts: Sequence[Union[str, Mensagens]], **parametros: Any) -> List[Union[str, Exception]]:
+        """
+        Envia vários prompts em paralelo (respeitando `max_concorrencia`).
+
+        Returns:
+            list: Respostas na ordem dos prompts; falhas aparecem como a exceção correspondente.
+        """
+        return await asyncio.wrap_future(self._submeter(self._executar_varios(prompts, **parametros)))
+
+    def completar_varios_sync(self, prompts: Sequence[Union[str, Mensagens]], **parametros: Any) -> List[Union[str, Exception]]:
+        """
+        Versão bloqueante de `completar_varios`.
+        """
+        return self._submeter(self._executar_varios(prompts, **parametros)).result()
+
+    async def _executar_varios(self, prompts: Sequence[Union[str, Mensagens]], modelo: str = "gpt-4",
+                               max_tokens: int = 500, temperatura: float = 0.7,
+                               **parametros: Any) -> List[Union[str, Exception]]:
+        return await asyncio.gather(
+            *(self._executar_chat(_como_mensagens(prompt), modelo, max_tokens, temperatura, **parametros)
+              for prompt in prompts),
+            return_exceptions=True,
+        )
+
+    def estatisticas(self) -> Dict[str, object]:
+        """
+        Retorna os contadores de chamadas e retentativas e o estado do disjuntor.
+        """
+        return self.resiliencia.estatisticas()
+
+    def fechar(self) -> None:
+        """
+        Fecha as conexões HTTP e encerra o event loop do pool.
+        """
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = self._client = None
+
+
+def _como_mensagens(mensagens: Union[str, Mensagens]) -> Mensagens:
+    if isinstance(mensagens, str):
+        return [{"role": "user", "content": mensagens}]
+    return mensagens
+
+
+_cliente_compartilhado: Optional[OpenAIClientPool] = None
+_lock_compartilhado = threading.Lock()
+
+
+def obter_cliente_compartilhado() -> OpenAIClientPool:
+    """
+    Retorna o cliente único da aplicação, configurado pelas variáveis de ambiente
+    OPENAI_API_KEY, OPENAI_ORG_ID, OPENAI_MAX_CONCURRENCY, OPENAI_TIMEOUT (prazo por chamada),
+    OPENAI_RPM (cota de requisições por minuto), OPENAI_MAX_RETRIES e OPENAI_BASE_URL
+    (ex.: o servidor simulado de `tests/mock_openai_server.py`, para testes sem custo).
+    """
+    global _cliente_compartilhado
+    with _lock_compartilhado:
+        if _cliente_compartilhado is None:
+            env = Env()
+            env.read_env()
+            _cliente_compartilhado = OpenAIClientPool(
+                api_key=env.str("OPENAI_API_KEY", default=None),
+                organization=env.str("OPENAI_ORG_ID", default=None),
+                base_url=env.str("OPENAI_BASE_URL", default=None),
+                max_concorrencia=env.int("OPENAI_MAX_CONCURRENCY", default=8),
+                timeout=env.float("OPENAI_TIMEOUT", default=30.0),
+                requisicoes_por_minuto=env.float("OPENAI_RPM", default=None),
+                max_tentativas=env.int("OPENAI_MAX_RETRIES", default=3),
+            )
+        return _cliente_compartilhado
@@ -1,38 +1,71 @@
 import logging
+import functools
+from typing import Callable, Optional, Tuple
 from environs import Env
 
-# Configurações da API OpenAI
-env = Env()
-env.read_env()
+from app_balance.services.openai_client import obter_cliente_compartilhado
+from app_balance.services.resilience import CircuitOpenError
+from app_balance.services.response_cache import ResponseCache, obter_cache_compartilhado
+from app_balance.services.single_flight import SingleFlight
+from app_balance.services.text_processing import TextProcessingService
 
-try:
-    import openai
-except ImportError:
-    logging.error("O pacote 'openai' não foi encontrado. Certifique-se de que ele está instalado.")
-    raise
+def verificar_credenciais() -> Tuple[str, str]:
+    """
+    Lê as credenciais da API OpenAI do ambiente (.env) no momento do uso, e não na importação.
+
+    Raises:
+        EnvironmentError: Se a chave ou o ID da organização não estiverem definidos.
+    """
+    env = Env()
+    env.read_env()
+    openai_key = env.str("OPENAI_API_KEY", default=None)
+    organization_id = env.str("OPENAI_ORG_ID", default=None)
+
+    if not openai_key:
+        raise EnvironmentError("A chave da API do OpenAI não está definida. Verifique o arquivo .env")
+    if not organization_id:
+        raise EnvironmentError("O ID da organização do OpenAI não está definido. Verifique o arquivo .env")
+    return openai_key, organization_id
+
+# Agrupa chamadas idênticas de analyze_data que chegam ao mesmo tempo
+coalescedor = SingleFlight()
 
-openai_key = env.str("OPENAI_API_KEY", default=None)
-organization_id = env.str("OPENAI_ORG_ID", default=None)
+@functools.lru_cache(maxsize=None)
+def _processador_local() -> TextProcessingService:
+    return TextProcessingService()
 
-if not openai_key:
-    raise EnvironmentError("A chave da API do OpenAI não está definida. Verifique o arquivo .env")
-if not organization_id:
-    raise EnvironmentError("O ID da organização do OpenAI não está definido. Verifique o arquivo .env")
+def resposta_local(prompt: str) -> str:
+    """Fallback padrão de analyze_data: a resposta offline do classificador local."""
+    return _processador_local().gerar_resposta_local(prompt)
 
-def analyze_data(prompt: str) -> str:
+def analyze_data(prompt: str, cache: Optional[ResponseCache] = None, usar_cache: bool = True,
+                 fallback_local: Optional[Callable[[str], str]] = None) -> str:
     """
     Envia o prompt para o GPT-4 e retorna a resposta.
-    Se houver um erro, retorna uma resposta padrão baseada em dados locais.
+    Se houver um erro, retorna `fallback_local(prompt)` (padrão: `resposta_local`); com o
+    disjuntor do cliente aberto, o fallback é usado na hora, sem tentar a rede.
+    Prompts repetidos são respondidos pelo `cache` (padrão: o cache compartilhado da aplicação)
+    sem nova chamada, exceto com `usar_cache=False`, e chamadas simultâneas com o mesmo
+    prompt dividem uma única requisição.
     """
-    try:
+    def completar() -> str:
+        verificar_credenciais()
         logging.info(f"Enviando prompt para GPT-4: {prompt}")
-        response = openai.Completion.create(
-            model="gpt-4",
-            prompt=prompt,
-            max_tokens=500,
-            temperature=0.7
-        )
-        return response.choices[0].text.strip()
+        return obter_cliente_compartilhado().completar_chat_sync(prompt, modelo="gpt-4", max_tokens=500,
+                                                                 temperatura=0.7)
+
+    def completar_coalescido() -> str:
+        chave = (ResponseCache.normalizar_prompt(prompt), "gpt-4", 0.7, 500)
+        return coalescedor.executar(chave, completar)
+
+    try:
+        gerar = completar_coalescido if usar_cache else completar
+        if cache is None:
+            cache = obter_cache_compartilhado()
+        return cache.obter_ou_gerar(prompt, "gpt-4", 0.7, 500, gerar, usar_cache=usar_cache,
+                                    origem=obter_cliente_compartilhado().base_url)
+    except CircuitOpenError:
+        logging.warning("GPT-4 indisponível (disjuntor aberto); usando resposta local.")
     except Exception as e:
         logging.error(f"Erro ao comunicar com GPT-4: {str(e)}")
-        return "Desculpe, houve um erro ao processar sua solicitação."
+    return (fallback_local or resposta_local)(prompt)
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
-from processamento.models import PromptModel, GPT4Response, Recebimento, Usuario
+from processamento.models import Analise, PromptModel, GPT4Response, Recebimento, Usuario
 from datetime import datetime
+from itertools import islice
+from typing import Callable, List, Optional
 import logging
 
 # Configurar logging
@@ -51,19 +53,57 @@ class DataPersistenceService:
             logging.error(f"Erro ao salvar prompt e resposta: {str(e)}")
             raise RuntimeError(f"Erro ao salvar prompt e resposta: {str(e)}") from e
 
+    def analyze_stored_prompts_sentiment(self, classify_batch: Callable[[List[str]], List[Optional[str]]],
+                                         batch_size: int = 256) -> int:
+        """
+        Classifica o sentimento dos prompts armazenados do usuário e salva cada resultado
+        como uma Analise do tipo 'sentimento'.
+
+        Args:
+            classify_batch (callable): Recebe uma lista de textos e devolve um rótulo por texto,
+                ex.: `TextProcessingService.analyze_sentiment_batch`, que usa a fila em micro-lotes.
+                Textos que não puderam ser classificados vêm como None e não são salvos.
+            batch_size (int): Quantos prompts são lidos do banco e enviados ao classificador de cada vez.
+
+        Returns:
+            int: Número de análises salvas.
+        """
+        try:
+            prompts = iter(self.session.query(PromptModel).filter_by(usuario_id=self.usuario.id)
+                           .order_by(PromptModel.id).yield_per(batch_size))
+            salvas = ignoradas = 0
+            while bloco := list(islice(prompts, batch_size)):
+                sentimentos = classify_batch([prompt.texto for prompt in bloco])
+                for prompt, sentimento in zip(bloco, sentimentos):
+                    if sentimento is None:
+                        ignoradas += 1
+                        continue
+                    self.session.add(Analise(tipo_analise="sentimento", resultado=sentimento, prompt_id=prompt.id))
+                    salvas += 1
+            self.session.commit()
+            logging.info(f"Sentimento de {salvas} prompts analisado para o usuário {self.usuario.nome}"
+                         f" ({ignoradas} não classificados).")
+            return salvas
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Erro ao analisar sentimento dos prompts: {str(e)}")
+            raise RuntimeError(f"Erro ao analisar sentimento dos prompts: {str(e)}") from e
+
     def save_financial_analysis(self, categorias_custos: dict, total_custos: float, receita_projetada: float):
         """
         Salva os dados da análise financeira, incluindo as categorias de custo e receita projetada.
         """
         try:
             logging.info(f"Salvando análise financeira. Total de custos: {total_custos}, Receita projetada: {receita_projetada}")
+            # Um único instante para todas as categorias: identifica a análise no histórico
+            agora = datetime.now()
             for categoria, valor in categorias_custos.items():
                 recebimento = Recebimento(
                     categoria=categoria,
                     valor=valor,
                     total_custos=total_custos,
                     receita_projetada=receita_projetada,
-                    data_recebimento=datetime.now(),
+                    data_recebimento=agora,
                     usuario_id=self.usuario.id,
                 )
                 self.session.add(recebimento)
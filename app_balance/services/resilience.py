@@ -0,0 +1,263 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+T = TypeVar("T")
+
+# Status HTTP que indicam falha transitória do servidor (vale tentar de novo)
+STATUS_RETENTAVEIS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Chamada recusada sem acessar a rede porque o disjuntor está aberto."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """O prazo da chamada acabou (incluindo esperas do limitador e retentativas)."""
+
+
+class TokenBucket:
+    """
+    Limitador de taxa por balde de fichas: `taxa` requisições por segundo, com rajadas de até `capacidade`.
+    """
+
+    def __init__(self, taxa: float, capacidade: Optional[float] = None, relogio: Callable[[], float] = time.monotonic):
+        if taxa <= 0:
+            raise ValueError("A taxa do limitador deve ser positiva.")
+        self.taxa = taxa
+        self.capacidade = capacidade if capacidade is not None else max(1.0, taxa)
+        self._relogio = relogio
+        self._fichas = self.capacidade
+        self._ultima_reposicao = relogio()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def por_minuto(cls, requisicoes_por_minuto: float, capacidade: Optional[float] = None) -> "TokenBucket":
+        """Cria o limitador a partir da cota em requisições por minuto."""
+        return cls(requisicoes_por_minuto / 60.0, capacidade)
+
+    def reservar(self, espera_maxima: Optional[float] = None) -> Optional[float]:
+        """
+        Reserva uma ficha e retorna quantos segundos esperar até usá-la.
+        Retorna None, sem reservar, se a espera passaria de `espera_maxima`.
+        """
+        with self._lock:
+            agora = self._relogio()
+            self._fichas = min(self.capacidade, self._fichas + (agora - self._ultima_reposicao) * self.taxa)
+            self._ultima_reposicao = agora
+            espera = max(0.0, (1 - self._fichas) / self.taxa)
+            if espera_maxima is not None and espera > espera_maxima:
+                return None
+            self._fichas -= 1
+            return espera
+
+    def adquirir(self, timeout: Optional[float] = None) -> bool:
+        """Espera (bloqueando) por uma ficha. Retorna False se o `timeout` não bastar."""
+        espera = self.reservar(timeout)
+        if espera is None:
+            return False
+        if espera:
+            time.sleep(espera)
+        return True
+
+    async def adquirir_async(self, timeout: Optional[float] = None) -> bool:
+        """Versão assíncrona de `adquirir`."""
+        espera = self.reservar(timeout)
+        if espera is None:
+            return False
+        if espera:
+            await asyncio.sleep(espera)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para chamadas ao GPT.
+
+    Depois de `limite_falhas` falhas transitórias seguidas o disjuntor abre e as chamadas
+    são recusadas na hora (CircuitOpenError), para que o chamador use o caminho local.
+    Passado `tempo_reabertura`, uma única chamada de teste é liberada (meio aberto):
+    se der certo o disjuntor fecha, se falhar volta a abrir.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, limite_falhas: int = 5, tempo_reabertura: float = 30.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.limite_falhas = limite_falhas
+        self.tempo_reabertura = tempo_reabertura
+        self._relogio = relogio
+        self._estado = self.FECHADO
+        self._falhas_seguidas = 0
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+        self._contadores = {'aberturas': 0, 'recusadas': 0}
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            return self._atualizar_estado()
+
+    def permitir(self) -> None:
+        """
+        Libera a chamada ou levanta CircuitOpenError se o disjuntor estiver aberto.
+        """
+        with self._lock:
+            estado = self._atualizar_estado()
+            if estado == self.FECHADO:
+                return
+            if estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return
+            self._contadores['recusadas'] += 1
+        raise CircuitOpenError("Disjuntor do GPT aberto; usando o caminho local.")
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self._estado = self.FECHADO
+            self._falhas_seguidas = 0
+            self._teste_em_andamento = False
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self._falhas_seguidas += 1
+            if self._estado == self.MEIO_ABERTO or self._falhas_seguidas >= self.limite_falhas:
+                if self._estado != self.ABERTO:
+                    self._contadores['aberturas'] += 1
+                self._estado = self.ABERTO
+                self._aberto_em = self._relogio()
+            self._teste_em_andamento = False
+
+    def liberar_teste(self) -> None:
+        """Libera a vaga de chamada de teste quando ela termina sem sucesso nem falha transitória."""
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def estatisticas(self) -> Dict[str, object]:
+        with self._lock:
+            estatisticas = dict(self._contadores)
+            estatisticas['estado'] = self._atualizar_estado()
+            estatisticas['falhas_seguidas'] = self._falhas_seguidas
+        return estatisticas
+
+    def _atualizar_estado(self) -> str:
+        if self._estado == self.ABERTO and self._relogio() - self._aberto_em >= self.tempo_reabertura:
+            self._estado = self.MEIO_ABERTO
+            self._teste_em_andamento = False
+        return self._estado
+
+
+class RetryPolicy:
+    """
+    Retentativas com espera exponencial e jitter completo, só para erros transitórios.
+    """
+
+    def __init__(self, max_tentativas: int = 3, atraso_base: float = 0.5, atraso_maximo: float = 8.0):
+        self.max_tentativas = max_tentativas
+        self.atraso_base = atraso_base
+        self.atraso_maximo = atraso_maximo
+
+    @staticmethod
+    def e_retentavel(erro: BaseException) -> bool:
+        """Timeouts, falhas de conexão, 429 e 5xx são transitórios; erros do pedido (4xx) não."""
+        if isinstance(erro, (openai.APIConnectionError, asyncio.TimeoutError)):
+            return True
+        if isinstance(erro, openai.APIStatusError):
+            return erro.status_code in STATUS_RETENTAVEIS
+        return False
+
+    def atraso(self, tentativa: int, erro: Optional[BaseException] = None) -> float:
+        """Espera antes da próxima tentativa (`tentativa` começa em 1), respeitando o Retry-After."""
+        atraso = random.uniform(0, min(self.atraso_maximo, self.atraso_base * 2 ** (tentativa - 1)))
+        resposta = getattr(erro, 'response', None)
+        if resposta is not None:
+            try:
+                atraso = max(atraso, float(resposta.headers.get('retry-after', 0)))
+            except (TypeError, ValueError):
+                pass
+        return atraso
+
+
+class ResilientCaller:
+    """
+    Executa chamadas assíncronas ao GPT com prazo, limitador de taxa, retentativas e disjuntor.
+
+    O prazo vale para a chamada inteira: esperas do limitador, tentativas e intervalos entre
+    elas. Cada tentativa recebe o tempo restante, que deve ser repassado como timeout HTTP.
+    """
+
+    def __init__(self, prazo: float = 30.0, limitador: Optional[TokenBucket] = None,
+                 disjuntor: Optional[CircuitBreaker] = None, politica: Optional[RetryPolicy] = None):
+        self.prazo = prazo
+        self.limitador = limitador
+        self.disjuntor = disjuntor or CircuitBreaker()
+        self.politica = politica or RetryPolicy()
+        self._lock = threading.Lock()
+        self._contadores = {'chamadas': 0, 'tentativas': 0, 'retentativas': 0, 'falhas': 0, 'prazos_excedidos': 0}
+
+    async def executar(self, chamada: Callable[[float], Awaitable[T]], prazo: Optional[float] = None) -> T:
+        """
+        Executa `chamada(tempo_restante)` com as proteções configuradas.
+
+        Raises:
+            CircuitOpenError: Se o disjuntor estiver aberto (sem acessar a rede).
+            DeadlineExceededError: Se o prazo acabar antes de uma resposta.
+        """
+        limite = time.monotonic() + (prazo if prazo is not None else self.prazo)
+        self._contar('chamadas')
+        tentativa = 0
+        while True:
+            self.disjuntor.permitir()
+            try:
+                restante = limite - time.monotonic()
+                if self.limitador is not None and not await self.limitador.adquirir_async(restante):
+                    raise DeadlineExceededError("Prazo insuficiente para aguardar a cota de requisições.")
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise DeadlineExceededError("Prazo da chamada ao GPT esgotado.")
+                tentativa += 1
+                self._contar('tentativas')
+                resultado = await asyncio.wait_for(chamada(restante), restante)
+            except DeadlineExceededError:
+                self.disjuntor.liberar_teste()
+                self._contar('prazos_excedidos')
+                raise
+            except Exception as e:
+                if not self.politica.e_retentavel(e):
+                    self.disjuntor.liberar_teste()
+                    self._contar('falhas')
+                    raise
+                self.disjuntor.registrar_falha()
+                atraso = self.politica.atraso(tentativa, e)
+                if tentativa >= self.politica.max_tentativas or time.monotonic() + atraso >= limite:
+                    self._contar('falhas')
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._contar('prazos_excedidos')
+                        raise DeadlineExceededError("Prazo da chamada ao GPT esgotado.") from e
+                    raise
+                self._contar('retentativas')
+                await asyncio.sleep(atraso)
+            else:
+                self.disjuntor.registrar_sucesso()
+                return resultado
+
+    def estatisticas(self) -> Dict[str, object]:
+        """
+        Retorna os contadores de chamadas, tentativas, retentativas, falhas e prazos excedidos,
+        junto com o estado do disjuntor.
+        """
+        with self._lock:
+            estatisticas = dict(self._contadores)
+        estatisticas['disjuntor'] = self.disjuntor.estatisticas()
+        return estatisticas
+
+    def _contar(self, contador: str) -> None:
+        with self._lock:
+            self._contadores[contador] += 1
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+# Versão do formato da chave; mudar o conteúdo da chave exige incrementar para não reaproveitar
+# respostas gravadas no SQLite com o formato antigo
+VERSAO_CHAVE = "2"
+
+class ResponseCache:
+    """
+    Cache de respostas do GPT em dois níveis: LRU em memória e SQLite persistente.
+
+    A chave combina o prompt normalizado (espaços colapsados), o modelo, a temperatura,
+    o max_tokens e a origem da resposta (o base_url da API; None é a API padrão da OpenAI),
+    para que respostas de um servidor de teste não sejam servidas como se viessem da produção. As entradas expiram após `ttl` segundos. Pedidos não determinísticos
+    devem passar `usar_cache=False`, o que ignora o cache e é contabilizado como bypass.
+    """
+
+    def __init__(self, caminho_db: Optional[str] = None, max_itens_memoria: int = 1024,
+                 ttl: Optional[float] = 24 * 3600):
+        """
+        Args:
+            caminho_db (str, opcional): Arquivo SQLite do nível persistente. None usa só a memória;
+                a aplicação usa `obter_cache_compartilhado`, que grava em `caminho_cache_padrao()`.
+            max_itens_memoria (int): Número máximo de respostas no nível em memória.
+            ttl (float, opcional): Validade das respostas em segundos. None nunca expira.
+        """
+        self.max_itens_memoria = max_itens_memoria
+        self.ttl = ttl
+        self._memoria: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {'hits_memoria': 0, 'hits_sqlite': 0, 'misses': 0, 'bypass': 0}
+        self._conexao = None
+        if caminho_db:
+            self._conexao = sqlite3.connect(caminho_db, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS respostas ("
+                "chave TEXT PRIMARY KEY, resposta TEXT NOT NULL, expira REAL)"
+            )
+            self._conexao.commit()
+
+    @staticmethod
+    def normalizar_prompt(prompt: str) -> str:
+        return " ".join(prompt.split())
+
+    def gerar_chave(self, prompt: str, modelo: str, temperatura: float, max_tokens: int,
+                    origem: Optional[str] = None) -> str:
+        """
+        Gera a chave do cache para uma requisição.
+
+        Args:
+            origem (str, opcional): base_url da API que gera a resposta; None é a API padrão.
+        """
+        conteudo = json.dumps(
+            [VERSAO_CHAVE, (origem or "").rstrip("/"), self.normalizar_prompt(prompt), modelo, float(temperatura),
+             int(max_tokens)], ensure_ascii=False
+        )
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Busca a resposta na memória e depois no SQLite. Acertos no SQLite voltam para a memória.
+        """
+        agora = time.time()
+        with self._lock:
+            entrada = self._memoria.get(chave)
+            if entrada is not None:
+                resposta, expira = entrada
+                if expira is None or expira > agora:
+                    self._memoria.move_to_end(chave)
+                    self._contadores['hits_memoria'] += 1
+                    return resposta
+                del self._memoria[chave]
+
+            if self._conexao is not None:
+                linha = self._conexao.execute(
+                    "SELECT resposta, expira FROM respostas WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None and (linha[1] is None or linha[1] > agora):
+                    self._guardar_memoria(chave, linha[0], linha[1])
+                    self._contadores['hits_sqlite'] += 1
+                    return linha[0]
+
+            self._contadores['misses'] += 1
+            return None
+
+    def armazenar(self, chave: str, resposta: str) -> None:
+        """
+        Grava a resposta nos dois níveis.
+        """
+        expira = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._guardar_memoria(chave, resposta, expira)
+            if self._conexao is not None:
+                try:
+                    self._conexao.execute(
+                        "INSERT OR REPLACE INTO respostas (chave, resposta, expira) VALUES (?, ?, ?)",
+                        (chave, resposta, expira),
+                    )
+                    self._conexao.commit()
+                except sqlite3.Error as e:
+                    logging.error(f"Erro ao gravar resposta no cache SQLite: {str(e)}")
+
+    def obter_ou_gerar(self, prompt: str, modelo: str, temperatura: float, max_tokens: int,
+                       gerar: Callable[[], str], usar_cache: bool = True, origem: Optional[str] = None) -> str:
+        """
+        Retorna a resposta em cache ou chama `gerar` e armazena o resultado.
+
+        Args:
+            usar_cache (bool): False ignora o cache (pedidos não determinísticos).
+            origem (str, opcional): base_url da API que gera a resposta (ver `gerar_chave`).
+        """
+        if not usar_cache:
+            with self._lock:
+                self._contadores['bypass'] += 1
+            return gerar()
+
+        chave = self.gerar_chave(prompt, modelo, temperatura, max_tokens, origem)
+        resposta = self.obter(chave)
+        if resposta is None:
+            resposta = gerar()
+            self.armazenar(chave, resposta)
+        return resposta
+
+    async def obter_ou_gerar_async(self, prompt: str, modelo: str, temperatura: float, max_tokens: int,
+                                   gerar: Callable[[], Awaitable[str]], usar_cache: bool = True,
+                                   origem: Optional[str] = None) -> str:
+        """
+        Versão de `obter_ou_gerar` para geradores assíncronos.
+        """
+        if not usar_cache:
+            with self._lock:
+                self._contadores['bypass'] += 1
+            return await gerar()
+
+        chave = self.gerar_chave(prompt, modelo, temperatura, max_tokens, origem)
+        resposta = self.obter(chave)
+        if resposta is None:
+            resposta = await gerar()
+            self.armazenar(chave, resposta)
+        return resposta
+
+    def remover_expirados(self) -> None:
+        """
+        Remove do SQLite e da memória as respostas expiradas.
+        """
+        agora = time.time()
+        with self._lock:
+            for chave in [chave for chave, (_, expira) in self._memoria.items() if expira is not None and expira <= agora]:
+                del self._memoria[chave]
+            if self._conexao is not None:
+                self._conexao.execute("DELETE FROM respostas WHERE expira IS NOT NULL AND expira <= ?", (agora,))
+                self._conexao.commit()
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna os contadores e a taxa de acerto (acertos / consultas que usaram o cache).
+        """
+        with self._lock:
+            estatisticas = dict(self._contadores)
+        hits = estatisticas['hits_memoria'] + estatisticas['hits_sqlite']
+        consultas = hits + estatisticas['misses']
+        estatisticas['taxa_acerto'] = hits / consultas if consultas else 0.0
+        return estatisticas
+
+    def fechar(self) -> None:
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+    def _guardar_memoria(self, chave: str, resposta: str, expira: Optional[float]) -> None:
+        self._memoria[chave] = (resposta, expira)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_itens_memoria:
+            self._memoria.popitem(last=False)
+
+
+def caminho_cache_padrao() -> str:
+    """
+    Arquivo SQLite do cache compartilhado: RESPONSE_CACHE_PATH ou
+    ~/.cache/app_balance/cache_respostas.sqlite (o diretório é criado se não existir).
+    """
+    caminho = os.getenv("RESPONSE_CACHE_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "app_balance", "cache_respostas.sqlite")
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    return caminho
+
+
+_cache_compartilhado: Optional[ResponseCache] = None
+_lock_compartilhado = threading.Lock()
+
+
+def obter_cache_compartilhado() -> ResponseCache:
+    """
+    Retorna o cache de respostas único da aplicação (memória + SQLite em `caminho_cache_padrao()`),
+    usado pelo GPTService da aplicação e por `analyze_data`.
+    """
+    global _cache_compartilhado
+    with _lock_compartilhado:
+        if _cache_compartilhado is None:
+            _cache_compartilhado = ResponseCache(caminho_cache_padrao())
+        return _cache_compartilhado
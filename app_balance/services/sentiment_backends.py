@@ -0,0 +1,130 @@
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+MODELO_SENTIMENTO = "roberta-base"
+
+# pytorch: precisão total; int8: quantização dinâmica das camadas lineares no PyTorch;
+# onnx: modelo exportado para o ONNX Runtime; onnx-int8: exportado e quantizado (int8 dinâmico)
+BACKENDS = ("pytorch", "int8", "onnx", "onnx-int8")
+
+
+def backend_configurado() -> str:
+    """
+    Retorna o backend do pipeline de sentimentos escolhido em SENTIMENT_BACKEND (padrão: pytorch).
+
+    Raises:
+        ValueError: Se o backend não existe.
+    """
+    backend = os.getenv("SENTIMENT_BACKEND", "pytorch").strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de sentimentos desconhecido: {backend}. Opções: {', '.join(BACKENDS)}")
+    return backend
+
+
+def diretorio_onnx(modelo: str = MODELO_SENTIMENTO) -> str:
+    """
+    Diretório onde o modelo exportado para ONNX é guardado (SENTIMENT_ONNX_DIR ou ~/.cache/app_balance/onnx).
+    """
+    base = os.getenv("SENTIMENT_ONNX_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "app_balance", "onnx")
+    return os.path.join(base, modelo.replace("/", "--"))
+
+
+def carregar_sentimento(backend: str = "pytorch", modelo: str = MODELO_SENTIMENTO) -> Callable:
+    """
+    Carrega o pipeline de sentimentos no backend pedido. Todos os backends devolvem um
+    pipeline do transformers, chamado da mesma forma (texto ou lista de textos, `batch_size`).
+
+    A primeira carga ONNX exporta o modelo (e, em onnx-int8, quantiza) para `diretorio_onnx`;
+    as seguintes só leem os arquivos.
+    """
+    from transformers import pipeline
+
+    if backend == "pytorch":
+        return pipeline("sentiment-analysis", model=modelo)
+
+    if backend == "int8":
+        import torch
+        classificador = pipeline("sentiment-analysis", model=modelo)
+        classificador.model = torch.quantization.quantize_dynamic(classificador.model, {torch.nn.Linear},
+                                                                  dtype=torch.qint8)
+        return classificador
+
+    if backend in ("onnx", "onnx-int8"):
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        destino = diretorio_onnx(modelo)
+        if not os.path.exists(os.path.join(destino, "model.onnx")):
+            logging.info(f"Exportando '{modelo}' para ONNX em {destino}...")
+            exportado = ORTModelForSequenceClassification.from_pretrained(modelo, export=True)
+            exportado.save_pretrained(destino)
+            AutoTokenizer.from_pretrained(modelo).save_pretrained(destino)
+
+        arquivo = "model.onnx"
+        if backend == "onnx-int8":
+            arquivo = "model_quantized.onnx"
+            if not os.path.exists(os.path.join(destino, arquivo)):
+                from optimum.onnxruntime import ORTQuantizer
+                from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+                logging.info(f"Quantizando '{modelo}' para int8 em {destino}...")
+                quantizador = ORTQuantizer.from_pretrained(destino, file_name="model.onnx")
+                quantizador.quantize(save_dir=destino,
+                                     quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+
+        modelo_onnx = ORTModelForSequenceClassification.from_pretrained(destino, file_name=arquivo)
+        return pipeline("sentiment-analysis", model=modelo_onnx, tokenizer=AutoTokenizer.from_pretrained(destino))
+
+    raise ValueError(f"Backend de sentimentos desconhecido: {backend}. Opções: {', '.join(BACKENDS)}")
+
+
+def carregar_configurado(modelo: Optional[str] = None) -> Callable:
+    """Carrega o pipeline de sentimentos no backend de SENTIMENT_BACKEND."""
+    return carregar_sentimento(backend_configurado(), modelo or MODELO_SENTIMENTO)
+
+
+def comparar_previsoes(referencia: Sequence[Dict], candidato: Sequence[Dict], min_concordancia: float = 0.99) -> Dict:
+    """
+    Compara as previsões ({'label', 'score'}) de dois backends para os mesmos textos.
+
+    Returns:
+        dict: 'concordancia' (fração de rótulos iguais), 'divergencias' (índices com rótulos
+            diferentes), 'diferenca_max_score' (entre previsões de mesmo rótulo) e 'aprovado'
+            (concordância >= `min_concordancia`).
+    """
+    if len(referencia) != len(candidato):
+        raise ValueError("As previsões comparadas devem ter o mesmo tamanho.")
+    divergencias = [i for i, (a, b) in enumerate(zip(referencia, candidato)) if a["label"] != b["label"]]
+    diferencas = [abs(a["score"] - b["score"]) for a, b in zip(referencia, candidato) if a["label"] == b["label"]]
+    concordancia = 1 - len(divergencias) / len(referencia) if referencia else 1.0
+    return {
+        'concordancia': concordancia,
+        'divergencias': divergencias,
+        'diferenca_max_score': max(diferencas, default=0.0),
+        'aprovado': concordancia >= min_concordancia,
+    }
+
+
+def verificar_paridade(referencia: Callable, candidato: Callable, textos: List[str],
+                       min_concordancia: float = 0.99, batch_size: int = 32) -> Dict:
+    """
+    Roda os dois pipelines nos mesmos textos e compara as previsões (ver `comparar_previsoes`).
+    Use o backend pytorch como referência antes de trocar SENTIMENT_BACKEND em produção.
+    """
+    return comparar_previsoes(referencia(textos, batch_size=batch_size), candidato(textos, batch_size=batch_size),
+                              min_concordancia)
+
+
+TEXTOS_PARIDADE = [
+    "O lucro deste trimestre superou todas as expectativas.",
+    "As despesas saíram do controle e o prejuízo aumentou.",
+    "Estou muito satisfeito com o retorno do investimento.",
+    "O orçamento do mês ficou apertado, mas dentro do previsto.",
+    "Que péssima notícia, perdemos o maior cliente.",
+    "A receita cresceu e os juros caíram, ótimo cenário.",
+    "Não sei se vale a pena manter essa aplicação.",
+    "The quarterly results were excellent.",
+    "This is the worst financial decision we have made.",
+    "Revenue is flat compared to last year.",
+]
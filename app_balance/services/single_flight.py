@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas idênticas em andamento ("single-flight").
+
+    A primeira chamada para uma chave executa a função; as que chegam enquanto ela está em
+    voo esperam o mesmo resultado em vez de repetir a requisição. Exceções são repassadas a
+    todos os que esperam. Quando a chamada termina a chave é liberada, então uma nova chamada
+    volta a executar a função (a reutilização de respostas prontas fica a cargo do cache).
+
+    O controle é feito com `concurrent.futures.Future`, então funciona entre threads e entre
+    event loops: chamadores síncronos e assíncronos da mesma chave dividem a mesma execução.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_voo: Dict[Hashable, Future] = {}
+        self._contadores = {'chamadas': 0, 'upstream': 0, 'coalescidas': 0, 'erros': 0}
+
+    def executar(self, chave: Hashable, funcao: Callable[[], T]) -> T:
+        """
+        Executa `funcao` ou, se já houver uma chamada com a mesma chave em voo, espera o resultado dela.
+        """
+        futuro, lider = self._entrar(chave)
+        if not lider:
+            return futuro.result()
+        try:
+            resultado = funcao()
+        except BaseException as e:
+            self._concluir(chave, futuro, erro=e)
+            raise
+        self._concluir(chave, futuro, resultado=resultado)
+        return resultado
+
+    async def executar_async(self, chave: Hashable, funcao: Callable[[], Awaitable[T]]) -> T:
+        """
+        Versão assíncrona de `executar`: `funcao` retorna uma corrotina.
+        """
+        futuro, lider = self._entrar(chave)
+        if not lider:
+            return await asyncio.wrap_future(futuro)
+        try:
+            resultado = await funcao()
+        except BaseException as e:
+            self._concluir(chave, futuro, erro=e)
+            raise
+        self._concluir(chave, futuro, resultado=resultado)
+        return resultado
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Retorna os contadores de chamadas, chamadas upstream, coalescidas e com erro,
+        a taxa de coalescência e quantas chaves estão em voo.
+        """
+        with self._lock:
+            estatisticas = dict(self._contadores)
+            estatisticas['em_voo'] = len(self._em_voo)
+        chamadas = estatisticas['chamadas']
+        estatisticas['taxa_coalescencia'] = estatisticas['coalescidas'] / chamadas if chamadas else 0.0
+        return estatisticas
+
+    def _entrar(self, chave: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            self._contadores['chamadas'] += 1
+            futuro = self._em_voo.get(chave)
+            if futuro is not None:
+                self._contadores['coalescidas'] += 1
+                return futuro, False
+            futuro = Future()
+            self._em_voo[chave] = futuro
+            self._contadores['upstream'] += 1
+            return futuro, True
+
+    def _concluir(self, chave: Hashable, futuro: Future, resultado=None, erro: BaseException = None) -> None:
+        with self._lock:
+            del self._em_voo[chave]
+            if erro is not None:
+                self._contadores['erros'] += 1
+        if erro is not None:
+            futuro.set_exception(erro)
+        else:
+            futuro.set_result(resultado)
@@ -1,42 +1,40 @@
-<<<<<<< HEAD
-import spacy
-import logging
-from transformers import pipeline
-from typing import Dict, Union
-from services.gpt_service import GPTService
-
-# Carregar o modelo spaCy para fallback local
-nlp = spacy.load("en_core_web_sm")
-=======
-import openai
 import logging
 import re
-from environs import Env
+from typing import Dict, List, Optional, Union
+from app_balance.services.gpt_service import GPTService
+from app_balance.services.keyword_matcher import KeywordMatcher
+from app_balance.services.local_router import LocalRouter
+from app_balance.services.micro_batcher import MicroBatcher
+from app_balance.services.model_registry import ModelRegistry, model_registry
+from app_balance.services.openai_client import OpenAIClientPool, obter_cliente_compartilhado
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
 
-# Carregar variáveis de ambiente
-env = Env()
-env.read_env()
+def criar_sentiment_batcher(models: ModelRegistry, max_lote: int = 32, max_espera_ms: float = 10.0) -> MicroBatcher:
+    """
+    Cria a fila em micro-lotes do pipeline de sentimentos: os textos que chegam juntos
+    passam pelo modelo numa única chamada, e cada Future recebe o seu {'label', 'score'}.
+    """
+    def classificar(textos: List[str]) -> List[dict]:
+        return models.obter("sentimento")(textos, batch_size=len(textos))
 
+    return MicroBatcher(classificar, max_lote=max_lote, max_espera_ms=max_espera_ms, nome="lotes-sentimento")
 
-# Configurações da API OpenAI
-openai_key = env.str("OPENAI_API_KEY", default=None)
-organization_id = env.str("OPENAI_ORG_ID", default=None)
 
-# Verifica se as credenciais da API OpenAI estão definidas
-if not openai_key:
-    raise EnvironmentError("A chave da API do OpenAI não está definida. Verifique o arquivo .env")
-if not organization_id:
-    raise EnvironmentError("O ID da organização do OpenAI não está definido. Verifique o arquivo .env")
+# Fila compartilhada pelos serviços que usam o registro de modelos da aplicação
+sentiment_batcher_compartilhado = criar_sentiment_batcher(model_registry)
 
-# Inicializa o cliente OpenAI
-openai.api_key = openai_key
->>>>>>> main
+# Orientação do modo offline (GPT-4 indisponível) para cada rota de decide_route
+RESPOSTAS_LOCAIS = {
+    "advanced_financial_analysis": "Para calcular ROI e retorno, envie a planilha com custos, receita projetada e "
+                                   "investimentos: esses indicadores são calculados localmente.",
+    "financial_analysis": "Para analisar custos, despesas e lucro, envie a planilha ou o PDF com as categorias de "
+                          "custos: a análise financeira é feita localmente.",
+    "general_financial": "Posso montar a análise financeira a partir de uma planilha ou PDF com os seus custos e a "
+                         "receita projetada.",
+    "joke": "Sem o GPT-4, as piadas ficam para depois.",
+}
+RESPOSTA_LOCAL_PADRAO = "Tente novamente em alguns instantes ou envie um arquivo para análise local."
 
-# Definir pipeline local de fallback (Roberta para análise de sentimentos)
-classifier = pipeline("sentiment-analysis", model="roberta-base")
 
 class TextProcessingService:
     """
@@ -44,83 +42,106 @@ class TextProcessingService:
     e usar análise local como fallback em caso de falha.
     """
 
-<<<<<<< HEAD
-    def __init__(self, gpt_service: GPTService):
-        self.gpt_service = gpt_service  # Sempre utilizará o serviço GPT-4
-=======
-    def __init__(self):
+    def __init__(self, gpt_service: Optional[GPTService] = None, cliente: Optional[OpenAIClientPool] = None,
+                 limiar_confianca: float = 0.6, models: Optional[ModelRegistry] = None,
+                 sentiment_batcher: Optional[MicroBatcher] = None):
+        self.gpt_service = gpt_service
+        # spaCy e o pipeline de sentimentos do fallback local são carregados só no primeiro uso
+        self.models = models or model_registry
+        # Pedidos de sentimento são agrupados em lotes antes de chegar ao modelo
+        if sentiment_batcher is None:
+            sentiment_batcher = sentiment_batcher_compartilhado if models is None else criar_sentiment_batcher(self.models)
+        self.sentiment_batcher = sentiment_batcher
+        self.cliente = cliente  # Cliente OpenAI assíncrono; padrão: o cliente compartilhado da aplicação
         # Palavras-chave financeiras ampliadas
         self.financial_keywords = [
             "finança", "investimento", "dinheiro", "ações", "economia", "receita",
             "lucro", "imposto", "taxa", "ROI", "juros", "rentabilidade", "poupança",
-            "despesa", "dividendos", "cash flow", "custo", "orçamento", "análise"
+            "despesa", "dividendos", "cash flow", "custo", "orçamento", "análise", "retorno"
         ]
         self.joke_keywords = ["piada", "engraçado", "brincadeira"]
->>>>>>> main
+        # Termos que escolhem a rota financeira específica em decide_route
+        self.advanced_keywords = ["ROI", "retorno"]
+        self.analysis_keywords = ["despesa", "orçamento", "lucro", "custo"]
+
+        # Vocabulários compilados uma vez (sem diferenciar acentos nem maiúsculas)
+        self.keyword_matcher = KeywordMatcher({"financeiro": self.financial_keywords, "piada": self.joke_keywords})
+        self.route_matcher = KeywordMatcher({
+            "advanced_financial_analysis": self.advanced_keywords,
+            "financial_analysis": self.analysis_keywords,
+        })
+        self.sentiment_matcher = KeywordMatcher({"POSITIVE": ["positivo"], "NEGATIVE": ["negativo"]},
+                                                palavras_inteiras=False)
+
+        # Decide a rota localmente e só consulta o GPT-4 quando a confiança é baixa
+        self.router = LocalRouter(self.keyword_matcher, limiar_confianca)
 
     def clean_text(self, text: str) -> str:
         """
-        Limpa o texto removendo caracteres especiais e números.
+        Limpa o texto removendo caracteres especiais e números (letras acentuadas são mantidas).
         """
-<<<<<<< HEAD
-        import re
-        return re.sub(r"[^a-zA-Z\s]", "", text).strip().lower()
+        text = re.sub(r"[^\w\s]|[\d_]", "", text)
+        return text.strip().lower()
 
     def analyze_text(self, text: str) -> Dict[str, Union[str, list]]:
         """
-        Fallback: Analisa o texto localmente usando spaCy e transformers.
+        Analisa o texto usando GPT-4 pelo cliente OpenAI compartilhado.
+        Em caso de falha, usa a análise local (spaCy e transformers).
         """
         try:
-            logging.info(f"Analisando texto localmente: {text}")
-            doc = nlp(text)
-            sentiment = classifier(text)
+            cliente = self.cliente or obter_cliente_compartilhado()
+            analysis_text = cliente.completar_chat_sync(text, modelo="gpt-4", max_tokens=500, temperatura=0.7)
 
-            keywords = [token.text for token in doc]
-            entities = [(ent.text, ent.label_) for ent in doc.ents]
+            keywords = self.extract_keywords(analysis_text)
+            sentiment = self.extract_sentiment(analysis_text)
 
-=======
-        text = re.sub(r"[^a-zA-Z\s]", "", text)
-        return text.strip().lower()
+            logging.info("Análise feita com GPT-4.")
+            return {
+                "keywords": keywords,
+                "sentiment": sentiment,
+                "entities": []  # Placeholder, sem uso de entidades
+            }
+
+        except Exception as e:
+            logging.error(f"Erro na API do OpenAI. Usando análise local. Erro: {str(e)}")
+            return self.analyze_text_locally(text)
 
-    def analyze_text(self, text: str) -> dict:
+    def analyze_text_locally(self, text: str) -> Dict[str, Union[str, list]]:
         """
-        Analisa o texto usando GPT-4 via OpenAI API. Em caso de falha, retorna uma análise neutra.
+        Fallback: Analisa o texto localmente usando spaCy e transformers.
         """
         try:
-            # Usando a API GPT-4 para análise de texto
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": text}],
-                max_tokens=500,
-                temperature=0.7
-            )
-            analysis_text = response.choices[0].message['content'].strip()
+            logging.info(f"Analisando texto localmente: {text}")
+            doc = self.models.obter("spacy")(text)
+            sentiment = self.sentiment_batcher.submeter(text).result()
 
-            keywords = self.extract_keywords(analysis_text)
-            sentiment = self.extract_sentiment(analysis_text)
+            keywords = [token.text for token in doc]
+            entities = [(ent.text, ent.label_) for ent in doc.ents]
 
-            logging.info("Análise feita com GPT-4.")
->>>>>>> main
             return {
                 "keywords": keywords,
-                "sentiment": sentiment,
-                "entities": []  # Placeholder, sem uso de entidades
+                "sentiment": sentiment["label"] if sentiment else "NEUTRAL",
+                "entities": entities
             }
 
         except Exception as e:
-<<<<<<< HEAD
             logging.error(f"Erro ao analisar texto localmente: {str(e)}")
             return {"keywords": ["generico"], "sentiment": "NEUTRAL", "entities": []}
 
-    def process_text(self, input_data: str) -> str:
-=======
-            logging.error(f"Erro na API do OpenAI. Retornando análise neutra. Erro: {str(e)}")
-            # Fallback simples: retorna resultado neutro
-            return {
-                "keywords": ["generico"],
-                "sentiment": "NEUTRAL",
-                "entities": []
-            }
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Classifica o sentimento de vários textos (ex.: prompts armazenados) pela mesma fila
+        em micro-lotes do fallback local. Textos cujo lote falhar ficam como None (e não
+        como um rótulo inventado), para que quem persiste os resultados possa ignorá-los.
+        """
+        sentiments = []
+        for futuro in self.sentiment_batcher.submeter_varios(texts):
+            try:
+                sentiments.append(futuro.result()["label"])
+            except Exception as e:
+                logging.error(f"Erro ao classificar sentimento em lote: {str(e)}")
+                sentiments.append(None)
+        return sentiments
 
     def extract_keywords(self, analysis_text: str) -> list:
         """
@@ -136,52 +157,78 @@ class TextProcessingService:
         """
         Extrai a classificação de sentimento da resposta gerada pelo GPT-4.
         """
-        if "positivo" in analysis_text.lower():
+        sentiments = self.sentiment_matcher.rotulos(analysis_text)
+        if "POSITIVE" in sentiments:
             return "POSITIVE"
-        elif "negativo" in analysis_text.lower():
+        elif "NEGATIVE" in sentiments:
             return "NEGATIVE"
         else:
             return "NEUTRAL"
 
-    def process_data_from_file(self, data: dict) -> dict:
->>>>>>> main
+    def process_text(self, input_data: str) -> str:
         """
         Processa o texto fornecido e sempre tenta enviar primeiro para o GPT-4.
         Se falhar, faz o fallback para análise local.
         """
         cleaned_text = self.clean_text(input_data)
 
-<<<<<<< HEAD
         # Primeiro, tenta usar o GPT-4
-        try:
-            logging.info("Enviando prompt para GPT-4")
-            return self.gpt_service.enviar_prompt(cleaned_text)  # Sempre usar GPT-4
-        except Exception as e:
-            logging.error(f"Erro ao usar GPT-4: {str(e)}")
-            logging.info("Usando fallback local")
+        if self.gpt_service is not None:
+            try:
+                logging.info("Enviando prompt para GPT-4")
+                return self.gpt_service.enviar_prompt(cleaned_text)
+            except Exception as e:
+                logging.error(f"Erro ao usar GPT-4: {str(e)}")
+                logging.info("Usando fallback local")
 
         # Fallback: Análise local se o GPT falhar
-        analysis = self.analyze_text(cleaned_text)
+        analysis = self.analyze_text_locally(cleaned_text)
         return f"Fallback: {analysis['keywords']}"  # Simples fallback para análise de keywords
-=======
+
+    def gerar_resposta_local(self, text: str) -> str:
+        """
+        Resposta offline, usada quando o GPT-4 falha ou o disjuntor está aberto: classifica o
+        texto só com o `LocalRouter` e orienta o usuário conforme a rota decidida.
+        """
+        analysis = self.router.classificar(text)["analise"]
+        route = self.decide_route(analysis)
+        resposta = f"O GPT-4 está indisponível no momento. {RESPOSTAS_LOCAIS.get(route, RESPOSTA_LOCAL_PADRAO)}"
+        keywords = list(dict.fromkeys(analysis["keywords"]))
+        if keywords:
+            resposta += f" (Palavras-chave identificadas: {', '.join(keywords)}.)"
+        return resposta
+
+    def process_data_from_file(self, data: dict) -> dict:
+        """
+        Monta a análise a partir dos dados extraídos de um arquivo (categorias de custos viram palavras-chave).
+        """
+        keywords = list(data.get("categorias_custos", {}).keys())
+        return {
+            "keywords": keywords,
+            "sentiment": "NEUTRAL",
+            "entities": []
+        }
+
     def decide_route(self, analysis: dict) -> str:
         """
         Decide a rota com base na análise do texto ou dados.
         Aqui também é onde identificamos qual serviço financeiro usar, dependendo do conteúdo.
         """
         keywords = analysis.get("keywords", [])
+        categories = {self.keyword_matcher.rotulo(keyword) for keyword in keywords}
 
         # Verifica se é um tópico financeiro
-        if any(keyword in self.financial_keywords for keyword in keywords):
-            if "ROI" in keywords or "retorno" in keywords:
+        if "financeiro" in categories:
+            routes = {self.route_matcher.rotulo(keyword) for keyword in keywords}
+            if "advanced_financial_analysis" in routes:
                 return "advanced_financial_analysis"
-            elif any(term in ["despesa", "orçamento", "lucro", "custo"] for term in keywords):
+            elif "financial_analysis" in routes:
                 return "financial_analysis"
             else:
                 return "general_financial"
 
         # Verifica se é um tópico de piada
-        elif any(keyword in self.joke_keywords for keyword in keywords):
+        elif "piada" in categories:
             return "joke"
 
         elif "generico" in keywords:
@@ -190,17 +237,44 @@ class TextProcessingService:
         else:
             return "general"
 
+    def classify_batch(self, texts: List[str]) -> List[str]:
+        """
+        Decide a rota de vários textos só com o classificador local (sem GPT-4),
+        por exemplo para reclassificar mensagens armazenadas.
+        """
+        return [self.decide_route(decisao["analise"]) for decisao in self.router.classificar_lote(texts)]
+
     def route_and_process(self, input_data: dict) -> str:
         """
         Processa tanto textos fornecidos diretamente pelo input do usuário quanto dados extraídos de arquivos.
         """
+        return self.route_and_process_detailed(input_data)["route"]
+
+    def route_and_process_detailed(self, input_data: dict) -> dict:
+        """
+        Como `route_and_process`, mas informa também o caminho usado ('local', 'gpt' ou
+        'arquivo') e a confiança do classificador local.
+
+        Textos são classificados primeiro pelo `LocalRouter`; o GPT-4 só é consultado
+        quando a confiança fica abaixo do limiar. No caminho local o sentimento fica
+        "NEUTRAL": a rota não depende dele, e classificá-lo exigiria carregar o modelo
+        de sentimentos (use `analyze_text_locally` quando ele for necessário).
+        """
         if isinstance(input_data, str):
-            cleaned_text = self.clean_text(input_data)
-            analysis = self.analyze_text(cleaned_text)
+            decisao = self.router.classificar(input_data)
+            if decisao["local"]:
+                path = "local"
+                analysis = decisao["analise"]  # sentiment: "NEUTRAL" (não classificado)
+            else:
+                path = "gpt"
+                analysis = self.analyze_text(self.clean_text(input_data))
+            self.router.registrar_caminho(path)
+            confidence = decisao["confianca"]
         else:
+            path = "arquivo"
             analysis = self.process_data_from_file(input_data)
+            confidence = 1.0
 
         route = self.decide_route(analysis)
-        logging.info(f"Rota decidida: {route}")
-        return route
->>>>>>> main
+        logging.info(f"Rota decidida: {route} (caminho: {path}, confiança: {confidence:.2f})")
+        return {"route": route, "path": path, "confidence": confidence, "analysis": analysis}
@@ -1,4 +1,5 @@
 from typing import List, Dict
+from app_balance.services.analysis_results import RelatorioTeorico
 
 
 class TheoreticalFinancialAnalysisService:
@@ -62,8 +63,17 @@ class TheoreticalFinancialAnalysisService:
         Returns:
             str: Relatório teórico detalhado.
         """
-        report = "📚 **Relatório Teórico Financeiro**\n\n"
-        for conceito in conceitos_solicitados:
-            explicacao = self.explain_financial_concept(conceito)
-            report += f"**{conceito}**:\n{explicacao}\n\n"
-        return report
+        return self.build_theoretical_report(conceitos_solicitados).para_markdown()
+
+    def build_theoretical_report(self, conceitos_solicitados: List[str]) -> RelatorioTeorico:
+        """
+        Reúne as explicações dos conceitos solicitados num RelatorioTeorico, que monta o texto só quando pedido.
+
+        Args:
+            conceitos_solicitados (List[str]): Lista de conceitos financeiros que o usuário deseja aprender.
+
+        Returns:
+            RelatorioTeorico: Conceitos e explicações, na ordem solicitada.
+        """
+        return RelatorioTeorico(tuple((conceito, self.explain_financial_concept(conceito))
+                                      for conceito in conceitos_solicitados))
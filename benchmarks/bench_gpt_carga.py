@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Teste de carga do GPTService contra o servidor simulado da OpenAI, sem rede nem custo.
+
+Uso:
+    python benchmarks/bench_gpt_carga.py --prompts 200 --concorrencia 16 --latencia lognormal:0.4:0.2
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_balance.services.gpt_service import GPTService
+from tests.mock_openai_server import LatencyDistribution, MockOpenAIConfig, MockOpenAIServer
+from app_balance.services.openai_client import OpenAIClientPool
+
+
+def percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir_lote(service: GPTService, prompts):
+    inicio = time.perf_counter()
+    respostas = service.enviar_prompts(prompts, usar_cache=False)
+    return time.perf_counter() - inicio, respostas
+
+
+def medir_streaming(service: GPTService, prompts):
+    primeiros, totais = [], []
+    for prompt in prompts:
+        inicio = time.perf_counter()
+        for i, _ in enumerate(service.transmitir_prompt(prompt, usar_cache=False)):
+            if i == 0:
+                primeiros.append(time.perf_counter() - inicio)
+        totais.append(time.perf_counter() - inicio)
+    return primeiros, totais
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--prompts', type=int, default=200)
+    parser.add_argument('--streams', type=int, default=20)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--latencia', default='lognormal:0.4:0.2')
+    parser.add_argument('--latencia-token', default='fixa:0.02')
+    parser.add_argument('--taxa-erro', type=float, default=0.0)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockOpenAIConfig(
+        latencia=LatencyDistribution.de_texto(args.latencia),
+        latencia_token=LatencyDistribution.de_texto(args.latencia_token),
+        taxa_erro=args.taxa_erro,
+        status_erro=[429, 500, 503],
+        resposta=" ".join(f"token{i}" for i in range(50)),
+        semente=args.semente,
+    )
+    with MockOpenAIServer(config) as servidor:
+        cliente = OpenAIClientPool(api_key="mock", base_url=servidor.base_url, max_concorrencia=args.concorrencia,
+                                   max_conexoes=args.concorrencia)
+        service = GPTService(api_key="mock", cliente=cliente)
+        try:
+            prompts = [f"Pergunta {i}: qual o lucro do mês?" for i in range(args.prompts)]
+            tempo_lote, respostas = medir_lote(service, prompts)
+            falhas = sum(resposta == service.mensagem_erro for resposta in respostas)
+            primeiros, totais = medir_streaming(service, prompts[:args.streams])
+            estatisticas = service.estatisticas()['cliente']
+        finally:
+            cliente.fechar()
+
+    print(f"Servidor simulado: latência {args.latencia}, entre tokens {args.latencia_token}, erros {args.taxa_erro:.0%}")
+    print(f"Lote: {args.prompts} prompts em {tempo_lote:.2f} s ({args.prompts / tempo_lote:.1f} req/s, "
+          f"concorrência {args.concorrencia}, {falhas} falhas)")
+    print(f"Streaming: primeiro token p50 {statistics.median(primeiros) * 1000:.0f} ms, "
+          f"p95 {percentil(primeiros, 95) * 1000:.0f} ms; resposta completa p50 {statistics.median(totais) * 1000:.0f} ms")
+    print(f"Retentativas: {estatisticas['retentativas']}, disjuntor: {estatisticas['disjuntor']['estado']}")
+    print(f"Servidor: {servidor.estatisticas()}")
+
+
+if __name__ == '__main__':
+    main()
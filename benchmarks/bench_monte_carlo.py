@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da análise de sensibilidade por Monte Carlo em um e em vários processos.
+
+Uso:
+    python benchmarks/bench_monte_carlo.py --simulacoes 1000000 --processos 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_balance.services.monte_carlo import simular_monte_carlo
+
+CATEGORIAS = {'fixos': 10000, 'pessoal': 8000, 'TI': 7000}
+
+
+def medir(processos: int, simulacoes: int, repeticoes: int) -> float:
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        simular_monte_carlo(37500, 25000, CATEGORIAS, simulacoes=simulacoes, semente=1, processos=processos)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--simulacoes', type=int, default=1_000_000)
+    parser.add_argument('--processos', type=int, default=os.cpu_count())
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    tempo_um = medir(1, args.simulacoes, args.repeticoes)
+    tempo_varios = medir(args.processos, args.simulacoes, args.repeticoes)
+
+    print(f"Sorteios: {args.simulacoes:,}")
+    print(f"1 processo:   {tempo_um:.2f} s ({args.simulacoes / tempo_um:,.0f} sorteios/s)")
+    print(f"{args.processos} processos: {tempo_varios:.2f} s ({args.simulacoes / tempo_varios:,.0f} sorteios/s)")
+
+
+if __name__ == '__main__':
+    main()
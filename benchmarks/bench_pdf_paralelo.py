@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da extração de um PDF grande em um processo versus dividido por páginas.
+
+Uso:
+    python benchmarks/bench_pdf_paralelo.py --paginas 1000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_balance.processamento.file_processing_service import FileProcessingService
+
+
+def gerar_pdf_sintetico(paginas: int, linhas_por_pagina: int = 45) -> bytes:
+    """Gera um PDF com `paginas` páginas de texto (fonte Helvetica), sem dependências externas."""
+    objetos = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    paginas_ids = []
+    for pagina in range(1, paginas + 1):
+        linhas = "".join(
+            f"(Pagina {pagina} linha {linha}: receita {pagina * linha} custos {pagina + linha} lucro estimado) '"
+            for linha in range(1, linhas_por_pagina + 1)
+        )
+        conteudo = f"BT /F1 9 Tf 12 TL 36 810 Td {linhas} ET".encode('latin-1')
+        objetos.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(conteudo), conteudo))
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objetos)
+        )
+        paginas_ids.append(len(objetos))
+    kids = " ".join(f"{pagina_id} 0 R" for pagina_id in paginas_ids)
+    objetos[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(paginas_ids)} >>".encode('latin-1')
+
+    saida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for numero, corpo in enumerate(objetos, start=1):
+        offsets.append(len(saida))
+        saida += b"%d 0 obj\n%s\nendobj\n" % (numero, corpo)
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    saida += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(saida)
+
+
+def medir(funcao, repeticoes: int):
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paginas', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    pdf = gerar_pdf_sintetico(args.paginas)
+    service = FileProcessingService(max_workers_pdf=args.workers)
+
+    tempo_serial, texto_serial = medir(lambda: service.processar_arquivo_pdf(pdf, paralelo=False), args.repeticoes)
+    tempo_paralelo, texto_paralelo = medir(lambda: service.processar_arquivo_pdf(pdf, paralelo=True), args.repeticoes)
+
+    if texto_serial != texto_paralelo:
+        raise SystemExit("Textos divergentes entre a extração serial e a paralela.")
+
+    print(f"PDF sintético: {args.paginas} páginas, {len(pdf) / 1024:.0f} KiB, {args.workers} processos")
+    print(f"Serial:   {tempo_serial:.2f} s")
+    print(f"Paralelo: {tempo_paralelo:.2f} s")
+    print(f"Speedup:  {tempo_serial / tempo_paralelo:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
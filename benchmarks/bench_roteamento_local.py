@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da classificação local de mensagens em lote (KeywordMatcher + LocalRouter).
+
+Uso:
+    python benchmarks/bench_roteamento_local.py --mensagens 6000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_balance.services.text_processing import TextProcessingService
+
+MENSAGENS = ["Qual o orçamento do mês e o ROI?", "Conte uma piada", "Como está o tempo?"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mensagens', type=int, default=6000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    router = TextProcessingService().router
+    mensagens = (MENSAGENS * (args.mensagens // len(MENSAGENS) + 1))[:args.mensagens]
+
+    melhor = float('inf')
+    for _ in range(args.repeticoes):
+        inicio = time.perf_counter()
+        router.classificar_lote(mensagens)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    print(f"Mensagens: {len(mensagens)}")
+    print(f"Tempo:     {melhor:.3f} s")
+    print(f"Vazão:     {len(mensagens) / melhor:,.0f} mensagens/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Latência, memória e paridade dos backends do pipeline de sentimentos (pytorch, int8, onnx, onnx-int8).
+
+Cada backend roda num processo separado, para que a memória residente medida seja só a dele.
+O backend pytorch é a referência da paridade.
+
+Uso:
+    python benchmarks/bench_sentimento_backends.py --backends pytorch int8 onnx onnx-int8 --repeticoes 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_balance.services.model_registry import memoria_residente
+from app_balance.services.sentiment_backends import BACKENDS, TEXTOS_PARIDADE, carregar_sentimento, comparar_previsoes
+
+
+def medir_backend(backend: str, repeticoes: int, tamanho_lote: int) -> dict:
+    memoria_inicial = memoria_residente()
+    inicio = time.perf_counter()
+    classificador = carregar_sentimento(backend)
+    tempo_carga = time.perf_counter() - inicio
+    memoria_carregado = memoria_residente()
+
+    classificador(TEXTOS_PARIDADE[0])  # aquecimento
+    latencias = []
+    for i in range(repeticoes):
+        texto = TEXTOS_PARIDADE[i % len(TEXTOS_PARIDADE)]
+        inicio = time.perf_counter()
+        classificador(texto)
+        latencias.append(time.perf_counter() - inicio)
+
+    lote = [TEXTOS_PARIDADE[i % len(TEXTOS_PARIDADE)] for i in range(tamanho_lote)]
+    inicio = time.perf_counter()
+    classificador(lote, batch_size=tamanho_lote)
+    tempo_lote = time.perf_counter() - inicio
+
+    return {
+        'backend': backend,
+        'tempo_carga': tempo_carga,
+        'memoria_modelo': memoria_carregado - memoria_inicial if memoria_inicial and memoria_carregado else None,
+        'memoria_pico': memoria_residente(),
+        'latencia_p50': statistics.median(latencias),
+        'latencia_max': max(latencias),
+        'textos_por_segundo_lote': tamanho_lote / tempo_lote,
+        'previsoes': classificador(TEXTOS_PARIDADE, batch_size=len(TEXTOS_PARIDADE)),
+    }
+
+
+def rodar_em_processo(backend: str, repeticoes: int, tamanho_lote: int) -> dict:
+    saida = subprocess.run(
+        [sys.executable, __file__, '--filho', backend, '--repeticoes', str(repeticoes), '--lote', str(tamanho_lote)],
+        capture_output=True, text=True,
+    )
+    if saida.returncode != 0:
+        return {'backend': backend, 'erro': saida.stderr.strip().splitlines()[-1] if saida.stderr else 'falhou'}
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def mb(valor) -> str:
+    return f"{valor / 2 ** 20:.0f} MB" if valor is not None else "n/d"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--lote', type=int, default=32)
+    parser.add_argument('--filho', choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        print(json.dumps(medir_backend(args.filho, args.repeticoes, args.lote)))
+        return
+
+    backends = ['pytorch'] + [backend for backend in args.backends if backend != 'pytorch']
+    resultados = [rodar_em_processo(backend, args.repeticoes, args.lote) for backend in backends]
+    referencia = resultados[0].get('previsoes')
+
+    for resultado in resultados:
+        if 'erro' in resultado:
+            print(f"{resultado['backend']:>10}: erro - {resultado['erro']}")
+            continue
+        linha = (f"{resultado['backend']:>10}: carga {resultado['tempo_carga']:.1f} s, modelo {mb(resultado['memoria_modelo'])}, "
+                 f"RSS {mb(resultado['memoria_pico'])}, latência p50 {resultado['latencia_p50'] * 1000:.1f} ms "
+                 f"(máx {resultado['latencia_max'] * 1000:.1f} ms), lote {resultado['textos_por_segundo_lote']:.1f} textos/s")
+        if referencia is not None and resultado['backend'] != 'pytorch':
+            paridade = comparar_previsoes(referencia, resultado['previsoes'])
+            linha += (f", paridade {paridade['concordancia']:.0%} (Δscore máx {paridade['diferenca_max_score']:.3f}, "
+                      f"{'ok' if paridade['aprovado'] else 'REPROVADO'})")
+        print(linha)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,21 @@
-import sys
-<<<<<<< HEAD
-from PyQt5.QtWidgets import QApplication
-=======
 import os
-from dearpygui.dearpygui import *  # Importando a nova API do Dear PyGui
->>>>>>> main
+import sys
+
+# Os módulos de processamento e usuários importam `processamento.models` a partir de app_balance/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_balance"))
+
+from PyQt5.QtWidgets import QApplication  # Diálogos de login e criação de usuário
+from dearpygui.dearpygui import start_dearpygui  # Janela principal
 from app_balance.gui_app import MainWindow
 from app_balance.users.user_creation_dialog import UserCreationDialog
 from app_balance.users.login_dialog import LoginDialog
-from app_balance.processamento.models import criar_tabelas
+from processamento.models import criar_tabelas
 from app_balance.users.user_preferences_service import UserPreferencesService
-from services.persistencia import DataPersistenceService
-from services.gpt_service import GPTService
+from app_balance.services.persistencia import DataPersistenceService
+from app_balance.services.gpt_service import GPTService
+from app_balance.services.response_cache import obter_cache_compartilhado
 from app_balance.services.catelina_lacet import CatelinaLacetGPT
 from app_balance.services.text_processing import TextProcessingService
-import sqlite3
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -31,53 +32,43 @@ def verificar_tabelas():
 def main():
     verificar_tabelas()  # Verifica e garante que as tabelas estejam criadas antes de iniciar o app
 
-<<<<<<< HEAD
+    # Os diálogos de login e criação de usuário são PyQt; a janela principal é Dear PyGui
     app = QApplication(sys.argv)
 
     # Inicializa o serviço de preferências do usuário
     user_service = UserPreferencesService(session)
 
-    while True:
+    usuario = None
+    while usuario is None:
         # Exibe a tela de login primeiro
         login_dialog = LoginDialog(user_service)
         if login_dialog.exec_():  # Se o login for bem-sucedido
-            if usuario := user_service.carregar_usuario_existente(
-                login_dialog.name_input.text()
-            ):
-                # Inicializa o serviço GPT
-                gpt_service = GPTService(api_key="SUA_OPENAI_API_KEY")
+            usuario = user_service.carregar_usuario_existente(login_dialog.name_input.text())
+        else:
+            # Se o login não for bem-sucedido ou o usuário clicar em criar conta
+            user_dialog = UserCreationDialog(user_service)
+            if not user_dialog.exec_():  # Criação cancelada: encerra o app
+                return
+            # Usuário criado com sucesso: retorna à tela de login
+    app.quit()
 
-                # Inicializa o Catelina Lacet
-                catelina_lacet = CatelinaLacetGPT()
+    # Inicializa o TextProcessingService, que também dá a resposta local quando o GPT-4 não responde
+    text_processor = TextProcessingService()
 
-                # Inicializa o TextProcessingService com o GPTService
-                text_processor = TextProcessingService(gpt_service=gpt_service)
+    # Inicializa o serviço GPT (cliente OpenAI e cache de respostas compartilhados pela aplicação)
+    gpt_service = GPTService(cache=obter_cache_compartilhado(), fallback_local=text_processor.gerar_resposta_local)
+    text_processor.gpt_service = gpt_service
 
-                # Inicializa o serviço de persistência de dados
-                data_service = DataPersistenceService(session, usuario)
+    # Inicializa o Catelina Lacet
+    catelina_lacet = CatelinaLacetGPT()
 
-                # Inicializa a tela principal com o usuário autenticado e os serviços
-                window = MainWindow(usuario, data_service, session, text_processor, catelina_lacet)  # Passando o TextProcessingService e Catelina
-                window.show()
-                sys.exit(app.exec_())
-        else:
-            # Se o login não for bem-sucedido ou o usuário clicar em criar conta
-            user_dialog = UserCreationDialog(user_service)
-            if user_dialog.exec_():  # Se o usuário for criado com sucesso
-                continue  # Retorna à tela de login
-=======
-    # Inicializa o serviço de usuário
-    user_service = UserPreferencesService()
+    # Inicializa o serviço de persistência de dados
+    data_service = DataPersistenceService(session, usuario)
 
-    # Exibe a tela de criação de usuário
-    user_dialog = UserCreationDialog(user_service)
-    if user_dialog.exec_():  # Se o usuário for criado com sucesso
-        usuario = user_service.carregar_usuario_existente(user_dialog.name_input.text())
-        if usuario:
-            # Inicializa a tela principal com o usuário
-            window = MainWindow(usuario)
-            start_dearpygui(primary_window="Catelina Lacet - Bem-vindo!")  # Inicializa Dear PyGui
->>>>>>> main
+    # Inicializa a tela principal com o usuário autenticado e os serviços
+    window = MainWindow(usuario, data_service=data_service, gpt_service=gpt_service, text_processor=text_processor,
+                        catelina_lacet=catelina_lacet, session=session)
+    start_dearpygui(primary_window=window.titulo)  # Inicializa Dear PyGui
 
 if __name__ == "__main__":
     main()
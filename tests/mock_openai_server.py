@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""Servidor local compatível com a API da OpenAI, para testes de carga e latência sem custo.
+
+Atende `POST /v1/chat/completions` e `POST /v1/completions`, com e sem `stream`, e
+`GET /stats` com os contadores. A latência até a resposta (ou até o primeiro token) e
+entre tokens segue distribuições configuráveis; uma fração das requisições pode falhar
+com status HTTP escolhidos. As respostas são fixas ou ecoam o prompt.
+
+Uso:
+    python -m tests.mock_openai_server --porta 8089 --latencia lognormal:0.4:0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=mock python main_app.py
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+DISTRIBUICOES = ("fixa", "uniforme", "normal", "lognormal", "exponencial")
+
+
+class LatencyDistribution:
+    """
+    Distribuição de latências em segundos, descrita pela média e pelo desvio padrão.
+
+    'fixa' sempre devolve a média; 'uniforme' sorteia em média ± desvio; 'normal' e
+    'lognormal' usam média e desvio da própria latência; 'exponencial' usa só a média.
+    Valores negativos viram zero.
+    """
+
+    def __init__(self, tipo: str = "fixa", media: float = 0.0, desvio: float = 0.0):
+        if tipo not in DISTRIBUICOES:
+            raise ValueError(f"Distribuição desconhecida: {tipo}. Use uma de {', '.join(DISTRIBUICOES)}.")
+        self.tipo = tipo
+        self.media = media
+        self.desvio = desvio
+
+    @classmethod
+    def de_texto(cls, texto: str) -> "LatencyDistribution":
+        """Lê 'tipo:media:desvio' (ex.: 'lognormal:0.4:0.2'); um número sozinho é latência fixa."""
+        partes = texto.split(":")
+        if len(partes) == 1:
+            return cls("fixa", float(partes[0]))
+        return cls(partes[0], *(float(valor) for valor in partes[1:]))
+
+    def amostrar(self, rng: random.Random) -> float:
+        if self.media <= 0:
+            return 0.0
+        if self.tipo == "fixa":
+            valor = self.media
+        elif self.tipo == "uniforme":
+            valor = rng.uniform(self.media - self.desvio, self.media + self.desvio)
+        elif self.tipo == "normal":
+            valor = rng.gauss(self.media, self.desvio)
+        elif self.tipo == "lognormal":
+            sigma2 = math.log(1 + (self.desvio / self.media) ** 2)
+            valor = rng.lognormvariate(math.log(self.media) - sigma2 / 2, math.sqrt(sigma2))
+        else:
+            valor = rng.expovariate(1 / self.media)
+        return max(0.0, valor)
+
+
+class MockOpenAIConfig:
+    """
+    Comportamento do servidor simulado.
+
+    Args:
+        latencia (LatencyDistribution): Tempo até a resposta completa ou até o primeiro token.
+        latencia_token (LatencyDistribution): Intervalo entre tokens no streaming.
+        taxa_erro (float): Fração das requisições que falha (0 a 1).
+        status_erro (list): Status HTTP sorteados para as falhas.
+        resposta (str, opcional): Resposta fixa. None ecoa o prompt.
+        semente (int, opcional): Semente do sorteio, para execuções reproduzíveis.
+    """
+
+    def __init__(self, latencia: Optional[LatencyDistribution] = None,
+                 latencia_token: Optional[LatencyDistribution] = None, taxa_erro: float = 0.0,
+                 status_erro: Sequence[int] = (500,), resposta: Optional[str] = None,
+                 semente: Optional[int] = None):
+        self.latencia = latencia or LatencyDistribution()
+        self.latencia_token = latencia_token or LatencyDistribution()
+        self.taxa_erro = taxa_erro
+        self.status_erro = list(status_erro)
+        self.resposta = resposta
+        self.semente = semente
+
+
+class MockOpenAIServer:
+    """
+    Servidor HTTP em uma thread própria que imita a API da OpenAI.
+
+    Pode ser usado como gerenciador de contexto; `base_url` é o valor a passar para
+    `OpenAIClientPool(base_url=...)` ou para a variável OPENAI_BASE_URL.
+    """
+
+    def __init__(self, config: Optional[MockOpenAIConfig] = None, host: str = "127.0.0.1", porta: int = 0):
+        self.config = config or MockOpenAIConfig()
+        self._rng = random.Random(self.config.semente)
+        self._lock = threading.Lock()
+        self._contadores = {'requisicoes': 0, 'streams': 0, 'erros': 0, 'tokens': 0}
+        self._httpd = ThreadingHTTPServer((host, porta), _criar_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, porta = self._httpd.server_address[:2]
+        return f"http://{host}:{porta}/v1"
+
+    def serve_forever(self) -> None:
+        """Atende requisições na thread atual até `parar` ser chamado de outra thread."""
+        self._httpd.serve_forever()
+
+    def close(self) -> None:
+        """Libera o socket do servidor."""
+        self._httpd.server_close()
+
+    def iniciar(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._httpd.shutdown()
+        self.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.parar()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._contadores)
+
+    def _sortear(self, distribuicao: LatencyDistribution) -> float:
+        with self._lock:
+            return distribuicao.amostrar(self._rng)
+
+    def _sortear_erro(self) -> Optional[int]:
+        with self._lock:
+            if self.config.taxa_erro and self._rng.random() < self.config.taxa_erro:
+                return self._rng.choice(self.config.status_erro)
+        return None
+
+    def _contar(self, **incrementos: int) -> None:
+        with self._lock:
+            for contador, valor in incrementos.items():
+                self._contadores[contador] += valor
+
+    def _gerar_texto(self, prompt: str, max_tokens: Optional[int]) -> List[str]:
+        """Retorna a resposta em 'tokens' (palavras com o espaço anterior)."""
+        texto = self.config.resposta if self.config.resposta is not None else f"Eco: {prompt}"
+        palavras = texto.split()
+        if max_tokens:
+            palavras = palavras[:max_tokens]
+        return [palavra if i == 0 else f" {palavra}" for i, palavra in enumerate(palavras)]
+
+
+def _criar_handler(servidor: MockOpenAIServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, formato, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") in ("/stats", "/v1/stats"):
+                self._enviar_json(200, servidor.estatisticas())
+            else:
+                self._enviar_json(404, _corpo_erro("Rota não encontrada.", "invalid_request_error"))
+
+        def do_POST(self):
+            rota = self.path.rstrip("/")
+            if rota.startswith("/v1"):
+                rota = rota[3:]
+            if rota not in ("/chat/completions", "/completions"):
+                self._enviar_json(404, _corpo_erro("Rota não encontrada.", "invalid_request_error"))
+                return
+
+            tamanho = int(self.headers.get("Content-Length", 0))
+            try:
+                pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+            except ValueError:
+                self._enviar_json(400, _corpo_erro("JSON inválido.", "invalid_request_error"))
+                return
+
+            chat = rota == "/chat/completions"
+            stream = bool(pedido.get("stream"))
+            servidor._contar(requisicoes=1, streams=int(stream))
+
+            time.sleep(servidor._sortear(servidor.config.latencia))
+            status = servidor._sortear_erro()
+            if status is not None:
+                servidor._contar(erros=1)
+                tipo = "rate_limit_error" if status == 429 else "server_error"
+                self._enviar_json(status, _corpo_erro(f"Erro simulado ({status}).", tipo))
+                return
+
+            if chat:
+                mensagens = pedido.get("messages") or [{}]
+                prompt = mensagens[-1].get("content") or ""
+            else:
+                prompt = pedido.get("prompt") or ""
+                prompt = prompt if isinstance(prompt, str) else " ".join(prompt)
+            tokens = servidor._gerar_texto(prompt, pedido.get("max_tokens"))
+            servidor._contar(tokens=len(tokens))
+
+            base = {
+                "id": f"{'chatcmpl' if chat else 'cmpl'}-mock-{uuid.uuid4().hex[:12]}",
+                "created": int(time.time()),
+                "model": pedido.get("model", "gpt-4"),
+            }
+            if stream:
+                self._transmitir(base, tokens, chat)
+            else:
+                uso = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(tokens)}
+                uso["total_tokens"] = uso["prompt_tokens"] + uso["completion_tokens"]
+                self._enviar_json(200, dict(base, object="chat.completion" if chat else "text_completion",
+                                            choices=[_escolha("".join(tokens), chat, "stop")], usage=uso))
+
+        def _transmitir(self, base: Dict, tokens: List[str], chat: bool) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            objeto = "chat.completion.chunk" if chat else "text_completion"
+            eventos = []
+            if chat:
+                eventos.append({"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None})
+            try:
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(servidor._sortear(servidor.config.latencia_token))
+                    eventos.append(_escolha(token, chat, None, delta=True))
+                    self._enviar_eventos(base, objeto, eventos)
+                    eventos = []
+                self._enviar_eventos(base, objeto, eventos + [_escolha("", chat, "stop", delta=True, final=True)])
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _enviar_eventos(self, base: Dict, objeto: str, escolhas: List[Dict]) -> None:
+            for escolha in escolhas:
+                evento = dict(base, object=objeto, choices=[escolha])
+                self.wfile.write(b"data: " + json.dumps(evento, ensure_ascii=False).encode("utf-8") + b"\n\n")
+            self.wfile.flush()
+
+        def _enviar_json(self, status: int, corpo: Dict) -> None:
+            dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+    return Handler
+
+
+def _escolha(texto: str, chat: bool, fim: Optional[str], delta: bool = False, final: bool = False) -> Dict:
+    if not chat:
+        return {"index": 0, "text": texto, "logprobs": None, "finish_reason": fim}
+    if delta:
+        return {"index": 0, "delta": {} if final else {"content": texto}, "finish_reason": fim}
+    return {"index": 0, "message": {"role": "assistant", "content": texto}, "finish_reason": fim}
+
+
+def _corpo_erro(mensagem: str, tipo: str) -> Dict:
+    return {"error": {"message": mensagem, "type": tipo, "param": None, "code": None}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API da OpenAI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8089)
+    parser.add_argument("--latencia", default="0", help="Latência até a resposta: 'tipo:media:desvio' ou segundos.")
+    parser.add_argument("--latencia-token", default="0", help="Intervalo entre tokens no streaming.")
+    parser.add_argument("--taxa-erro", type=float, default=0.0)
+    parser.add_argument("--status-erro", default="500", help="Status das falhas, separados por vírgula.")
+    parser.add_argument("--resposta", default=None, help="Resposta fixa (padrão: eco do prompt).")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockOpenAIConfig(
+        latencia=LatencyDistribution.de_texto(args.latencia),
+        latencia_token=LatencyDistribution.de_texto(args.latencia_token),
+        taxa_erro=args.taxa_erro,
+        status_erro=[int(status) for status in args.status_erro.split(",")],
+        resposta=args.resposta,
+        semente=args.semente,
+    )
+    servidor = MockOpenAIServer(config, args.host, args.porta)
+    print(f"Servidor simulado em {servidor.base_url} (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from app_balance.gpt4.prompt_service import PromptService
+from app_balance.services.financial_analysis import FinancialAnalysisService
+from app_balance.services.theoretical_financial_analysis import TheoreticalFinancialAnalysisService
+
+
+class TestAnalysisResults(unittest.TestCase):
+
+    def setUp(self):
+        self.categorias = {'fixos': 10000, 'pessoal': 8000, 'TI': 7000}
+        self.analise = FinancialAnalysisService().calcular_analise(
+            {'total_custos': 25000, 'investimentos': 20000}, 37500, 160, self.categorias)
+
+    def test_valores_sem_renderizar(self):
+        """Testa que os indicadores ficam disponíveis como atributos, sem montar texto."""
+        self.assertAlmostEqual(self.analise.roi, 12500 * 0.85 / 20000 * 100)
+        self.assertAlmostEqual(self.analise.valor_hora, 25000 / 160)
+        self.assertEqual(self.analise._renderizados, {})
+        self.assertFalse(hasattr(self.analise, '__dict__'))
+        self.assertIsInstance(hash(self.analise), int)
+
+    def test_renderizacao_memoizada(self):
+        """Testa que cada formato é montado uma vez e que o markdown é o relatório de sempre."""
+        markdown = self.analise.para_markdown()
+        self.assertIs(self.analise.para_markdown(), markdown)
+        self.assertEqual(markdown, FinancialAnalysisService().gerar_analise_detalhada(
+            {'total_custos': 25000, 'investimentos': 20000}, 37500, 160, self.categorias))
+
+        dados = json.loads(self.analise.para_json())
+        self.assertAlmostEqual(dados['roi'], self.analise.roi)
+        self.assertNotIn('_renderizados', dados)
+        self.assertIn("ROI: 53.12%", self.analise.para_prompt())
+
+    def test_json_com_valores_do_pandas(self):
+        """Testa o JSON dos resultados montados a partir de um CSV com valores inteiros (numpy.int64)."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        caminho = os.path.join(diretorio, 'custos.csv')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write("Categoria,Valor\nfixos,10000\npessoal,8000\nTI,7000\n")
+        dados = PromptService().processar_arquivo(caminho, 'csv')
+
+        prompt = PromptService().montar_prompt_analise(dados, 150.0, dados['categorias_custos'], 20, 37500)
+        self.assertEqual(json.loads(prompt.para_json())['categorias_custos'],
+                         {'fixos': 10000, 'pessoal': 8000, 'TI': 7000})
+
+        analise = FinancialAnalysisService().calcular_analise(dados, 37500, 160, dados['categorias_custos'])
+        self.assertEqual(json.loads(analise.para_json())['total_custos'], 25000)
+
+    def test_relatorio_teorico_e_prompt(self):
+        """Testa os resultados do relatório teórico e do prompt de análise."""
+        teorico = TheoreticalFinancialAnalysisService()
+        relatorio = teorico.build_theoretical_report(['ROI', 'Payback'])
+        self.assertEqual(relatorio.para_markdown(), teorico.generate_theoretical_report(['ROI', 'Payback']))
+        self.assertEqual(list(json.loads(relatorio.para_json())['conceitos']), ['ROI', 'Payback'])
+
+        prompt_service = PromptService()
+        prompt = prompt_service.montar_prompt_analise({'total_custos': 25000}, 156.25, self.categorias, 20, 37500)
+        self.assertEqual(prompt.valor_hora, 156.25)
+        self.assertEqual(prompt.para_prompt(), prompt_service.gerar_prompt_analise(
+            {'total_custos': 25000}, 156.25, self.categorias, 20, 37500))
+        self.assertEqual(json.loads(prompt.para_json())['categorias_custos'], self.categorias)
+
+
+if __name__ == '__main__':
+    unittest.main()
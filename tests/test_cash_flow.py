@@ -0,0 +1,90 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from app_balance.services import cash_flow
+from app_balance.services.financial_analysis import FinancialAnalysisService
+
+
+class TestCashFlow(unittest.TestCase):
+
+    def setUp(self):
+        self.fluxos = np.array([
+            [-1000, 300, 400, 500, 200],
+            [-100, 110, 0, 0, 0],
+            [-100, 10, 10, 10, 10],
+        ], dtype=float)
+
+    def test_vpl_e_tir(self):
+        """Testa o VPL e a TIR vetorizados contra valores conhecidos."""
+        np.testing.assert_allclose(cash_flow.vpl(self.fluxos[1:2], 0.1), [0.0], atol=1e-9)
+        self.assertAlmostEqual(cash_flow.vpl([-100, 50, 60], 0.0)[0], 10)
+
+        taxas = cash_flow.tir(self.fluxos)
+        self.assertAlmostEqual(taxas[1], 0.1)
+        np.testing.assert_allclose(cash_flow.vpl(self.fluxos, taxas), 0, atol=1e-6)
+        self.assertTrue(np.isnan(cash_flow.tir([-100, -10, -10])[0]))
+
+    def test_tir_de_muitos_projetos(self):
+        """Testa a TIR de milhares de projetos gerados com crescimento composto."""
+        rng = np.random.default_rng(0)
+        fluxos = cash_flow.projetar_fluxos(rng.uniform(1100, 1500, 5000), 1000, 60,
+                                           crescimento_receita=rng.uniform(0, 0.02, 5000),
+                                           investimento=rng.uniform(1000, 10000, 5000))
+        taxas = cash_flow.tir(fluxos)
+        self.assertFalse(np.isnan(taxas).any())
+        np.testing.assert_allclose(cash_flow.vpl(fluxos, taxas) / np.abs(fluxos).sum(axis=1), 0, atol=1e-8)
+
+    def test_payback_descontado(self):
+        """Testa o payback simples e descontado, com interpolação e projetos que não se pagam."""
+        payback = cash_flow.payback_descontado(self.fluxos, 0.0)
+        self.assertAlmostEqual(payback[0], 2.6)
+        self.assertAlmostEqual(payback[1], 100 / 110)
+        self.assertTrue(np.isnan(payback[2]))
+        self.assertGreater(cash_flow.payback_descontado(self.fluxos, 0.05)[0], payback[0])
+
+    def test_projecao_com_crescimento_composto(self):
+        """Testa que receita e custos crescem de forma composta mês a mês."""
+        fluxos = FinancialAnalysisService().projetar_fluxo_caixa(1000, {'fixos': 300, 'TI': 200}, periodos=3,
+                                                                 crescimento_receita=0.1, investimento=500)
+        np.testing.assert_allclose(fluxos, [[-500, 500, 600, 710]])
+        np.testing.assert_allclose(cash_flow.crescimento_composto(100, [0.0, 0.1], 2), [[100, 100, 100], [100, 110, 121]])
+
+    def test_fluxo_de_recebimentos(self):
+        """Testa a série mensal montada a partir do histórico de Recebimento."""
+        recebimentos = [
+            SimpleNamespace(categoria='fixos', valor=300, total_custos=500, receita_projetada=800,
+                            data_recebimento=datetime(2024, 1, 10)),
+            SimpleNamespace(categoria='TI', valor=200, total_custos=500, receita_projetada=800,
+                            data_recebimento=datetime(2024, 1, 10)),
+            SimpleNamespace(categoria='fixos', valor=400, total_custos=400, receita_projetada=1000,
+                            data_recebimento=datetime(2024, 3, 5)),
+        ]
+        service = FinancialAnalysisService()
+        mensal = service.fluxo_de_recebimentos(recebimentos)
+
+        self.assertEqual(list(mensal.index.astype(str)), ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(list(mensal['fluxo']), [300, 0, 600])
+
+        avaliacao = service.avaliar_fluxos(np.concatenate([[-500], mensal['fluxo'].to_numpy()]), 0.01)
+        self.assertIsInstance(avaliacao, pd.DataFrame)
+        self.assertEqual(list(avaliacao.columns), ['vpl', 'tir', 'payback', 'payback_descontado'])
+        self.assertAlmostEqual(avaliacao['payback'][0], 2 + 200 / 600)
+
+    def test_analises_iguais_no_mesmo_mes_contam_separadas(self):
+        """Testa que duas análises com os mesmos totais no mês não são fundidas numa só."""
+        recebimentos = pd.DataFrame({
+            'categoria': ['fixos', 'TI', 'fixos', 'TI'],
+            'total_custos': [500.0] * 4,
+            'receita_projetada': [800.0] * 4,
+            'data_recebimento': [datetime(2024, 1, 10, 9)] * 2 + [datetime(2024, 1, 20, 15)] * 2,
+        })
+        mensal = cash_flow.fluxo_mensal_de_recebimentos(recebimentos)
+
+        self.assertEqual(list(mensal['receita']), [1600])
+        self.assertEqual(list(mensal['fluxo']), [600])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from app_balance.processamento.chunker import DocumentChunker
+
+
+class TestDocumentChunker(unittest.TestCase):
+
+    def setUp(self):
+        self.chunker = DocumentChunker(max_tokens=60, sobreposicao=20)
+        self.paginas = [
+            (numero, "\n\n".join(f"Parágrafo {numero}.{i} sobre custos e receitas." for i in range(4)))
+            for numero in range(1, 4)
+        ]
+
+    def test_blocos_respeitam_orcamento_e_paginas(self):
+        """Testa o limite de tokens, a ordem das páginas e os metadados de origem."""
+        chunks = self.chunker.dividir_paginas(self.paginas, arquivo='relatorio.pdf')
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(chunk['tokens'], 60)
+            self.assertEqual(chunk['arquivo'], 'relatorio.pdf')
+            self.assertLessEqual(chunk['pagina_inicial'], chunk['pagina_final'])
+        self.assertEqual(chunks[0]['pagina_inicial'], 1)
+        self.assertEqual(chunks[-1]['pagina_final'], 3)
+        self.assertEqual([chunk['indice'] for chunk in chunks], list(range(len(chunks))))
+
+    def test_sobreposicao_repete_ultimo_paragrafo(self):
+        """Testa que o último parágrafo de um bloco abre o bloco seguinte."""
+        chunks = self.chunker.dividir_paginas(self.paginas)
+
+        for anterior, proximo in zip(chunks, chunks[1:]):
+            ultimo_paragrafo = anterior['texto'].split("\n\n")[-1]
+            self.assertTrue(proximo['texto'].startswith(ultimo_paragrafo))
+
+    def test_paragrafo_maior_que_orcamento_e_quebrado(self):
+        """Testa a quebra entre palavras de um parágrafo que não cabe em um bloco."""
+        chunks = DocumentChunker(max_tokens=30, sobreposicao=0).dividir_texto(" ".join(["custo"] * 200))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk['tokens'] <= 30 for chunk in chunks))
+        self.assertEqual(sum(chunk['texto'].count("custo") for chunk in chunks), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
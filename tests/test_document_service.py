@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+import unittest
+from docx import Document
+from unittest import mock
+from app_balance.processamento import document_service
+from app_balance.processamento.document_service import DocumentService
+
+
+class TestDocumentService(unittest.TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.diretorio)
+        self.manifesto = os.path.join(self.diretorio, 'manifesto.json')
+        documentos = os.path.join(self.diretorio, 'docs')
+        os.makedirs(documentos)
+        documento = Document()
+        documento.add_paragraph("Receita de janeiro")
+        documento.save(os.path.join(documentos, 'a.docx'))
+        self.service = DocumentService(docx_directory=documentos)
+
+    def test_manifesto_reaproveita_documentos_sem_mudancas(self):
+        """Testa que uma segunda varredura com o manifesto não extrai os documentos de novo."""
+        completo = self.service.process_all_documents(self.manifesto)
+        self.assertIn("Receita de janeiro", completo['docxs']['a.docx'])
+
+        with mock.patch.object(DocumentService, 'read_docx') as extrator:
+            self.assertEqual(self.service.process_all_documents(self.manifesto), completo)
+        extrator.assert_not_called()
+
+    def test_nova_versao_do_extrator_reprocessa_documentos(self):
+        """Testa que incrementar a versão dos extratores descarta o manifesto e reextrai tudo."""
+        self.service.process_all_documents(self.manifesto)
+
+        with mock.patch.object(document_service, 'VERSAO_EXTRATOR', '2'), \
+                mock.patch.object(DocumentService, 'read_docx', return_value='texto novo') as extrator:
+            result = self.service.process_all_documents(self.manifesto)
+
+        extrator.assert_called_once()
+        self.assertEqual(result['docxs'], {'a.docx': 'texto novo'})
+
+
+if __name__ == '__main__':
+    unittest.main()
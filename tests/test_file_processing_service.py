@@ -1,6 +1,16 @@
 import unittest
+import json
+import mmap
 import os
+import shutil
+import tempfile
+from docx import Document
+from pypdf import PdfReader, PdfWriter
+from unittest import mock
 from processamento.file_processing_service import FileProcessingService
+from app_balance.processamento.document_manifest import DocumentManifest
+from app_balance.processamento.extraction_cache import ExtractionCache
+from app_balance.processamento.docx_stream import converter_valor
 
 class TestFileProcessingService(unittest.TestCase):
 
@@ -47,6 +57,228 @@ class TestFileProcessingService(unittest.TestCase):
         self.assertTrue(isinstance(result['texto'], str))
         self.assertGreater(len(result['texto']), 0)  # Verifica se o texto extraído não está vazio
 
+    def test_processar_arquivo_docx_com_tabelas(self):
+        """Testa que tabelas do DOCX entram no texto e voltam como registros numéricos."""
+        documento = Document()
+        documento.add_paragraph('Relatório de custos')
+        tabela = documento.add_table(rows=3, cols=2)
+        for linha, valores in zip(tabela.rows, [('Categoria', 'Valor'), ('Marketing', 'R$ 1.500,00'), ('TI', '700')]):
+            for celula, valor in zip(linha.cells, valores):
+                celula.text = valor
+        documento.add_paragraph('Fim do relatório')
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        caminho = os.path.join(diretorio, 'custos.docx')
+        documento.save(caminho)
+
+        result = self.file_service.processar_arquivo(caminho, 'docx')
+
+        self.assertEqual(result['texto'].split('\n'),
+                         ['Relatório de custos', 'Categoria\tValor', 'Marketing\tR$ 1.500,00', 'TI\t700', 'Fim do relatório'])
+        self.assertEqual(result['tabelas'], {'Tabela1': [{'Categoria': 'Marketing', 'Valor': 1500.0},
+                                                         {'Categoria': 'TI', 'Valor': 700.0}]})
+
+    def test_converter_valor_formatos_brasileiros(self):
+        """Testa que pontos de milhar sem vírgula não viram casas decimais."""
+        self.assertEqual(converter_valor('R$ 1.500'), 1500.0)
+        self.assertEqual(converter_valor('1.234.567'), 1234567.0)
+        self.assertEqual(converter_valor('R$ 1.234,56'), 1234.56)
+        self.assertEqual(converter_valor('-2.000'), -2000.0)
+        self.assertEqual(converter_valor('0.75'), 0.75)
+        self.assertEqual(converter_valor('1.2345'), 1.2345)
+        self.assertEqual(converter_valor('Marketing'), 'Marketing')
+
+    def test_processar_arquivo_aceita_caminho_memoryview_e_mmap(self):
+        """Testa que caminhos, memoryviews e arquivos mapeados dão o mesmo resultado que bytes."""
+        for caminho, tipo in ((self.excel_file_path, 'excel'), (self.pdf_file_path, 'pdf'),
+                              (self.docx_file_path, 'docx')):
+            with open(caminho, 'rb') as f:
+                esperado = self.file_service.processar_arquivo(f.read(), tipo)
+                self.assertEqual(self.file_service.processar_arquivo(caminho, tipo), esperado)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                    self.assertEqual(self.file_service.processar_arquivo(mapa, tipo), esperado)
+                    with memoryview(mapa) as visao:
+                        self.assertEqual(self.file_service.processar_arquivo(visao, tipo), esperado)
+
+    def test_iterar_paginas_pdf_intervalo_e_parada(self):
+        """Testa a extração página a página com intervalo e limite de páginas."""
+        writer = PdfWriter()
+        pagina = PdfReader(self.pdf_file_path).pages[0]
+        for _ in range(5):
+            writer.add_page(pagina)
+        with tempfile.TemporaryFile() as buffer:
+            writer.write(buffer)
+            buffer.seek(0)
+            arquivo_pdf = buffer.read()
+
+        paginas = list(self.file_service.iterar_paginas_pdf(arquivo_pdf))
+        self.assertEqual([numero for numero, _ in paginas], [1, 2, 3, 4, 5])
+        self.assertIn('exemplo', paginas[0][1])
+
+        intervalo = self.file_service.iterar_paginas_pdf(arquivo_pdf, pagina_inicial=2, pagina_final=4)
+        self.assertEqual([numero for numero, _ in intervalo], [2, 3, 4])
+
+        primeiras = self.file_service.iterar_paginas_pdf(arquivo_pdf, max_paginas=2)
+        self.assertEqual([numero for numero, _ in primeiras], [1, 2])
+
+        self.assertEqual(self.file_service.processar_arquivo_pdf(arquivo_pdf),
+                         "".join(texto for _, texto in paginas).strip())
+
+        paralelo = FileProcessingService(limite_paginas_paralelo=3, max_workers_pdf=2)
+        self.assertEqual(paralelo.processar_arquivo_pdf(arquivo_pdf),
+                         self.file_service.processar_arquivo_pdf(arquivo_pdf, paralelo=False))
+
+        # Buffers chegam aos processos por um arquivo temporário, removido ao final
+        temporarios = []
+        criar_temporario = tempfile.mkstemp
+
+        def mkstemp(*args, **kwargs):
+            temporarios.append(criar_temporario(*args, **kwargs))
+            return temporarios[-1]
+
+        with mock.patch('processamento.file_sources.tempfile.mkstemp', side_effect=mkstemp):
+            self.assertEqual(paralelo.processar_arquivo_pdf(memoryview(arquivo_pdf)),
+                             self.file_service.processar_arquivo_pdf(arquivo_pdf, paralelo=False))
+        self.assertEqual(len(temporarios), 1)
+        self.assertFalse(os.path.exists(temporarios[0][1]))
+
+    def test_cache_de_extracao_evita_reprocessamento(self):
+        """Testa que um reenvio do mesmo arquivo é atendido pelo cache."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        cache = ExtractionCache(diretorio)
+        service = FileProcessingService(cache=cache)
+        with open(self.docx_file_path, 'rb') as f:
+            arquivo_docx = f.read()
+
+        primeiro = service.processar_arquivo(arquivo_docx, 'docx')
+        with mock.patch.object(service, 'processar_arquivo_docx') as extrator:
+            segundo = service.processar_arquivo(arquivo_docx, 'docx')
+            extrator.assert_not_called()
+
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(cache.estatisticas()['hits'], 1)
+        self.assertEqual(cache.estatisticas()['misses'], 1)
+
+    def test_cache_de_extracao_remove_menos_usados(self):
+        """Testa a remoção LRU quando o cache excede o tamanho máximo."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        cache = ExtractionCache(diretorio, tamanho_maximo=2500)
+        cache.armazenar('a', 'x' * 1000)
+        cache.armazenar('b', 'y' * 1000)
+        os.utime(os.path.join(diretorio, 'a.pkl'), (0, 0))
+        os.utime(os.path.join(diretorio, 'b.pkl'), (1, 1))
+        cache.obter('a')
+        cache.armazenar('c', 'z' * 1000)
+
+        self.assertIsNone(cache.obter('b'))
+        self.assertEqual(cache.obter('a'), 'x' * 1000)
+        self.assertLessEqual(cache.estatisticas()['tamanho_bytes'], 2500)
+
+    def test_processar_todos_documentos_incremental(self):
+        """Testa que o manifesto só reextrai arquivos novos ou alterados e esquece os removidos."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        manifesto = os.path.join(diretorio, 'manifesto.json')
+        shutil.copy(self.pdf_file_path, os.path.join(diretorio, 'a.pdf'))
+        shutil.copy(self.docx_file_path, os.path.join(diretorio, 'b.docx'))
+        service = FileProcessingService(pdf_directory=diretorio, docx_directory=diretorio)
+
+        completo = service.processar_todos_documentos(manifesto=manifesto)
+        self.assertEqual(completo, service.processar_todos_documentos())
+
+        shutil.copy(self.pdf_file_path, os.path.join(diretorio, 'novo.pdf'))
+        with open(os.path.join(diretorio, 'novo.pdf'), 'ab') as f:
+            f.write(b'\n% revisado\n')
+        os.remove(os.path.join(diretorio, 'b.docx'))
+        with mock.patch('processamento.file_processing_service._extrair_documento',
+                        return_value='texto novo') as extrator:
+            result = service.processar_todos_documentos(manifesto=manifesto)
+
+        extrator.assert_called_once_with(os.path.join(diretorio, 'novo.pdf'), 'pdf')
+        self.assertEqual(result['pdfs'], {'a.pdf': completo['pdfs']['a.pdf'], 'novo.pdf': 'texto novo'})
+        self.assertEqual(result['docxs'], {})
+
+    def test_manifesto_guarda_so_metadados_e_nao_reescreve_sem_mudancas(self):
+        """Testa que os textos ficam no cache por hash e que uma varredura sem mudanças não grava nada."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        documentos = os.path.join(diretorio, 'docs')
+        os.makedirs(documentos)
+        manifesto = os.path.join(diretorio, 'manifesto.json')
+        shutil.copy(self.pdf_file_path, os.path.join(documentos, 'a.pdf'))
+        service = FileProcessingService(pdf_directory=documentos, docx_directory=documentos)
+
+        completo = service.processar_todos_documentos(manifesto=manifesto)
+        with open(manifesto, encoding='utf-8') as f:
+            entrada = json.load(f)['arquivos'][os.path.join(documentos, 'a.pdf')]
+        self.assertEqual(set(entrada), {'tipo', 'tamanho', 'mtime', 'hash'})
+
+        with mock.patch.object(DocumentManifest, 'salvar') as salvar, \
+                mock.patch.object(ExtractionCache, 'armazenar') as armazenar:
+            self.assertEqual(service.processar_todos_documentos(manifesto=manifesto), completo)
+        salvar.assert_not_called()
+        armazenar.assert_not_called()
+
+        # Uma cópia de um documento já extraído reaproveita o texto guardado para o mesmo hash
+        shutil.copy(self.pdf_file_path, os.path.join(documentos, 'copia.pdf'))
+        with mock.patch('processamento.file_processing_service._extrair_documento') as extrator:
+            result = service.processar_todos_documentos(manifesto=manifesto)
+        extrator.assert_not_called()
+        self.assertEqual(result['pdfs'], {'a.pdf': completo['pdfs']['a.pdf'], 'copia.pdf': completo['pdfs']['a.pdf']})
+        os.remove(os.path.join(documentos, 'copia.pdf'))
+
+        # Sem o texto no cache, o documento é extraído de novo
+        ExtractionCache(os.path.join(diretorio, 'manifesto.textos')).limpar()
+        with mock.patch('processamento.file_processing_service._extrair_documento',
+                        return_value='texto novo') as extrator:
+            self.assertEqual(service.processar_todos_documentos(manifesto=manifesto)['pdfs'], {'a.pdf': 'texto novo'})
+        extrator.assert_called_once()
+
+    def test_processar_documentos_em_paralelo_isola_erros(self):
+        """Testa o modo paralelo com um PDF corrompido no meio do lote."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        shutil.copy(self.pdf_file_path, os.path.join(diretorio, 'a.pdf'))
+        shutil.copy(self.docx_file_path, os.path.join(diretorio, 'b.docx'))
+        with open(os.path.join(diretorio, 'corrompido.pdf'), 'wb') as f:
+            f.write(b'isto nao e um pdf')
+
+        service = FileProcessingService(pdf_directory=diretorio, docx_directory=diretorio)
+        itens = list(service.processar_documentos_em_paralelo(max_workers=2, max_em_andamento=1))
+
+        erros = {item['arquivo'] for item in itens if item['erro']}
+        self.assertEqual(erros, {'corrompido.pdf'})
+        self.assertEqual(len(itens), 3)
+
+    def test_processar_todos_documentos_falha_igual_nos_dois_modos(self):
+        """Testa que um PDF corrompido gera o mesmo erro no modo serial e no paralelo."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        shutil.copy(self.pdf_file_path, os.path.join(diretorio, 'a.pdf'))
+        shutil.copy(self.docx_file_path, os.path.join(diretorio, 'b.docx'))
+        corrompido = os.path.join(diretorio, 'corrompido.pdf')
+        with open(corrompido, 'wb') as f:
+            f.write(b'isto nao e um pdf')
+        service = FileProcessingService(pdf_directory=diretorio, docx_directory=diretorio)
+
+        mensagens = []
+        for paralelo in (False, True):
+            with self.assertRaises(RuntimeError) as contexto:
+                service.processar_todos_documentos(paralelo=paralelo, max_workers=2)
+            mensagens.append(str(contexto.exception))
+        self.assertEqual(mensagens[0], mensagens[1])
+        self.assertIn("Erro ao processar arquivo PDF", mensagens[0])
+
+        os.remove(corrompido)
+        result = service.processar_todos_documentos(paralelo=True, max_workers=2)
+        self.assertEqual(result, service.processar_todos_documentos())
+        self.assertEqual(set(result['pdfs']), {'a.pdf'})
+        self.assertEqual(set(result['docxs']), {'b.docx'})
+        with open(self.pdf_file_path, 'rb') as f:
+            self.assertEqual(result['pdfs']['a.pdf'], service.processar_arquivo_pdf(f.read()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import pandas as pd
+from app_balance.services.financial_analysis import FinancialAnalysisService
+
+
+class TestFinancialAnalysisService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = FinancialAnalysisService()
+
+    def test_cenarios_batem_com_o_relatorio(self):
+        """Testa que o cálculo vetorizado reproduz os indicadores do relatório escalar."""
+        cenarios = pd.DataFrame({
+            'receita': [37500.0, 10000.0],
+            'custos_fixos': [10000.0, 4000.0],
+            'custos_variaveis': [15000.0, 5000.0],
+            'horas': [160.0, 100.0],
+            'investimentos': [20000.0, 0.0],
+        })
+        resultado = self.service.analisar_cenarios(cenarios)
+        primeiro = resultado.iloc[0]
+
+        self.assertAlmostEqual(primeiro['lucro_apos_impostos'], 12500 * 0.85)
+        self.assertAlmostEqual(primeiro['margem_lucro'], 12500 * 0.85 / 37500 * 100)
+        self.assertAlmostEqual(primeiro['margem_contribuicao'], 22500)
+        self.assertAlmostEqual(primeiro['ponto_equilibrio'], 10000 / (22500 / 37500))
+        self.assertAlmostEqual(primeiro['valor_hora'], 25000 / 160)
+        self.assertAlmostEqual(primeiro['roi'], 12500 * 0.85 / 20000 * 100)
+        self.assertAlmostEqual(primeiro['payback'], 20000 / 22500)
+        self.assertAlmostEqual(primeiro['margem_sensibilidade_positiva'], (37500 * 1.05 - 25000) / (37500 * 1.05) * 100)
+
+        relatorio = self.service.gerar_analise_detalhada(
+            {'total_custos': 25000, 'investimentos': 20000}, 37500, 160, {'fixos': 10000, 'pessoal': 15000})
+        self.assertIn(f"ROI: {primeiro['roi']:.2f}%", relatorio)
+        self.assertIn(f"Ponto de equilíbrio: R$ {primeiro['ponto_equilibrio']:.2f}", relatorio)
+        self.assertEqual(resultado.iloc[1]['roi'], 0)
+
+    def test_divisoes_por_zero_elemento_a_elemento(self):
+        """Testa que receita, horas e investimentos zerados não afetam os outros cenários."""
+        resultado = self.service.analisar_cenarios({
+            'receita': np.array([0.0, 1000.0, 500.0]),
+            'custos_variaveis': np.array([100.0, 200.0, 600.0]),
+            'horas': np.array([10.0, 0.0, 5.0]),
+        })
+
+        self.assertEqual(resultado['margem_lucro'].iloc[0], 0)
+        self.assertEqual(resultado['margem_sensibilidade_negativa'].iloc[0], 0)
+        self.assertTrue(np.isnan(resultado['valor_hora'].iloc[1]))
+        self.assertAlmostEqual(resultado['valor_hora'].iloc[2], 120)
+        self.assertEqual(resultado['ponto_equilibrio'].iloc[2], 0)
+        self.assertEqual(resultado['payback'].iloc[2], 0)
+        self.assertFalse(resultado.drop(columns='valor_hora').isna().any().any())
+
+    def test_combinar_cenarios(self):
+        """Testa o produto cartesiano de valores e a validação das colunas."""
+        grade = self.service.combinar_cenarios(receita=[1000, 2000, 3000], horas=160, taxa_imposto=[0.1, 0.2])
+        self.assertEqual(len(grade), 6)
+        self.assertEqual(len(self.service.analisar_cenarios(grade)), 6)
+
+        with self.assertRaises(ValueError):
+            self.service.analisar_cenarios({'receita': [1.0]})
+        with self.assertRaises(ValueError):
+            self.service.analisar_cenarios({'receita': [1.0], 'horas': [1.0], 'receitas': [1.0]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from app_balance.services.greeting_service import GreetingService
+from app_balance.services.keyword_matcher import KeywordMatcher, normalizar
+from app_balance.services.local_router import LocalRouter
+
+
+class TestKeywordMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            "financeiro": ["finança", "orçamento", "cash flow", "ROI", "custo"],
+            "piada": ["piada", "engraçado"],
+        })
+
+    def test_normalizacao_de_acentos(self):
+        """Testa que acentos e maiúsculas não impedem a correspondência."""
+        self.assertEqual(normalizar("Orçamento FINANÇA"), "orcamento financa")
+        ocorrencias = self.matcher.encontrar("O ORCAMENTO e a financa; e o orçamento?")
+        self.assertEqual([palavra for palavra, _, _, _ in ocorrencias], ["orçamento", "finança", "orçamento"])
+
+    def test_palavras_inteiras_e_sobreposicoes(self):
+        """Testa limites de palavra, expressões com espaço e palavras que se sobrepõem."""
+        self.assertEqual(self.matcher.rotulos("custos do croissant"), [])
+        self.assertEqual(self.matcher.rotulos("meu cash flow e uma piada engraçada"), ["financeiro", "piada"])
+        self.assertEqual(self.matcher.rotulo("Orcamento"), "financeiro")
+        self.assertIsNone(self.matcher.rotulo("cultura"))
+
+        substrings = KeywordMatcher({"x": ["he", "she", "hers"]}, palavras_inteiras=False)
+        self.assertEqual([palavra for palavra, _, _, _ in substrings.encontrar("ushers")], ["she", "he", "hers"])
+
+    def test_saudacoes(self):
+        """Testa que saudações são palavras inteiras e sem depender de acento."""
+        greetings = GreetingService()
+        self.assertTrue(greetings.is_greeting("Ola, tudo bem?"))
+        self.assertTrue(greetings.is_greeting("BOM DIA!"))
+        self.assertFalse(greetings.is_greeting("Tenho oito boletos"))
+        self.assertFalse(greetings.is_greeting("this is it"))
+
+    def test_lote(self):
+        """Testa a classificação em lote (a vazão é medida em benchmarks/bench_roteamento_local.py)."""
+        router = LocalRouter(self.matcher)
+        mensagens = ["Qual o orçamento do mês e o ROI?", "Conte uma piada", "Como está o tempo?"] * 2000
+
+        decisoes = router.classificar_lote(mensagens)
+        self.assertEqual(len(decisoes), len(mensagens))
+        self.assertEqual([decisao['categoria'] for decisao in decisoes[:3]], ["financeiro", "piada", None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from app_balance.services.keyword_matcher import KeywordMatcher
+from app_balance.services.local_router import LocalRouter
+
+
+class TestLocalRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = LocalRouter(KeywordMatcher({
+            "financeiro": ["lucro", "orçamento", "ROI", "cash flow"],
+            "piada": ["piada", "engraçado"],
+        }))
+
+    def test_palavras_inteiras_e_expressoes(self):
+        """Testa a busca por palavras inteiras, expressões de várias palavras e a grafia do vocabulário."""
+        palavras = self.router.encontrar_palavras_chave("Qual o ROI e o Cash Flow? O lucrotivo não conta.")
+        self.assertEqual(palavras, ["ROI", "cash flow"])
+
+    def test_confianca(self):
+        """Testa que acertos de uma só categoria decidem localmente e que mistura ou ausência vão ao GPT-4."""
+        financeiro = self.router.classificar("Como está o orçamento deste mês?")
+        self.assertEqual(financeiro['categoria'], "financeiro")
+        self.assertTrue(financeiro['local'])
+        self.assertEqual(financeiro['analise']['keywords'], ["orçamento"])
+
+        self.assertFalse(self.router.classificar("Conte uma piada sobre lucro")['local'])
+        sem_palavras = self.router.classificar("Qual a capital da França?")
+        self.assertEqual((sem_palavras['categoria'], sem_palavras['confianca']), (None, 0.0))
+
+    def test_estatisticas(self):
+        """Testa a fração de rotas decididas localmente."""
+        for caminho in ("local", "local", "local", "gpt"):
+            self.router.registrar_caminho(caminho)
+        self.assertEqual(self.router.estatisticas(), {'local': 3, 'gpt': 1, 'fracao_local': 0.75})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import threading
+import unittest
+from app_balance.services.micro_batcher import MicroBatcher
+from app_balance.services.model_registry import ModelRegistry
+from app_balance.services.text_processing import TextProcessingService
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.lotes = []
+
+        def classificar(textos):
+            self.lotes.append(list(textos))
+            return [texto.upper() for texto in textos]
+
+        self.batcher = MicroBatcher(classificar, max_lote=4, max_espera_ms=50)
+
+    def tearDown(self):
+        self.batcher.fechar()
+
+    def test_agrupa_pedidos_em_lotes(self):
+        """Testa que pedidos simultâneos viram lotes de até max_lote, com os resultados na ordem."""
+        resultados = self.batcher.processar([f"texto {i}" for i in range(10)])
+
+        self.assertEqual(resultados, [f"TEXTO {i}" for i in range(10)])
+        self.assertEqual([len(lote) for lote in self.lotes], [4, 4, 2])
+        estatisticas = self.batcher.estatisticas()
+        self.assertEqual(estatisticas['lotes'], 3)
+        self.assertEqual(estatisticas['itens'], 10)
+
+    def test_chamadores_de_varias_threads(self):
+        """Testa que cada thread recebe o seu resultado pelo Future."""
+        resultados = {}
+
+        def chamar(i):
+            resultados[i] = self.batcher.submeter(f"t{i}").result(timeout=5)
+
+        threads = [threading.Thread(target=chamar, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(resultados, {i: f"T{i}" for i in range(8)})
+        self.assertLess(len(self.lotes), 8)
+
+    def test_erro_vai_para_todo_o_lote(self):
+        """Testa que a exceção da função de lote chega a todos os Futures do lote."""
+        batcher = MicroBatcher(lambda textos: 1 / 0, max_lote=4, max_espera_ms=20)
+        futuros = batcher.submeter_varios(["a", "b"])
+        for futuro in futuros:
+            with self.assertRaises(ZeroDivisionError):
+                futuro.result(timeout=5)
+        self.assertEqual(batcher.estatisticas()['erros'], 1)
+        batcher.fechar()
+
+    def test_sentimento_local_em_lote(self):
+        """Testa que o fallback local e a análise em lote usam a mesma fila do pipeline de sentimentos."""
+        chamadas = []
+
+        def pipeline(textos, batch_size):
+            chamadas.append(len(textos))
+            return [{"label": "POSITIVE" if "bom" in texto else "NEGATIVE", "score": 0.9} for texto in textos]
+
+        models = ModelRegistry()
+        models.registrar("sentimento", lambda: pipeline)
+        service = TextProcessingService(models=models)
+
+        sentimentos = service.analyze_sentiment_batch(["bom dia", "dia ruim", "bom lucro"])
+
+        self.assertEqual(sentimentos, ["POSITIVE", "NEGATIVE", "POSITIVE"])
+        self.assertEqual(chamadas, [3])
+        service.sentiment_batcher.fechar()
+
+
+if __name__ == '__main__':
+    unittest.main()
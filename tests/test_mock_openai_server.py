@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import openai
+
+from app_balance.services.gpt_service import GPTService
+from tests.mock_openai_server import LatencyDistribution, MockOpenAIConfig, MockOpenAIServer
+from app_balance.services.openai_client import OpenAIClientPool
+
+
+class TestMockOpenAIServer(unittest.TestCase):
+
+    def iniciar(self, config=None):
+        servidor = MockOpenAIServer(config).iniciar()
+        self.addCleanup(servidor.parar)
+        cliente = OpenAIClientPool(api_key="mock", base_url=servidor.base_url, max_tentativas=1)
+        self.addCleanup(cliente.fechar)
+        return servidor, cliente
+
+    def test_chat_e_streaming_em_eco(self):
+        """Testa as respostas em eco pelo cliente do app, com e sem streaming."""
+        servidor, cliente = self.iniciar()
+
+        self.assertEqual(cliente.completar_chat_sync("Qual o lucro?"), "Eco: Qual o lucro?")
+        self.assertEqual(list(cliente.transmitir_chat_sync("um dois", max_tokens=2)), ["Eco:", " um"])
+        self.assertEqual(servidor.estatisticas()['streams'], 1)
+
+    def test_completions_legado(self):
+        """Testa o endpoint de completions com o SDK oficial e resposta fixa."""
+        servidor, _ = self.iniciar(MockOpenAIConfig(resposta="Resposta fixa"))
+        sdk = openai.OpenAI(api_key="mock", base_url=servidor.base_url)
+
+        self.assertEqual(sdk.completions.create(model="gpt-4", prompt="x").choices[0].text, "Resposta fixa")
+        trechos = [evento.choices[0].text for evento in sdk.completions.create(model="gpt-4", prompt="x", stream=True)]
+        self.assertEqual("".join(trechos), "Resposta fixa")
+
+    def test_erros_simulados(self):
+        """Testa a taxa de erro e o status escolhido, e o fallback do GPTService."""
+        servidor, cliente = self.iniciar(MockOpenAIConfig(taxa_erro=1.0, status_erro=[400]))
+        service = GPTService(api_key="mock", cliente=cliente)
+
+        with self.assertRaises(openai.BadRequestError):
+            cliente.completar_chat_sync("oi")
+        self.assertEqual(service.enviar_prompt("oi"), service.mensagem_erro)
+        self.assertEqual(servidor.estatisticas()['erros'], 2)
+
+    def test_distribuicoes_de_latencia(self):
+        """Testa que as distribuições respeitam a média e nunca ficam negativas."""
+        rng = random.Random(1)
+        for tipo in ("fixa", "uniforme", "normal", "lognormal", "exponencial"):
+            distribuicao = LatencyDistribution(tipo, 0.2, 0.1)
+            amostras = [distribuicao.amostrar(rng) for _ in range(5000)]
+            self.assertGreaterEqual(min(amostras), 0.0)
+            self.assertAlmostEqual(sum(amostras) / len(amostras), 0.2, delta=0.02, msg=tipo)
+        self.assertEqual(LatencyDistribution.de_texto("0.3").amostrar(rng), 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading
+import time
+import unittest
+from app_balance.services.model_registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ModelRegistry()
+        self.cargas = 0
+
+        def carregar():
+            self.cargas += 1
+            time.sleep(0.05)
+            return bytearray(8 * 1024 * 1024)
+
+        self.registry.registrar("modelo", carregar)
+
+    def test_carga_preguicosa_unica(self):
+        """Testa que o modelo só carrega no primeiro uso, uma vez, mesmo com chamadas simultâneas."""
+        self.assertFalse(self.registry.carregado("modelo"))
+        resultados = []
+        threads = [threading.Thread(target=lambda: resultados.append(self.registry.obter("modelo"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.cargas, 1)
+        self.assertTrue(all(resultado is resultados[0] for resultado in resultados))
+        estatisticas = self.registry.estatisticas()["modelo"]
+        self.assertTrue(estatisticas['carregado'])
+        self.assertGreaterEqual(estatisticas['tempo_carga'], 0.05)
+        self.assertIsNotNone(estatisticas['memoria_bytes'])
+
+    def test_aquecer_e_descarregar(self):
+        """Testa o aquecimento em segundo plano, a descarga e a recarga."""
+        self.registry.registrar("quebrado", lambda: 1 / 0)
+        self.registry.aquecer().join()
+
+        self.assertTrue(self.registry.carregado("modelo"))
+        self.assertIn("division by zero", self.registry.estatisticas()["quebrado"]['erro'])
+
+        self.registry.descarregar("modelo")
+        self.assertFalse(self.registry.carregado("modelo"))
+        self.registry.obter("modelo")
+        self.assertEqual(self.registry.estatisticas()["modelo"]['cargas'], 2)
+
+    def test_modelo_nao_registrado(self):
+        with self.assertRaises(KeyError):
+            self.registry.obter("inexistente")
+
+
+if __name__ == '__main__':
+    unittest.main()
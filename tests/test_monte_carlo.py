@@ -0,0 +1,58 @@
+import unittest
+from app_balance.services.financial_analysis import FinancialAnalysisService
+from app_balance.services.monte_carlo import Distribuicao, simular_monte_carlo
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def setUp(self):
+        self.categorias = {'fixos': 10000, 'pessoal': 8000, 'TI': 7000}
+
+    def test_distribuicoes_fixas_reproduzem_o_calculo_escalar(self):
+        """Testa que, sem variação, todos os percentis são o valor determinístico."""
+        fixa = Distribuicao("fixa")
+        resultado = simular_monte_carlo(37500, 25000, self.categorias, distribuicoes={'receita': fixa, 'custos': fixa},
+                                        simulacoes=1000)
+
+        self.assertAlmostEqual(resultado['lucro']['p5'], 12500 * 0.85)
+        self.assertAlmostEqual(resultado['lucro']['p95'], 12500 * 0.85)
+        self.assertAlmostEqual(resultado['margem']['p50'], 12500 * 0.85 / 37500 * 100)
+        self.assertAlmostEqual(resultado['ponto_equilibrio']['p50'], 10000 / (22500 / 37500))
+        self.assertEqual(resultado['probabilidade_prejuizo'], 0)
+
+    def test_semente_reproduzivel_com_qualquer_numero_de_processos(self):
+        """Testa que a mesma semente dá o mesmo resultado em um ou vários processos."""
+        distribuicoes = {'receita': Distribuicao.de_texto("uniforme:0.5:1.2"), 'TI': Distribuicao.de_texto("lognormal:0.3")}
+        um = simular_monte_carlo(37500, 25000, self.categorias, distribuicoes=distribuicoes, simulacoes=600_000, semente=7)
+        varios = simular_monte_carlo(37500, 25000, self.categorias, distribuicoes=distribuicoes, simulacoes=600_000,
+                                     semente=7, processos=2)
+
+        self.assertEqual(um, varios)
+        self.assertGreater(um['probabilidade_prejuizo'], 0.1)
+        self.assertLess(um['lucro']['p5'], um['lucro']['p50'])
+
+    def test_um_milhao_de_sorteios(self):
+        """Testa a análise com 1M de sorteios (vários blocos) em um único processo; o tempo é medido em
+        benchmarks/bench_monte_carlo.py."""
+        resultado = simular_monte_carlo(37500, 25000, self.categorias, simulacoes=1_000_000, semente=1)
+        self.assertEqual(resultado['simulacoes'], 1_000_000)
+        self.assertLess(resultado['lucro']['p5'], resultado['lucro']['p95'])
+
+    def test_distribuicao_invalida(self):
+        with self.assertRaises(ValueError):
+            Distribuicao("beta", (1, 2))
+        with self.assertRaises(ValueError):
+            Distribuicao.de_texto("normal")
+
+    def test_relatorio_com_monte_carlo(self):
+        """Testa que o relatório troca a variação fixa pelo resumo do Monte Carlo."""
+        relatorio = FinancialAnalysisService().gerar_analise_detalhada(
+            {'total_custos': 25000}, 37500, 160, self.categorias, simulacoes=10_000, semente=3)
+
+        self.assertIn("Monte Carlo (10000 simulações)", relatorio)
+        self.assertIn("probabilidade de prejuízo", relatorio)
+        self.assertNotIn("Aumento de", relatorio)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+from app_balance.services.catelina_lacet import CatelinaLacetGPT
+from app_balance.services.gpt_service import GPTService
+from app_balance.services.openai_client import OpenAIClientPool, obter_cliente_compartilhado
+from app_balance.services.response_cache import ResponseCache
+
+
+class CompletionsFalso:
+    """Substitui `client.chat.completions` e registra quantas requisições ficam em voo."""
+
+    def __init__(self, atraso: float = 0.01):
+        self.atraso = atraso
+        self.em_voo = 0
+        self.max_em_voo = 0
+
+    async def create(self, model, messages, max_tokens, temperature, stream=False, **parametros):
+        if stream:
+            return self._stream(messages[-1]['content'])
+        self.em_voo += 1
+        self.max_em_voo = max(self.max_em_voo, self.em_voo)
+        try:
+            await asyncio.sleep(self.atraso)
+            conteudo = messages[-1]['content']
+            if conteudo == "erro":
+                raise RuntimeError("falha na API")
+            mensagem = SimpleNamespace(content=f" resposta: {conteudo} ")
+            return SimpleNamespace(choices=[SimpleNamespace(message=mensagem)])
+        finally:
+            self.em_voo -= 1
+
+
+    async def _stream(self, conteudo):
+        for palavra in ["resposta", ":", f" {conteudo}"]:
+            if palavra == " erro":
+                raise RuntimeError("falha na API")
+            await asyncio.sleep(0.001)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=palavra))])
+
+
+class TestOpenAIClientPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = OpenAIClientPool(api_key="teste", max_concorrencia=3)
+        self.pool._iniciar()
+        self.addCleanup(self.pool.fechar)
+        self.completions = CompletionsFalso()
+        self.pool._client.chat = SimpleNamespace(completions=self.completions)
+
+    def test_completar_varios_respeita_concorrencia_e_ordem(self):
+        """Testa que o lote mantém a ordem, não passa do limite e devolve as falhas como exceções."""
+        prompts = [f"p{i}" for i in range(10)] + ["erro"]
+        respostas = self.pool.completar_varios_sync(prompts)
+
+        self.assertEqual(respostas[:10], [f"resposta: p{i}" for i in range(10)])
+        self.assertIsInstance(respostas[10], RuntimeError)
+        self.assertEqual(self.completions.max_em_voo, 3)
+
+    def test_fila_local_nao_consome_prazo_nem_abre_disjuntor(self):
+        """Testa que chamadas esperando vaga além do limite não estouram o prazo nem contam como falhas."""
+        pool = OpenAIClientPool(api_key="teste", max_concorrencia=2, timeout=0.2, max_tentativas=1)
+        pool._iniciar()
+        self.addCleanup(pool.fechar)
+        completions = CompletionsFalso(atraso=0.05)
+        pool._client.chat = SimpleNamespace(completions=completions)
+
+        # 12 chamadas em 6 rodadas de 0,05 s: a fila passa de 0,2 s, mas cada requisição cabe no prazo
+        respostas = pool.completar_varios_sync([f"p{i}" for i in range(12)])
+
+        self.assertEqual(respostas, [f"resposta: p{i}" for i in range(12)])
+        self.assertEqual(completions.max_em_voo, 2)
+        estatisticas = pool.estatisticas()
+        self.assertEqual(estatisticas['falhas'], 0)
+        self.assertEqual(estatisticas['prazos_excedidos'], 0)
+        self.assertEqual(estatisticas['disjuntor']['estado'], 'fechado')
+
+    def test_entradas_sync_e_async(self):
+        """Testa que a entrada síncrona e a assíncrona usam o mesmo cliente."""
+        self.assertEqual(self.pool.completar_chat_sync("oi"), "resposta: oi")
+        self.assertEqual(asyncio.run(self.pool.completar_chat("olá")), "resposta: olá")
+
+    def test_falha_ao_criar_cliente_encerra_o_loop(self):
+        """Testa que uma falha na criação do cliente não deixa threads de event loop para trás."""
+        pool = OpenAIClientPool(api_key="teste")
+        antes = threading.active_count()
+        with mock.patch('app_balance.services.openai_client.AsyncOpenAI', side_effect=ValueError("config inválida")):
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    pool._iniciar()
+        self.assertEqual(threading.active_count(), antes)
+        self.assertIsNone(pool._loop)
+        self.assertIsNone(pool._thread)
+
+    def test_gpt_service_usa_cliente_compartilhado_por_padrao(self):
+        """Testa que serviços sem cliente explícito dividem o mesmo pool (e o mesmo limite de concorrência)."""
+        compartilhado = obter_cliente_compartilhado()
+        self.assertIs(GPTService().cliente, compartilhado)
+        self.assertIs(GPTService(api_key=compartilhado.api_key).cliente, compartilhado)
+        self.assertIs(GPTService(cliente=self.pool).cliente, self.pool)
+
+    def test_gpt_service_respeita_api_key(self):
+        """Testa que uma chave diferente da do ambiente é usada num pool próprio, e não ignorada."""
+        with mock.patch.dict('os.environ', {'OPENAI_API_KEY': 'chave-do-ambiente'}), \
+                mock.patch('app_balance.services.openai_client._cliente_compartilhado', None):
+            compartilhado = obter_cliente_compartilhado()
+            cliente = GPTService(api_key="outra").cliente
+        self.assertIsNot(cliente, compartilhado)
+        self.assertEqual(cliente.api_key, "outra")
+        self.assertEqual((cliente.base_url, cliente.max_concorrencia, cliente.timeout),
+                         (compartilhado.base_url, compartilhado.max_concorrencia, compartilhado.timeout))
+
+        with self.assertRaises(ValueError):
+            GPTService(api_key="outra", cliente=self.pool)
+
+    def test_gpt_service_envia_documento_em_paralelo(self):
+        """Testa que os blocos de um documento são enviados juntos, mantendo os metadados."""
+        service = GPTService(api_key="teste", cliente=self.pool)
+        chunks = [{'indice': 0, 'texto': "a", 'pagina_inicial': 1}, {'indice': 1, 'texto': "b", 'pagina_inicial': 2}]
+        respostas = service.enviar_documento("Resuma", chunks)
+
+        self.assertEqual([resposta['indice'] for resposta in respostas], [0, 1])
+        self.assertEqual(respostas[1]['resposta'], "resposta: Resuma\n\nb")
+        self.assertNotIn('texto', respostas[0])
+        self.assertEqual(self.completions.max_em_voo, 2)
+
+    def test_streaming_sync_e_async(self):
+        """Testa que os trechos chegam em ordem pelas duas entradas de streaming."""
+        self.assertEqual(list(self.pool.transmitir_chat_sync("oi")), ["resposta", ":", " oi"])
+
+        async def consumir():
+            return [trecho async for trecho in self.pool.transmitir_chat("olá")]
+
+        self.assertEqual(asyncio.run(consumir()), ["resposta", ":", " olá"])
+        with self.assertRaises(RuntimeError):
+            list(self.pool.transmitir_chat_sync("erro"))
+
+    def test_streaming_libera_a_vaga_ao_terminar(self):
+        """Testa que o stream ocupa uma vaga do limite de concorrência só até terminar (ou falhar)."""
+        list(self.pool.transmitir_chat_sync("oi"))
+        with self.assertRaises(RuntimeError):
+            list(self.pool.transmitir_chat_sync("erro"))
+        self.assertEqual(self.pool._semaforo._value, 3)
+
+    def test_gpt_service_transmite_com_cache_e_sufixo(self):
+        """Testa o streaming do GPTService, o cache da resposta completa e o sufixo da Catelina no fim."""
+        service = GPTService(api_key="teste", cliente=self.pool, cache=ResponseCache(None))
+        catelina = CatelinaLacetGPT(tipo_humor="compreensivo")
+
+        trechos = list(catelina.generate_response_stream(service.transmitir_prompt("lucro")))
+        self.assertEqual(trechos[:3], ["resposta", ":", " lucro"])
+        self.assertEqual("".join(trechos), catelina.generate_response("resposta: lucro"))
+
+        self.assertEqual(list(service.transmitir_prompt("lucro")), ["resposta: lucro"])
+        self.assertEqual(list(service.transmitir_prompt("erro")), ["resposta", ":"])
+
+
+if __name__ == '__main__':
+    unittest.main()
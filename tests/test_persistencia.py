@@ -0,0 +1,84 @@
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from processamento.models import Analise, PromptModel, Recebimento, Usuario, criar_tabelas
+from app_balance.services.cash_flow import fluxo_mensal_de_recebimentos
+from app_balance.services.model_registry import ModelRegistry
+from app_balance.services.persistencia import DataPersistenceService
+from app_balance.services.text_processing import TextProcessingService, criar_sentiment_batcher
+
+
+class TestAnaliseSentimentoPersistida(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine('sqlite://')
+        criar_tabelas(engine)
+        self.session = sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        self.usuario = Usuario(nome="Ana", email="ana@exemplo.com", senha="x", preferencias_tom="padrao",
+                               idioma_preferido="pt")
+        outro = Usuario(nome="Bia", email="bia@exemplo.com", senha="x", preferencias_tom="padrao",
+                        idioma_preferido="pt")
+        self.session.add_all([self.usuario, outro])
+        self.session.commit()
+        for texto in ["bom dia", "dia ruim", "erro no lote", "bom lucro", "lucro bom"]:
+            self.session.add(PromptModel(texto=texto, resposta="ok", usuario_id=self.usuario.id))
+        self.session.add(PromptModel(texto="bom dia", resposta="ok", usuario_id=outro.id))
+        self.session.commit()
+        self.service = DataPersistenceService(self.session, self.usuario)
+
+    def test_salva_um_resultado_por_prompt_do_usuario_em_blocos(self):
+        """Testa que os prompts são lidos em blocos de batch_size e só os do usuário são analisados."""
+        blocos = []
+
+        def classificar(textos):
+            blocos.append(list(textos))
+            return ["POSITIVE" if "bom" in texto else "NEGATIVE" for texto in textos]
+
+        self.assertEqual(self.service.analyze_stored_prompts_sentiment(classificar, batch_size=2), 5)
+        self.assertEqual([len(bloco) for bloco in blocos], [2, 2, 1])
+        resultados = [analise.resultado for analise in self.session.query(Analise).order_by(Analise.prompt_id)]
+        self.assertEqual(resultados, ["POSITIVE", "NEGATIVE", "NEGATIVE", "POSITIVE", "POSITIVE"])
+
+    def test_lote_com_falha_nao_vira_analise(self):
+        """Testa que textos de um lote que falhou não são salvos como um sentimento inventado."""
+        def pipeline(textos, batch_size):
+            if any("erro" in texto for texto in textos):
+                raise RuntimeError("falha no modelo")
+            return [{"label": "POSITIVE" if "bom" in texto else "NEGATIVE", "score": 0.9} for texto in textos]
+
+        models = ModelRegistry()
+        models.registrar("sentimento", lambda: pipeline)
+        # Janela longa: cada bloco de dois prompts vira um único lote do modelo
+        processador = TextProcessingService(models=models,
+                                            sentiment_batcher=criar_sentiment_batcher(models, max_espera_ms=200))
+        self.addCleanup(processador.sentiment_batcher.fechar)
+
+        salvas = self.service.analyze_stored_prompts_sentiment(processador.analyze_sentiment_batch, batch_size=2)
+
+        self.assertEqual(salvas, 3)
+        analisados = {analise.prompt.texto: analise.resultado for analise in self.session.query(Analise)}
+        self.assertEqual(analisados, {"bom dia": "POSITIVE", "dia ruim": "NEGATIVE", "lucro bom": "POSITIVE"})
+
+    def test_erro_do_classificador_desfaz_o_lote(self):
+        def classificar(textos):
+            raise ValueError("classificador indisponível")
+
+        with self.assertRaises(RuntimeError):
+            self.service.analyze_stored_prompts_sentiment(classificar)
+        self.assertEqual(self.session.query(Analise).count(), 0)
+
+    def test_analises_salvas_contam_uma_vez_cada(self):
+        """Testa que cada análise salva entra uma vez no fluxo mensal, mesmo com valores repetidos."""
+        for _ in range(2):
+            self.service.save_financial_analysis({'fixos': 300, 'TI': 200}, 500, 800)
+
+        recebimentos = self.session.query(Recebimento).all()
+        self.assertEqual(len({recebimento.data_recebimento for recebimento in recebimentos}), 2)
+        mensal = fluxo_mensal_de_recebimentos(recebimentos)
+        self.assertEqual(mensal['receita'].sum(), 1600)
+        self.assertEqual(mensal['custos'].sum(), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
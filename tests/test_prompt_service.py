@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from app_balance.gpt4.prompt_service import PromptService
+from app_balance.processamento.file_processing_service import FileProcessingService
+
+
+class TestPromptService(unittest.TestCase):
+
+    def setUp(self):
+        self.prompt_service = PromptService()
+        base_path = os.path.abspath(os.path.dirname(__file__))
+        self.excel_file_path = os.path.join(base_path, '../app_balance/exemplo/exemplo.xlsx')
+
+    def test_processar_arquivo_excel(self):
+        """Testa a agregação de custos lida diretamente do arquivo Excel."""
+        result = self.prompt_service.processar_arquivo(self.excel_file_path, 'xlsx')
+
+        self.assertEqual(result['total_custos'], 25000)
+        self.assertEqual(result['categorias_custos']['TI'], 7000)
+        self.assertAlmostEqual(result['receita_projetada'], 37500)
+
+    def test_processar_planilhas_em_formato_colunar(self):
+        """Testa que o resultado em DataFrame do FileProcessingService é agregado sem conversão para registros."""
+        with open(self.excel_file_path, 'rb') as f:
+            planilhas = FileProcessingService().processar_arquivo(f.read(), 'excel', formato='dataframe',
+                                                                  colunas=['Categoria', 'Valor'])
+
+        self.assertIsInstance(planilhas['Sheet1'], pd.DataFrame)
+        self.assertEqual(self.prompt_service.processar_planilhas(planilhas),
+                         self.prompt_service.processar_arquivo(self.excel_file_path, 'xlsx'))
+
+    def test_processar_arquivo_em_fluxo(self):
+        """Testa que a agregação em blocos dá o mesmo resultado da leitura completa."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        df = pd.DataFrame({
+            'Data': range(1000),
+            'Categoria': ['Marketing', 'RH', 'TI', None] * 250,
+            'Valor': [10.5, 20.0, 30.25, 5.0] * 250,
+        })
+        csv_path = os.path.join(diretorio, 'custos.csv')
+        xlsx_path = os.path.join(diretorio, 'custos.xlsx')
+        df.to_csv(csv_path, index=False)
+        df.to_excel(xlsx_path, index=False)
+
+        for path, file_type in ((csv_path, 'csv'), (xlsx_path, 'xlsx')):
+            esperado = self.prompt_service.processar_arquivo(path, file_type)
+            result = self.prompt_service.processar_arquivo_em_fluxo(path, file_type, tamanho_bloco=64)
+            self.assertEqual(result['categorias_custos'], esperado['categorias_custos'])
+            self.assertAlmostEqual(result['total_custos'], esperado['total_custos'])
+            self.assertAlmostEqual(result['receita_projetada'], esperado['receita_projetada'])
+
+    def test_processar_arquivo_em_fluxo_sem_colunas(self):
+        """Testa o erro de colunas ausentes na leitura em blocos."""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        xlsx_path = os.path.join(diretorio, 'sem_colunas.xlsx')
+        pd.DataFrame({'Nome': ['x']}).to_excel(xlsx_path, index=False)
+
+        with self.assertRaises(ValueError):
+            self.prompt_service.processar_arquivo_em_fluxo(xlsx_path, 'xlsx')
+
+    def test_processar_planilhas_de_tabelas_docx(self):
+        """Testa a agregação das tabelas extraídas de um DOCX como se fossem planilhas."""
+        tabelas = {'Tabela1': [{'Categoria': 'TI', 'Valor': 1500.0}, {'Categoria': 'RH', 'Valor': 500.0}],
+                   'Tabela2': [{'Item': 'sem custos'}]}
+
+        result = self.prompt_service.processar_planilhas(tabelas)
+
+        self.assertEqual(result['categorias_custos'], {'RH': 500.0, 'TI': 1500.0})
+        self.assertEqual(result['total_custos'], 2000.0)
+
+    def test_processar_planilhas_sem_colunas(self):
+        """Testa o erro quando nenhuma planilha tem as colunas de custos."""
+        with self.assertRaises(ValueError):
+            self.prompt_service.processar_planilhas({'Sheet1': [{'Nome': 'x'}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import httpx
+import openai
+
+from app_balance.services.gpt_service import GPTService
+from app_balance.services import openai_service
+from app_balance.services.openai_client import OpenAIClientPool
+from app_balance.services.response_cache import ResponseCache
+from app_balance.services.resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceededError, ResilientCaller, RetryPolicy, TokenBucket,
+)
+
+
+def erro_status(status):
+    requisicao = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    resposta = httpx.Response(status, request=requisicao)
+    classe = {429: openai.RateLimitError, 503: openai.InternalServerError, 400: openai.BadRequestError}[status]
+    return classe("erro", response=resposta, body=None)
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class TestResilience(unittest.TestCase):
+
+    def test_token_bucket(self):
+        """Testa rajada inicial, espera pela próxima ficha e recusa quando a espera passa do limite."""
+        relogio = Relogio()
+        balde = TokenBucket(taxa=2, capacidade=2, relogio=relogio)
+        self.assertEqual([balde.reservar(), balde.reservar()], [0.0, 0.0])
+        self.assertIsNone(balde.reservar(espera_maxima=0.1))
+        self.assertAlmostEqual(balde.reservar(), 0.5)
+        relogio.agora = 1.0
+        self.assertAlmostEqual(balde.reservar(), 0.0)
+
+    def test_disjuntor_abre_e_testa_uma_chamada(self):
+        """Testa abertura após falhas seguidas, recusa imediata e a chamada de teste no meio aberto."""
+        relogio = Relogio()
+        disjuntor = CircuitBreaker(limite_falhas=2, tempo_reabertura=10, relogio=relogio)
+        for _ in range(2):
+            disjuntor.permitir()
+            disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.estado, CircuitBreaker.ABERTO)
+        with self.assertRaises(CircuitOpenError):
+            disjuntor.permitir()
+
+        relogio.agora = 10.0
+        disjuntor.permitir()
+        with self.assertRaises(CircuitOpenError):
+            disjuntor.permitir()
+        disjuntor.registrar_sucesso()
+        self.assertEqual(disjuntor.estado, CircuitBreaker.FECHADO)
+        self.assertEqual(disjuntor.estatisticas()['recusadas'], 2)
+
+    def test_retenta_so_erros_transitorios(self):
+        """Testa que 429/5xx são retentados e 400 não."""
+        chamador = ResilientCaller(prazo=5, politica=RetryPolicy(max_tentativas=3, atraso_base=0.001))
+        erros = [erro_status(429), erro_status(503)]
+
+        async def instavel(restante):
+            if erros:
+                raise erros.pop(0)
+            return "ok"
+
+        async def invalida(restante):
+            raise erro_status(400)
+
+        self.assertEqual(asyncio.run(chamador.executar(instavel)), "ok")
+        with self.assertRaises(openai.BadRequestError):
+            asyncio.run(chamador.executar(invalida))
+        estatisticas = chamador.estatisticas()
+        self.assertEqual((estatisticas['tentativas'], estatisticas['retentativas'], estatisticas['falhas']), (4, 2, 1))
+        self.assertEqual(estatisticas['disjuntor']['estado'], CircuitBreaker.FECHADO)
+
+    def test_prazo_interrompe_chamada_lenta(self):
+        """Testa que a chamada não passa do prazo, mesmo que o servidor não responda."""
+        chamador = ResilientCaller(prazo=0.05)
+
+        async def lenta(restante):
+            await asyncio.sleep(5)
+
+        with self.assertRaises(DeadlineExceededError):
+            asyncio.run(chamador.executar(lenta))
+        self.assertEqual(chamador.estatisticas()['prazos_excedidos'], 1)
+
+    def test_gpt_service_usa_caminho_local_com_disjuntor_aberto(self):
+        """Testa que, com o disjuntor aberto, o GPTService responde localmente sem chamar a API."""
+        disjuntor = CircuitBreaker(limite_falhas=1, tempo_reabertura=60)
+        disjuntor.registrar_falha()
+        cliente = OpenAIClientPool(api_key="teste", disjuntor=disjuntor)
+        self.addCleanup(cliente.fechar)
+        service = GPTService(api_key="teste", cliente=cliente, fallback_local=lambda prompt: f"local: {prompt}")
+
+        with mock.patch('openai.resources.chat.AsyncCompletions.create') as create:
+            self.assertEqual(service.enviar_prompt("lucro"), "local: lucro")
+            self.assertEqual(list(service.transmitir_prompt("lucro")), ["local: lucro"])
+        create.assert_not_called()
+        self.assertEqual(service.estatisticas()['cliente']['disjuntor']['recusadas'], 2)
+
+    def test_analyze_data_usa_fallback_local_com_disjuntor_aberto(self):
+        """Testa que analyze_data responde pelo fallback (o informado ou o classificador local)."""
+        disjuntor = CircuitBreaker(limite_falhas=1, tempo_reabertura=60)
+        disjuntor.registrar_falha()
+        cliente = OpenAIClientPool(api_key="teste", disjuntor=disjuntor)
+        self.addCleanup(cliente.fechar)
+
+        with mock.patch.object(openai_service, 'verificar_credenciais'), \
+                mock.patch.object(openai_service, 'obter_cliente_compartilhado', return_value=cliente), \
+                mock.patch('openai.resources.chat.AsyncCompletions.create') as create:
+            self.assertEqual(openai_service.analyze_data("lucro", cache=ResponseCache(None),
+                                                         fallback_local=lambda prompt: f"local: {prompt}"),
+                             "local: lucro")
+            resposta = openai_service.analyze_data("Qual o ROI do investimento?", cache=ResponseCache(None))
+        create.assert_not_called()
+        self.assertIn("indisponível", resposta)
+        self.assertIn("ROI", resposta)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app_balance.services.gpt_service import GPTService
+from app_balance.services.openai_client import OpenAIClientPool
+from app_balance.services import response_cache
+from app_balance.services.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        self.caminho_db = os.path.join(diretorio, 'respostas.sqlite')
+        self.cache = ResponseCache(self.caminho_db, max_itens_memoria=2)
+        self.addCleanup(self.cache.fechar)
+
+    def test_chave_normaliza_espacos_e_separa_parametros(self):
+        """Testa que espaços extras não mudam a chave, mas o modelo e a temperatura mudam."""
+        chave = self.cache.gerar_chave("Qual é o  meu lucro?\n", "gpt-4", 0.7, 500)
+
+        self.assertEqual(chave, self.cache.gerar_chave("Qual é o meu lucro?", "gpt-4", 0.7, 500))
+        self.assertNotEqual(chave, self.cache.gerar_chave("Qual é o meu lucro?", "gpt-4", 0.0, 500))
+        self.assertNotEqual(chave, self.cache.gerar_chave("Qual é o meu lucro?", "gpt-3.5-turbo", 0.7, 500))
+        self.assertNotEqual(chave, self.cache.gerar_chave("Qual é o meu lucro?", "gpt-4", 0.7, 500,
+                                                          "http://127.0.0.1:8000/v1"))
+
+    def test_niveis_memoria_e_sqlite(self):
+        """Testa o LRU em memória e a recuperação pelo SQLite após a remoção da memória."""
+        for chave in ('a', 'b', 'c'):
+            self.cache.armazenar(chave, f"resposta {chave}")
+
+        self.assertEqual(self.cache.obter('c'), "resposta c")
+        self.assertEqual(self.cache.obter('a'), "resposta a")
+        estatisticas = self.cache.estatisticas()
+        self.assertEqual((estatisticas['hits_memoria'], estatisticas['hits_sqlite']), (1, 1))
+
+        persistente = ResponseCache(self.caminho_db)
+        self.addCleanup(persistente.fechar)
+        self.assertEqual(persistente.obter('b'), "resposta b")
+
+    def test_ttl_expira_respostas(self):
+        """Testa que respostas expiradas não são devolvidas."""
+        cache = ResponseCache(None, ttl=10)
+        with mock.patch('app_balance.services.response_cache.time.time', return_value=1000.0):
+            cache.armazenar('a', "resposta")
+        with mock.patch('app_balance.services.response_cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.obter('a'))
+
+    def test_cache_compartilhado_fica_no_diretorio_configurado(self):
+        """Testa que o cache da aplicação é único e grava no caminho de RESPONSE_CACHE_PATH."""
+        caminho = os.path.join(os.path.dirname(self.caminho_db), 'cache', 'respostas.sqlite')
+        with mock.patch.dict(os.environ, {'RESPONSE_CACHE_PATH': caminho}), \
+                mock.patch.object(response_cache, '_cache_compartilhado', None):
+            cache = response_cache.obter_cache_compartilhado()
+            self.addCleanup(cache.fechar)
+            self.assertIs(response_cache.obter_cache_compartilhado(), cache)
+        self.assertTrue(os.path.exists(caminho))
+
+    def test_gpt_service_usa_cache_e_bypass(self):
+        """Testa que o GPTService só chama a API na primeira vez ou quando o cache é ignorado."""
+        service = GPTService(api_key="teste", cache=self.cache)
+        with mock.patch.object(service, '_completar', return_value="Resposta do GPT-4") as completar:
+            self.assertEqual(service.enviar_prompt("Qual é a minha receita?"), "Resposta do GPT-4")
+            self.assertEqual(service.enviar_prompt("Qual é a minha  receita?"), "Resposta do GPT-4")
+            service.enviar_prompt("Qual é a minha receita?", usar_cache=False)
+
+        self.assertEqual(completar.call_count, 2)
+        estatisticas = self.cache.estatisticas()
+        self.assertEqual(estatisticas['bypass'], 1)
+        self.assertEqual(estatisticas['taxa_acerto'], 0.5)
+
+    def test_gpt_service_nao_armazena_erros(self):
+        """Testa que a resposta padrão de erro não é armazenada no cache."""
+        service = GPTService(api_key="teste", cache=self.cache)
+        with mock.patch.object(service, '_completar', side_effect=RuntimeError("falha")):
+            service.enviar_prompt("Prompt")
+        with mock.patch.object(service, '_completar', return_value="ok"):
+            self.assertEqual(service.enviar_prompt("Prompt"), "ok")
+
+    def test_respostas_de_outra_api_nao_sao_reaproveitadas(self):
+        """Testa que o SQLite não devolve a resposta de um servidor de teste para o cliente da produção."""
+        teste = GPTService(cliente=OpenAIClientPool(api_key="teste", base_url="http://127.0.0.1:8000/v1"),
+                           cache=self.cache)
+        with mock.patch.object(teste, '_completar', return_value="Resposta do mock"):
+            self.assertEqual(teste.enviar_prompt("Qual é a minha receita?"), "Resposta do mock")
+
+        persistente = ResponseCache(self.caminho_db)
+        self.addCleanup(persistente.fechar)
+        producao = GPTService(cliente=OpenAIClientPool(api_key="teste"), cache=persistente)
+        with mock.patch.object(producao, '_completar', return_value="Resposta do GPT-4") as completar:
+            self.assertEqual(producao.enviar_prompt("Qual é a minha receita?"), "Resposta do GPT-4")
+        completar.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+from unittest import mock
+from app_balance.services.sentiment_backends import backend_configurado, comparar_previsoes, verificar_paridade
+
+
+class TestSentimentBackends(unittest.TestCase):
+
+    def test_backend_configurado(self):
+        """Testa a escolha do backend por SENTIMENT_BACKEND."""
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(backend_configurado(), "pytorch")
+        with mock.patch.dict(os.environ, {"SENTIMENT_BACKEND": "ONNX-int8"}):
+            self.assertEqual(backend_configurado(), "onnx-int8")
+        with mock.patch.dict(os.environ, {"SENTIMENT_BACKEND": "gpu"}):
+            with self.assertRaises(ValueError):
+                backend_configurado()
+
+    def test_comparar_previsoes(self):
+        """Testa a concordância de rótulos e a diferença de score entre dois backends."""
+        referencia = [{"label": "POSITIVE", "score": 0.9}, {"label": "NEGATIVE", "score": 0.8},
+                      {"label": "POSITIVE", "score": 0.6}, {"label": "NEGATIVE", "score": 0.7}]
+        candidato = [{"label": "POSITIVE", "score": 0.88}, {"label": "NEGATIVE", "score": 0.8},
+                     {"label": "NEGATIVE", "score": 0.51}, {"label": "NEGATIVE", "score": 0.7}]
+
+        resultado = comparar_previsoes(referencia, candidato, min_concordancia=0.75)
+
+        self.assertEqual(resultado['concordancia'], 0.75)
+        self.assertEqual(resultado['divergencias'], [2])
+        self.assertAlmostEqual(resultado['diferenca_max_score'], 0.02)
+        self.assertTrue(resultado['aprovado'])
+        self.assertFalse(comparar_previsoes(referencia, candidato)['aprovado'])
+
+    def test_verificar_paridade_com_pipelines(self):
+        """Testa que os dois pipelines recebem os mesmos textos em lote."""
+        def pipeline(textos, batch_size):
+            return [{"label": "POSITIVE" if "bom" in texto else "NEGATIVE", "score": 0.9} for texto in textos]
+
+        resultado = verificar_paridade(pipeline, pipeline, ["bom", "ruim"])
+        self.assertEqual(resultado['concordancia'], 1.0)
+        self.assertTrue(resultado['aprovado'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+from app_balance.services.gpt_service import GPTService
+from app_balance.services.openai_client import OpenAIClientPool
+from app_balance.services.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.coalescedor = SingleFlight()
+
+    def _esperar_coalescidas(self, quantidade):
+        limite = time.monotonic() + 5
+        while self.coalescedor.estatisticas()['coalescidas'] < quantidade:
+            self.assertLess(time.monotonic(), limite, "As chamadas não foram agrupadas a tempo.")
+            time.sleep(0.001)
+
+    def _disparar(self, funcao, quantidade):
+        resultados = [None] * quantidade
+
+        def chamar(indice):
+            try:
+                resultados[indice] = self.coalescedor.executar("chave", funcao)
+            except Exception as e:
+                resultados[indice] = e
+
+        threads = [threading.Thread(target=chamar, args=(i,)) for i in range(quantidade)]
+        for thread in threads:
+            thread.start()
+        return threads, resultados
+
+    def test_chamadas_simultaneas_dividem_resultado(self):
+        """Testa que chamadas com a mesma chave em voo executam a função uma vez só."""
+        liberar = threading.Event()
+        chamadas = []
+
+        def funcao():
+            chamadas.append(1)
+            liberar.wait(5)
+            return "resposta"
+
+        threads, resultados = self._disparar(funcao, 5)
+        self._esperar_coalescidas(4)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(resultados, ["resposta"] * 5)
+        self.assertEqual(len(chamadas), 1)
+        estatisticas = self.coalescedor.estatisticas()
+        self.assertEqual((estatisticas['upstream'], estatisticas['coalescidas'], estatisticas['em_voo']), (1, 4, 0))
+        self.assertEqual(estatisticas['taxa_coalescencia'], 0.8)
+
+        # Depois de concluída, a chave é liberada e uma nova chamada executa de novo
+        self.assertEqual(self.coalescedor.executar("chave", lambda: "nova"), "nova")
+
+    def test_erro_repassado_a_todos(self):
+        """Testa que a exceção da chamada upstream chega a todos que esperavam."""
+        liberar = threading.Event()
+
+        def funcao():
+            liberar.wait(5)
+            raise RuntimeError("falha na API")
+
+        threads, resultados = self._disparar(funcao, 3)
+        self._esperar_coalescidas(2)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(isinstance(resultado, RuntimeError) for resultado in resultados))
+        self.assertEqual(self.coalescedor.estatisticas()['erros'], 1)
+
+    def test_executar_async(self):
+        """Testa o agrupamento de corrotinas no mesmo event loop."""
+        chamadas = []
+
+        async def funcao():
+            chamadas.append(1)
+            await asyncio.sleep(0.01)
+            return "resposta"
+
+        async def disparar():
+            return await asyncio.gather(*(self.coalescedor.executar_async("chave", funcao) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(disparar()), ["resposta"] * 4)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_gpt_service_agrupa_prompts_identicos(self):
+        """Testa que o GPTService agrupa prompts iguais, mas não os pedidos com usar_cache=False."""
+        service = GPTService(api_key="teste", cliente=OpenAIClientPool(api_key="teste"))
+
+        async def completar(prompt):
+            await asyncio.sleep(0.01)
+            return f"resposta: {prompt}"
+
+        with mock.patch.object(service, '_completar_async', side_effect=completar) as completar_async:
+            respostas = service.enviar_prompts(["Qual o lucro?", "Qual o  lucro?", "Qual a receita?"])
+            service.enviar_prompts(["Qual o lucro?"] * 2, usar_cache=False)
+
+        self.assertEqual(respostas[0], respostas[1])
+        self.assertEqual(completar_async.call_count, 4)
+        self.assertEqual(service.coalescedor.estatisticas()['coalescidas'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
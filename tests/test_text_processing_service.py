@@ -7,12 +7,24 @@ class TestTextProcessingService(unittest.TestCase):
         self.text_processor = TextProcessingService()
 
     def test_financial_route_from_file_data(self):
-        # Teste para garantir que palavras relacionadas a finanças escolhem a rota 'financial'
+        # Teste para garantir que palavras financeiras sem termos de análise escolhem a rota 'general_financial'
         file_data = {
             'categorias_custos': {'finança': 100.0, 'investimento': 200.0}
         }
         route = self.text_processor.route_and_process(file_data)
-        self.assertEqual(route, "financial", "Esperava a rota 'financial' mas obteve outra rota.")
+        self.assertEqual(route, "general_financial", "Esperava a rota 'general_financial' mas obteve outra rota.")
+
+    def test_financial_subroutes_from_file_data(self):
+        # Tópicos financeiros se dividem pelos termos: ROI/retorno, termos de custo ou nenhum dos dois
+        casos = {
+            "general_financial": {'finança': 100.0, 'investimento': 200.0},
+            "financial_analysis": {'finança': 100.0, 'custo': 200.0},
+            "advanced_financial_analysis": {'investimento': 100.0, 'retorno': 200.0},
+        }
+        for esperada, categorias in casos.items():
+            with self.subTest(rota=esperada):
+                route = self.text_processor.route_and_process({'categorias_custos': categorias})
+                self.assertEqual(route, esperada)
 
     def test_joke_route_from_file_data(self):
         # Teste para garantir que palavras relacionadas a piadas escolhem a rota 'joke'
@@ -30,5 +42,12 @@ class TestTextProcessingService(unittest.TestCase):
         route = self.text_processor.route_and_process(file_data)
         self.assertEqual(route, "general", "Esperava a rota 'general' mas obteve outra rota.")
 
+    def test_local_route_keeps_neutral_sentiment(self):
+        # No caminho local o sentimento não é inferido das palavras do usuário
+        result = self.text_processor.route_and_process_detailed("Qual o ROI e o retorno do investimento? Positivo!")
+        self.assertEqual(result["path"], "local")
+        self.assertEqual(result["route"], "advanced_financial_analysis")
+        self.assertEqual(result["analysis"]["sentiment"], "NEUTRAL")
+
 if __name__ == '__main__':
     unittest.main()